@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Reparto de marcos físicos entre procesos para SistemaMemoria.
+
+Cada proceso tiene una cuota de marcos. Un fallo se atiende con un marco libre
+mientras el proceso esté por debajo de su cuota; si no, con reemplazo local
+(su página menos usada) o quitándole una página a un proceso que excede la
+suya. Cada `periodo` referencias las cuotas se recalculan con la estrategia
+y los procesos que quedan por encima liberan sus páginas menos usadas:
+
+    fija              el mismo número de marcos para todos los procesos
+    proporcional      marcos proporcionales a las páginas del espacio de cada proceso
+    conjunto_trabajo  |W(t, τ)|: páginas referenciadas en las últimas τ referencias
+    pff               frecuencia de fallos: la cuota crece por encima de
+                      `superior` fallos por referencia y se reduce por debajo
+                      de `inferior`
+
+Las páginas grandes (ver paginas_grandes.py) no cuentan para las cuotas: se
+reparten solo los marcos que no ocupan.
+
+El conjunto de trabajo se estima sin guardar el historial: en cada muestreo
+las páginas con el bit de referencia activo anotan el instante y el bit se
+limpia (los fallos anotan el instante exacto). Hay hiperpaginación cuando la
+suma de los conjuntos de trabajo supera los marcos, o cuando la tasa de
+fallos del periodo supera el umbral sin marcos libres; el informe sugiere
+entonces qué procesos suspender.
+
+Uso:
+    python asignacion_marcos.py --estrategia conjunto_trabajo --procesos 8 --memoria-kb 256
+    python asignacion_marcos.py --comparar --procesos 12 --memoria-kb 512
+"""
+
+import argparse
+import sys
+import time
+
+# --- Estrategias --------------------------------------------------------------
+
+class AsignacionFija:
+    """Reparto equitativo de los marcos"""
+
+    nombre = 'fija'
+
+    def cuotas(self, gestor, procesos, marcos):
+        return dict.fromkeys(procesos, max(marcos // len(procesos), 1))
+
+class AsignacionProporcional:
+    """a_i = s_i / S * m, con s_i las páginas del espacio del proceso"""
+
+    nombre = 'proporcional'
+
+    def cuotas(self, gestor, procesos, marcos):
+        tablas = gestor.sistema.paginacion.tabla_paginas
+        tamanos = {proceso_id: max(len(tablas.get(proceso_id, ())), 1) for proceso_id in procesos}
+        total = sum(tamanos.values())
+        return {proceso_id: max(tamano * marcos // total, 1) for proceso_id, tamano in tamanos.items()}
+
+class ConjuntoTrabajo:
+    """Cuota igual al conjunto de trabajo estimado en la ventana τ"""
+
+    nombre = 'conjunto_trabajo'
+
+    def cuotas(self, gestor, procesos, marcos):
+        conjuntos = gestor.conjuntos_trabajo
+        reparto = max(marcos // len(procesos), 1)
+        # Un proceso aún sin muestras empieza con el reparto equitativo
+        return {proceso_id: max(conjuntos[proceso_id], 1) if proceso_id in conjuntos else reparto
+                for proceso_id in procesos}
+
+class FrecuenciaFallos:
+    """Ajusta la cuota según los fallos por referencia del último periodo"""
+
+    nombre = 'pff'
+
+    def __init__(self, inferior=0.005, superior=0.05):
+        if not 0 <= inferior < superior:
+            raise ValueError("Se necesita 0 <= inferior < superior")
+        self.inferior = inferior
+        self.superior = superior
+
+    def cuotas(self, gestor, procesos, marcos):
+        anteriores = gestor.cuotas
+        reparto = max(marcos // len(procesos), 1)
+        cuotas = {}
+        for proceso_id in procesos:
+            cuota = anteriores.get(proceso_id, reparto)
+            accesos = gestor.ventana_accesos.get(proceso_id, 0)
+            if accesos:
+                tasa = gestor.ventana_fallos.get(proceso_id, 0) / accesos
+                if tasa > self.superior:
+                    cuota += max(cuota // 4, 1)
+                elif tasa < self.inferior:
+                    cuota -= max(cuota // 8, 1)
+            cuotas[proceso_id] = max(cuota, 1)
+        return cuotas
+
+ESTRATEGIAS = {
+    'fija': AsignacionFija,
+    'proporcional': AsignacionProporcional,
+    'conjunto_trabajo': ConjuntoTrabajo,
+    'pff': FrecuenciaFallos,
+}
+
+def crear_estrategia(nombre, **opciones):
+    """Instancia una estrategia por nombre ('fija', 'proporcional', 'conjunto_trabajo', 'pff')"""
+    if nombre not in ESTRATEGIAS:
+        raise ValueError(f"Estrategia desconocida: {nombre}")
+    return ESTRATEGIAS[nombre](**opciones)
+
+# --- Gestor -------------------------------------------------------------------
+
+class GestorAsignacion:
+    """Cuotas de marcos por proceso, conjunto de trabajo y detección de hiperpaginación
+
+    Se activa con SistemaMemoria.activar_asignacion(...), que lo consulta en
+    cada referencia y en cada fallo de página. El tiempo se mide en
+    referencias a memoria de todos los procesos.
+    """
+
+    def __init__(self, sistema, estrategia='conjunto_trabajo', tau=10000, periodo=1000,
+                 umbral_hiperpaginacion=0.1, **opciones):
+        if periodo <= 0 or tau <= 0:
+            raise ValueError("tau y periodo deben ser positivos")
+        self.sistema = sistema
+        self.estrategia = (crear_estrategia(estrategia, **opciones) if isinstance(estrategia, str)
+                           else estrategia)
+        self.tau = tau
+        self.periodo = periodo
+        self.umbral_hiperpaginacion = umbral_hiperpaginacion
+        paginacion = sistema.paginacion
+        self.marcos = paginacion.num_marcos if paginacion.num_marcos is not None else len(paginacion.marcos_memoria)
+
+        self.cuotas = {}            # proceso_id -> marcos
+        self.accesos = {}           # proceso_id -> referencias totales
+        self.fallos = {}            # proceso_id -> fallos totales
+        self.ventana_accesos = {}   # lo mismo, solo del periodo en curso
+        self.ventana_fallos = {}
+        self.ultimo_uso = {}        # (proceso_id, página) -> instante de la última referencia observada
+        self.conjuntos_trabajo = {} # proceso_id -> |W(t, τ)|
+        self.tiempo = 0
+        self.proximo_muestreo = periodo
+
+        self.periodos = 0
+        self.periodos_hiperpaginacion = 0
+        self.hiperpaginacion = False
+        self.demanda = 0            # suma de los conjuntos de trabajo en el último muestreo
+        self.desalojos = 0
+
+    # --- ganchos de SistemaMemoria --------------------------------------------
+
+    def registrar_acceso(self, proceso_id):
+        """Cuenta una referencia; al cerrar un periodo muestrea y reequilibra"""
+        self.tiempo += 1
+        self.accesos[proceso_id] = self.accesos.get(proceso_id, 0) + 1
+        self.ventana_accesos[proceso_id] = self.ventana_accesos.get(proceso_id, 0) + 1
+        if proceso_id not in self.cuotas:
+            # Proceso nuevo: reparto equitativo hasta el próximo reequilibrio
+            self.cuotas[proceso_id] = max(self.marcos // (len(self.cuotas) + 1), 1)
+        if self.tiempo >= self.proximo_muestreo:
+            self._cerrar_periodo()
+
+    def registrar_fallo(self, proceso_id, pagina):
+        """Cuenta un fallo; la página entra en el conjunto de trabajo con el instante exacto"""
+        self.fallos[proceso_id] = self.fallos.get(proceso_id, 0) + 1
+        self.ventana_fallos[proceso_id] = self.ventana_fallos.get(proceso_id, 0) + 1
+        self.ultimo_uso[(proceso_id, pagina)] = self.tiempo
+
+    def elegir_victima(self, proceso_id):
+        """Página a reemplazar para un fallo de `proceso_id`, o None para usar un marco libre"""
+        paginacion = self.sistema.paginacion
+        residentes = self.residentes_base(proceso_id)
+        if residentes < self.cuotas.get(proceso_id, 1):
+            if paginacion.marcos_libres:
+                return None
+            # Sin marcos libres: se quita una página a un proceso que excede su cuota
+            excedidos = {otro for otro in paginacion.residentes
+                         if self.residentes_base(otro) > self.cuotas.get(otro, 0)}
+            if excedidos:
+                return self._menos_usada(excedidos)
+        if residentes:
+            return self._menos_usada((proceso_id,))
+        return None
+
+    def residentes_base(self, proceso_id):
+        """Páginas base residentes del proceso: las páginas grandes no cuentan para la cuota"""
+        paginacion = self.sistema.paginacion
+        return (paginacion.residentes.get(proceso_id, 0)
+                - len(paginacion.tabla_grandes.get(proceso_id, ())) * paginacion.paginas_por_grande)
+
+    def marcos_base(self):
+        """Marcos que se reparten con cuotas (los de las páginas grandes quedan fuera)"""
+        paginacion = self.sistema.paginacion
+        return max(self.marcos - len(paginacion.grandes_en_memoria) * paginacion.paginas_por_grande, 1)
+
+    # --- periodo ----------------------------------------------------------------
+
+    def _cerrar_periodo(self):
+        self.muestrear()
+        accesos = sum(self.ventana_accesos.values())
+        tasa = sum(self.ventana_fallos.values()) / accesos if accesos else 0
+        # Muchos fallos con marcos libres son arranque o cambio de fase, no hiperpaginación
+        self.hiperpaginacion = self.demanda > self.marcos_base() or (
+            tasa > self.umbral_hiperpaginacion and not self.sistema.paginacion.marcos_libres)
+        if self.hiperpaginacion:
+            self.periodos_hiperpaginacion += 1
+        self.periodos += 1
+        self.reequilibrar()
+        self.ventana_accesos = {}
+        self.ventana_fallos = {}
+
+    def muestrear(self):
+        """Lee y limpia los bits de referencia; recalcula los conjuntos de trabajo"""
+        ahora = self.tiempo
+        paginacion = self.sistema.paginacion
+        tablas = paginacion.tabla_paginas
+        ultimo_uso = self.ultimo_uso
+        for clave in paginacion.paginas_en_memoria:
+            info = tablas[clave[0]][clave[1]]
+            if info['referenciada']:
+                info['referenciada'] = False
+                ultimo_uso[clave] = ahora
+
+        # Las páginas fuera de la ventana se olvidan: la memoria es O(conjunto de trabajo)
+        limite = ahora - self.tau
+        conjuntos = {}
+        for clave in [clave for clave, instante in ultimo_uso.items() if instante < limite]:
+            del ultimo_uso[clave]
+        for proceso_id, _pagina in ultimo_uso:
+            conjuntos[proceso_id] = conjuntos.get(proceso_id, 0) + 1
+        self.conjuntos_trabajo = conjuntos
+        self.demanda = sum(conjuntos.values())
+        self.proximo_muestreo = ahora + self.periodo
+
+    def reequilibrar(self):
+        """Recalcula las cuotas y recorta a los procesos que quedan por encima"""
+        tablas = self.sistema.paginacion.tabla_paginas
+        procesos = list(tablas)
+        procesos.extend(proceso_id for proceso_id in self.ventana_accesos if proceso_id not in tablas)
+        if not procesos:
+            self.cuotas = {}
+            return
+        marcos = self.marcos_base()
+        cuotas = self.estrategia.cuotas(self, procesos, marcos)
+        total = sum(cuotas.values())
+        if total > marcos:
+            # Sobresuscripción: las cuotas se reducen en proporción (mínimo un marco)
+            cuotas = {proceso_id: max(cuota * marcos // total, 1) for proceso_id, cuota in cuotas.items()}
+        self.cuotas = cuotas
+        self._recortar()
+
+    def _recortar(self):
+        paginacion = self.sistema.paginacion
+        exceso = {}
+        for proceso_id in paginacion.residentes:
+            cantidad = self.residentes_base(proceso_id)
+            sobra = cantidad - self.cuotas.get(proceso_id, cantidad)
+            if sobra > 0:
+                exceso[proceso_id] = sobra
+        pendientes = sum(exceso.values())
+        if not pendientes:
+            return
+        victimas = []
+        for clave in paginacion.paginas_en_memoria:  # de la menos a la más recientemente usada
+            if exceso.get(clave[0], 0) > 0:
+                exceso[clave[0]] -= 1
+                victimas.append(clave)
+                pendientes -= 1
+                if not pendientes:
+                    break
+        for proceso_id, pagina in victimas:
+            self.sistema.desalojar_pagina(proceso_id, pagina)
+        self.desalojos += len(victimas)
+
+    def _menos_usada(self, procesos):
+        for clave in self.sistema.paginacion.paginas_en_memoria:
+            if clave[0] in procesos:
+                return clave
+        return None
+
+    # --- resultados -------------------------------------------------------------
+
+    def procesos_a_suspender(self):
+        """Procesos (de mayor a menor conjunto de trabajo) cuya suspensión elimina la hiperpaginación"""
+        exceso = self.demanda - self.marcos_base()
+        suspender = []
+        for proceso_id, tamano in sorted(self.conjuntos_trabajo.items(), key=lambda par: -par[1]):
+            if exceso <= 0:
+                break
+            suspender.append(proceso_id)
+            exceso -= tamano
+        return suspender
+
+    def informe(self):
+        """Retorna las estadísticas globales y por proceso como diccionario"""
+        residentes = self.sistema.paginacion.residentes
+        procesos = {}
+        for proceso_id in sorted(set(self.accesos) | set(self.cuotas)):
+            accesos = self.accesos.get(proceso_id, 0)
+            fallos = self.fallos.get(proceso_id, 0)
+            procesos[proceso_id] = {
+                'accesos': accesos,
+                'fallos': fallos,
+                'tasa_fallos': fallos / accesos * 100 if accesos else 0,
+                'residentes': residentes.get(proceso_id, 0),
+                'cuota': self.cuotas.get(proceso_id, 0),
+                'conjunto_trabajo': self.conjuntos_trabajo.get(proceso_id, 0),
+            }
+        accesos = sum(self.accesos.values())
+        fallos = sum(self.fallos.values())
+        return {
+            'estrategia': self.estrategia.nombre,
+            'marcos': self.marcos,
+            'tau': self.tau,
+            'periodo': self.periodo,
+            'accesos': accesos,
+            'fallos': fallos,
+            'tasa_fallos': fallos / accesos * 100 if accesos else 0,
+            'demanda_conjuntos': self.demanda,
+            'hiperpaginacion': self.hiperpaginacion,
+            'periodos': self.periodos,
+            'periodos_hiperpaginacion': self.periodos_hiperpaginacion,
+            'desalojos_reequilibrio': self.desalojos,
+            'suspender': self.procesos_a_suspender() if self.hiperpaginacion else [],
+            'procesos': procesos,
+        }
+
+def imprimir_informe(informe, salida=None):
+    """Imprime el informe en texto legible"""
+    print(f"=== {informe['estrategia']} ===", file=salida)
+    print(f"Marcos: {informe['marcos']}  τ: {informe['tau']}  periodo: {informe['periodo']}", file=salida)
+    print(f"Accesos: {informe['accesos']:,}  fallos: {informe['fallos']:,} ({informe['tasa_fallos']:.2f}%)",
+          file=salida)
+    print(f"Demanda de conjuntos de trabajo: {informe['demanda_conjuntos']} marcos; "
+          f"hiperpaginación en {informe['periodos_hiperpaginacion']} de {informe['periodos']} periodos",
+          file=salida)
+    if informe['suspender']:
+        print(f"Suspender para salir de la hiperpaginación: {informe['suspender']}", file=salida)
+    print("Proceso   Accesos    Fallos   Tasa %   Residentes   Cuota   W(τ)", file=salida)
+    for proceso_id, datos in informe['procesos'].items():
+        print(f"{proceso_id:<8}{datos['accesos']:>9}{datos['fallos']:>10}{datos['tasa_fallos']:>9.2f}"
+              f"{datos['residentes']:>13}{datos['cuota']:>8}{datos['conjunto_trabajo']:>7}", file=salida)
+
+def main(argv=None):
+    from memoria import SistemaMemoria
+    from trazas_memoria import MODELOS, GeneradorTrazas, reproducir
+    from utils import CONFIGURACION_POR_DEFECTO
+
+    parser = argparse.ArgumentParser(description="Compara estrategias de reparto de marcos entre procesos")
+    parser.add_argument('--estrategia', choices=sorted(ESTRATEGIAS), default='conjunto_trabajo')
+    parser.add_argument('--comparar', action='store_true',
+                        help="Ejecuta todas las estrategias (y el reemplazo global) con la misma traza")
+    parser.add_argument('--procesos', type=int, default=8)
+    parser.add_argument('--referencias', type=int, default=500_000)
+    parser.add_argument('--modelo', choices=MODELOS, default='conjunto_trabajo')
+    parser.add_argument('--paginas-proceso', type=int, default=128)
+    parser.add_argument('--tamano-conjunto', type=int, default=16, help="Páginas del conjunto de trabajo de la traza")
+    parser.add_argument('--memoria-kb', type=int, default=256)
+    parser.add_argument('--tau', type=int, default=10000, help="Ventana del conjunto de trabajo en referencias")
+    parser.add_argument('--periodo', type=int, default=1000, help="Referencias entre muestreos")
+    parser.add_argument('--umbral', type=float, default=0.1,
+                        help="Fallos por referencia a partir de los que hay hiperpaginación")
+    parser.add_argument('--semilla', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    nombres = ['global'] + sorted(ESTRATEGIAS) if args.comparar else [args.estrategia]
+    for nombre in nombres:
+        sistema = SistemaMemoria(dict(CONFIGURACION_POR_DEFECTO, tamano_memoria_principal=args.memoria_kb))
+        if nombre != 'global':
+            sistema.activar_asignacion(estrategia=nombre, tau=args.tau, periodo=args.periodo,
+                                       umbral_hiperpaginacion=args.umbral)
+        # Cada estrategia recibe una traza idéntica
+        generador = GeneradorTrazas(args.procesos, args.modelo, paginas_proceso=args.paginas_proceso,
+                                    tamano_conjunto=args.tamano_conjunto, semilla=args.semilla)
+        inicio = time.perf_counter()
+        resultado = reproducir(sistema, generador.bloques(args.referencias))
+        segundos = time.perf_counter() - inicio
+        if sistema.asignacion is not None:
+            imprimir_informe(sistema.asignacion.informe())
+        else:
+            print("=== global ===")
+            print(f"Accesos: {resultado['accesos']:,}  fallos: {resultado['fallos_pagina']:,} "
+                  f"({resultado['tasa_fallos_pagina']:.2f}%)")
+        print(f"Tiempo real: {segundos:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
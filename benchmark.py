@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de las rutas críticas del simulador con control de regresiones.
+
+Cada caso mide operaciones por segundo (la mejor de varias repeticiones).
+Con --guardar los resultados se escriben como línea base en JSON; en las
+ejecuciones siguientes se comparan contra ella y el programa termina con
+código 1 si algún caso cae más del umbral.
+
+Uso:
+    python benchmark.py --guardar              # crear o actualizar la línea base
+    python benchmark.py                        # comparar contra la línea base
+    python benchmark.py --filtro memoria --umbral 0.1
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import random
+import sys
+import time
+from microprocesador import Microprocesador, Cache, MMU
+from memoria import SistemaMemoria, GestorPaginacion, GestorSegmentacion, Proceso
+from utils import CONFIGURACION_POR_DEFECTO
+
+LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'linea_base_benchmark.json')
+UMBRAL_POR_DEFECTO = 0.2  # caída relativa de ops/s tolerada
+
+SEMILLA = 1234
+BENCHMARKS = {}
+
+def benchmark(nombre):
+    """Registra una función que prepara un caso y retorna (operación sin argumentos, ops por llamada)"""
+    def registrar(funcion):
+        BENCHMARKS[nombre] = funcion
+        return funcion
+    return registrar
+
+def medir(preparar, repeticiones=5, tiempo_minimo=0.2):
+    """Retorna las mejores ops/s de `repeticiones` mediciones de al menos `tiempo_minimo` segundos"""
+    mejor = 0.0
+    for _ in range(repeticiones):
+        operacion, ops_por_llamada = preparar()
+        llamadas = 0
+        inicio = time.perf_counter()
+        while True:
+            operacion()
+            llamadas += 1
+            transcurrido = time.perf_counter() - inicio
+            if transcurrido >= tiempo_minimo:
+                break
+        mejor = max(mejor, llamadas * ops_por_llamada / transcurrido)
+    return mejor
+
+class _Omitido(Exception):
+    """El caso no puede ejecutarse en este entorno"""
+
+# --- Microprocesador -------------------------------------------------------
+
+def _instrucciones_aritmeticas(cantidad):
+    aleatorio = random.Random(SEMILLA)
+    return [(aleatorio.randint(1, 3) << 24) | (aleatorio.randint(1, 2) << 16) | (aleatorio.randint(0, 255) << 8)
+            for _ in range(cantidad)]
+
+@benchmark('cpu.ejecutar_instruccion')
+def _bench_ejecutar_instruccion():
+    micro = Microprocesador()
+    instrucciones = _instrucciones_aritmeticas(10000)
+    ejecutar = micro.ejecutar_instruccion
+
+    def operacion():
+        for instruccion in instrucciones:
+            ejecutar(instruccion)
+    return operacion, len(instrucciones)
+
+@benchmark('cpu.ejecutar_programa')
+def _bench_ejecutar_programa():
+    instrucciones = _instrucciones_aritmeticas(10000)
+    config = dict(CONFIGURACION_POR_DEFECTO)
+
+    def operacion():
+        micro = Microprocesador(config['tamano_cache_l1'], config['tamano_cache_l2'])
+        sistema = SistemaMemoria(config)
+        proceso = Proceso(1, 'bench', 40, instrucciones)
+        sistema.asignar_memoria(proceso, len(instrucciones) * 4)
+        micro.conectar_memoria(sistema)
+        micro.cargar_programa(proceso)
+        micro.ejecutar_programa()
+    return operacion, len(instrucciones)
+
+# --- Cache y MMU ------------------------------------------------------------
+
+@benchmark('cache.leer')
+def _bench_cache_leer():
+    cache = Cache(64)
+    direcciones = [i * 4 for i in range(4096)]
+    for direccion in direcciones:
+        cache.escribir(direccion, direccion)
+    # Mitad impactos, mitad fallos
+    direcciones += [(i + 1 << 20) for i in range(4096)]
+    leer = cache.leer
+
+    def operacion():
+        for direccion in direcciones:
+            leer(direccion)
+    return operacion, len(direcciones)
+
+@benchmark('cache.escribir')
+def _bench_cache_escribir():
+    cache = Cache(4)  # 1024 palabras: casi todas las escrituras desalojan
+    direcciones = [i * 4 for i in range(8192)]
+    escribir = cache.escribir
+
+    def operacion():
+        for direccion in direcciones:
+            escribir(direccion, direccion)
+    return operacion, len(direcciones)
+
+@benchmark('mmu.traducir_direccion')
+def _bench_mmu():
+    mmu = MMU()
+    aleatorio = random.Random(SEMILLA)
+    referencias = [(aleatorio.randrange(1 << 22), aleatorio.randint(1, 8)) for _ in range(10000)]
+    traducir = mmu.traducir_direccion
+
+    def operacion():
+        for direccion, proceso_id in referencias:
+            traducir(direccion, proceso_id)
+    return operacion, len(referencias)
+
+# --- Sistema de memoria -------------------------------------------------------
+
+def _traza(cantidad, procesos, paginas_proceso, tamano_pagina):
+    """Referencias reproducibles; con NumPy se usa el modelo de conjunto de trabajo"""
+    try:
+        from trazas_memoria import generar_traza
+    except ImportError:
+        aleatorio = random.Random(SEMILLA)
+        return [(aleatorio.randrange(paginas_proceso * tamano_pagina), aleatorio.randint(1, procesos),
+                 'escritura' if aleatorio.random() < 0.3 else 'lectura') for _ in range(cantidad)]
+    direcciones, proceso_ids, escrituras = generar_traza(
+        cantidad, procesos=procesos, paginas_proceso=paginas_proceso, tamano_pagina=tamano_pagina,
+        semilla=SEMILLA)
+    return list(zip(direcciones.tolist(), proceso_ids.tolist(),
+                    ['escritura' if e else 'lectura' for e in escrituras.tolist()]))
+
+def _bench_acceder_memoria(algoritmo):
+    config = dict(CONFIGURACION_POR_DEFECTO, algoritmo_reemplazo=algoritmo)
+    tamano_pagina = config['tamano_pagina'] * 1024
+    referencias = _traza(10000, 4, 64, tamano_pagina)
+
+    def preparar():
+        sistema = SistemaMemoria(config)
+        for proceso_id in range(1, 5):
+            sistema.asignar_memoria(Proceso(proceso_id, f"p{proceso_id}", 32), 16 * tamano_pagina)
+        acceder = sistema.acceder_memoria
+
+        def operacion():
+            for direccion, proceso_id, tipo in referencias:
+                acceder(direccion, proceso_id, tipo)
+        return operacion, len(referencias)
+    return preparar
+
+for _algoritmo in ('FIFO', 'LRU', 'OPTIMO'):
+    BENCHMARKS[f'memoria.acceder_memoria.{_algoritmo}'] = _bench_acceder_memoria(_algoritmo)
+
+@benchmark('memoria.paginacion.asignar_liberar')
+def _bench_paginacion():
+    gestor = GestorPaginacion(CONFIGURACION_POR_DEFECTO['tamano_pagina'])
+    tamanos = [random.Random(SEMILLA + i).randint(1, 64) * 1024 for i in range(64)]
+
+    def operacion():
+        for proceso_id, tamano in enumerate(tamanos):
+            gestor.asignar_memoria(proceso_id, tamano)
+        for proceso_id in range(len(tamanos)):
+            gestor.liberar_memoria(proceso_id)
+    return operacion, len(tamanos)
+
+@benchmark('memoria.segmentacion.asignar_liberar')
+def _bench_segmentacion():
+    gestor = GestorSegmentacion()
+    tamanos = [random.Random(SEMILLA + i).randint(1, 64) * 1024 for i in range(64)]
+
+    def operacion():
+        for proceso_id, tamano in enumerate(tamanos):
+            gestor.asignar_memoria(proceso_id, tamano)
+        for proceso_id in range(len(tamanos)):
+            gestor.liberar_memoria(proceso_id)
+    return operacion, len(tamanos)
+
+# --- Interfaz (sin ventana) -------------------------------------------------------
+
+class _EtiquetaFalsa:
+    """Sustituto de ttk.Label: solo guarda el texto"""
+
+    def __init__(self, texto="0"):
+        self.texto = texto
+
+    def config(self, text=None, **opciones):
+        if text is not None:
+            self.texto = text
+
+    def cget(self, opcion):
+        return self.texto
+
+class _ArbolFalso:
+    """Sustituto de ttk.Treeview con las operaciones que usan los paneles"""
+
+    def __init__(self):
+        self.filas = {}
+        self.siguiente = 0
+
+    def get_children(self):
+        return tuple(self.filas)
+
+    def delete(self, item):
+        del self.filas[item]
+
+    def insert(self, padre, indice, values=()):
+        self.siguiente += 1
+        item = f"I{self.siguiente}"
+        self.filas[item] = values
+        return item
+
+class _ReproductorFalso:
+    """Fuente de métricas fija para que los paneles no consulten psutil"""
+
+    class lector:
+        ruta = 'benchmark'
+
+    def progreso(self):
+        return 0.5
+
+def _interfaz_sin_ventana():
+    """InterfazGrafica sin Tk: los widgets se sustituyen por objetos en memoria"""
+    from interfaz import InterfazGrafica
+    from registro_metricas import CAMPOS
+
+    interfaz = InterfazGrafica(Microprocesador(), SistemaMemoria(dict(CONFIGURACION_POR_DEFECTO)),
+                               reproductor=_ReproductorFalso())
+    interfaz.muestreador.cerrar()
+    interfaz.muestra = {nombre: (1.5 if formato in 'fd' else 1024 ** 3) for nombre, formato in CAMPOS}
+    interfaz.labels_sistema = {nombre: _EtiquetaFalsa() for nombre in (
+        'label_cpu_total', 'label_ram_total', 'label_ram_usada', 'label_ram_libre', 'label_ram_porcentaje',
+        'label_procesos_activos', 'label_tiempo_activo', 'label_disco_usado')}
+    interfaz.labels_registros = {registro: _EtiquetaFalsa() for registro in interfaz.micro.registros}
+    interfaz.tree_metricas = _ArbolFalso()
+    interfaz.tree_monitoreados = _ArbolFalso()
+    return interfaz
+
+def _bench_interfaz(metodo):
+    def preparar():
+        try:
+            interfaz = _interfaz_sin_ventana()
+        except ImportError as e:
+            raise _Omitido(f"la interfaz no se puede importar ({e})")
+        return getattr(interfaz, metodo), 1
+    return preparar
+
+for _metodo in ('actualizar_info_sistema', 'actualizar_registros_simulados', 'actualizar_metricas_sistema'):
+    BENCHMARKS[f'interfaz.{_metodo}'] = _bench_interfaz(_metodo)
+
+# --- Línea base -------------------------------------------------------------
+
+def cargar_linea_base(ruta):
+    """Lee la línea base; retorna {} si no existe"""
+    try:
+        with open(ruta, encoding='utf-8') as archivo:
+            return json.load(archivo).get('resultados', {})
+    except FileNotFoundError:
+        return {}
+
+def _maquina():
+    return {'python': platform.python_version(), 'plataforma': platform.platform()}
+
+def es_linea_base_local(ruta):
+    """True si la línea base se grabó con este intérprete y esta plataforma"""
+    try:
+        with open(ruta, encoding='utf-8') as archivo:
+            datos = json.load(archivo)
+    except FileNotFoundError:
+        return False
+    return all(datos.get(clave) == valor for clave, valor in _maquina().items())
+
+def guardar_linea_base(ruta, resultados):
+    """Combina los resultados con la línea base existente y la escribe"""
+    combinados = cargar_linea_base(ruta)
+    combinados.update(resultados)
+    datos = {
+        **_maquina(),
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'resultados': dict(sorted(combinados.items())),
+    }
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(datos, archivo, indent=2, ensure_ascii=False)
+        archivo.write('\n')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del simulador con control de regresiones")
+    parser.add_argument('--filtro', default='*', help="Patrón (fnmatch) de los casos a ejecutar")
+    parser.add_argument('--repeticiones', type=int, default=5, help="Mediciones por caso; se usa la mejor")
+    parser.add_argument('--tiempo-minimo', type=float, default=0.2, help="Segundos mínimos por medición")
+    parser.add_argument('--linea-base', default=LINEA_BASE, help="Archivo JSON de la línea base")
+    parser.add_argument('--umbral', type=float, default=UMBRAL_POR_DEFECTO,
+                        help="Caída relativa de ops/s que se considera regresión")
+    parser.add_argument('--guardar', action='store_true', help="Guarda los resultados como línea base")
+    parser.add_argument('--listar', action='store_true', help="Lista los casos disponibles")
+    args = parser.parse_args(argv)
+
+    nombres = [n for n in BENCHMARKS if fnmatch.fnmatch(n, args.filtro) or args.filtro in n]
+    if args.listar:
+        print("\n".join(nombres))
+        return 0
+
+    linea_base = cargar_linea_base(args.linea_base)
+    # Las ops/s de otra máquina no sirven para detectar regresiones: solo se muestran
+    local = es_linea_base_local(args.linea_base)
+    if not linea_base:
+        print(f"Sin línea base en {args.linea_base}: use --guardar para crearla en esta máquina")
+    elif not local:
+        print(f"La línea base {args.linea_base} es de otra máquina o intérprete: "
+              f"no se marcan regresiones (use --guardar para reemplazarla)")
+    resultados = {}
+    regresiones = 0
+    print(f"{'Caso':<42}{'ops/s':>14}{'Base':>14}{'Cambio':>9}  Resultado")
+    for nombre in nombres:
+        try:
+            ops = medir(BENCHMARKS[nombre], args.repeticiones, args.tiempo_minimo)
+        except _Omitido as e:
+            print(f"{nombre:<42}{'-':>14}{'-':>14}{'-':>9}  omitido: {e}")
+            continue
+        resultados[nombre] = ops
+
+        base = linea_base.get(nombre)
+        if base:
+            cambio = ops / base - 1
+            regresion = local and cambio < -args.umbral
+            regresiones += regresion
+            estado = 'REGRESIÓN' if regresion else ('OK' if local else 'otra máquina')
+            print(f"{nombre:<42}{ops:>14,.0f}{base:>14,.0f}{cambio:>+9.1%}  {estado}")
+        else:
+            print(f"{nombre:<42}{ops:>14,.0f}{'-':>14}{'-':>9}  sin línea base")
+
+    if args.guardar:
+        guardar_linea_base(args.linea_base, resultados)
+        print(f"Línea base guardada en {args.linea_base}")
+        return 0
+    return 1 if regresiones else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
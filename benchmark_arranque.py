@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Mide el tiempo de importación del simulador con `python -X importtime`
+y lo compara contra un presupuesto. Termina con código 1 si se excede.
+
+Los presupuestos son relativos al arranque del intérprete sin importar
+nada (lo que `-X importtime` registra para `-c pass`), así que valen para
+máquinas más lentas o más rápidas. Se usa la mediana de las repeticiones y
+antes se compilan los .pyc: con PYTHONDONTWRITEBYTECODE cada medición
+volvería a compilar la fuente.
+
+Uso: python benchmark_arranque.py [--repeticiones N] [--detalle]
+"""
+
+import argparse
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+
+# Presupuesto del tiempo acumulado de importación de cada objetivo, en veces
+# el arranque del intérprete (el doble de lo medido, aprox., como margen)
+PRESUPUESTOS_RELATIVOS = {
+    'microprocesador': 1.5,
+    'memoria': 1.5,
+    'utils': 1.0,
+    'main': 4.0,
+}
+
+# Módulos de la interfaz que el núcleo no debe arrastrar
+MODULOS_PROHIBIDOS = ('tkinter', 'matplotlib', 'psutil', 'numpy')
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+def _lineas_importtime(salida):
+    """(acumulado us, propio us, nombre con sangría) de cada línea de -X importtime"""
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:'):
+            continue
+        # import time: self [us] | cumulative | imported package
+        partes = linea[len('import time:'):].split('|')
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        yield int(partes[1]), int(partes[0]), partes[2].rstrip()
+
+def medir_base():
+    """Ms de las importaciones del arranque de un intérprete que no importa nada"""
+    resultado = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'pass'],
+                               cwd=DIRECTORIO, capture_output=True, text=True, check=True)
+    # Solo las de primer nivel: las anidadas ya están en el acumulado de su padre
+    return sum(acumulado for acumulado, _, nombre in _lineas_importtime(resultado.stderr)
+               if not nombre[2:].startswith(' ')) / 1000
+
+def medir_importacion(modulo):
+    """Importa `modulo` en un intérprete nuevo; retorna (ms acumulados, líneas de importtime, prohibidos)"""
+    codigo = (f"import sys, {modulo}; "
+              f"print(','.join(m for m in {MODULOS_PROHIBIDOS!r} if m in sys.modules))")
+    resultado = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo],
+                               cwd=DIRECTORIO, capture_output=True, text=True, check=True)
+
+    acumulado_us = None
+    lineas = list(_lineas_importtime(resultado.stderr))
+    for acumulado, _, nombre in lineas:
+        if nombre.strip() == modulo:
+            acumulado_us = acumulado
+
+    prohibidos = [m for m in resultado.stdout.strip().split(',') if m]
+    return (acumulado_us or 0) / 1000, lineas, prohibidos
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de arranque del simulador")
+    parser.add_argument('--repeticiones', type=int, default=7,
+                        help="Mediciones por módulo; se usa la mediana")
+    parser.add_argument('--detalle', action='store_true',
+                        help="Muestra las 10 importaciones más costosas de cada objetivo")
+    args = parser.parse_args(argv)
+
+    compileall.compile_dir(DIRECTORIO, maxlevels=0, quiet=1)
+    base = statistics.median(medir_base() for _ in range(args.repeticiones))
+    print(f"Arranque del intérprete: {base:.2f} ms")
+
+    fallos = 0
+    print(f"{'Módulo':<18}{'Mediana (ms)':>14}{'Relativo':>10}{'Presupuesto':>13}  Resultado")
+    for modulo, presupuesto in PRESUPUESTOS_RELATIVOS.items():
+        mediciones = sorted((medir_importacion(modulo) for _ in range(args.repeticiones)), key=lambda m: m[0])
+        mediana, lineas, prohibidos = mediciones[len(mediciones) // 2]
+        relativo = mediana / base if base else 0
+
+        problemas = []
+        if relativo > presupuesto:
+            problemas.append("excede el presupuesto")
+        if prohibidos:
+            problemas.append(f"importa {', '.join(prohibidos)}")
+        fallos += bool(problemas)
+
+        print(f"{modulo:<18}{mediana:>14.2f}{relativo:>9.2f}x{presupuesto:>12}x  "
+              f"{'; '.join(problemas) or 'OK'}")
+        if args.detalle:
+            for acumulado, propio, nombre in sorted(lineas, reverse=True)[:10]:
+                print(f"    {acumulado / 1000:>8.2f} ms {nombre}")
+
+    return 1 if fallos else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Modelo de cauce segmentado de 5 etapas (IF, ID, EX, MEM, WB).
+
+Las instrucciones se siguen ejecutando funcionalmente con el
+Microprocesador; el cauce calcula su temporización. Para cada instrucción
+se obtiene el ciclo en que entra a EX a partir de:
+
+    datos      dependencias RAW: con adelantamiento, una operación de ALU puede
+               usarse en el ciclo siguiente y una carga dos ciclos después; sin
+               adelantamiento el consumidor espera a la escritura en WB
+    control    saltos mal predichos (dirección u objetivo de la BTB): se
+               descartan las instrucciones buscadas hasta la etapa de resolución
+    memoria    búsquedas de instrucción que fallan en L1 (si hay sistema de memoria)
+               y accesos a datos (LOAD, STORE, pila) que fallan en L1
+
+El estado del cauce son arreglos (disponibilidad de registros, latches de
+etapas, tablas del predictor y la BTB), así que no se crean objetos por
+ciclo ni por instrucción y se pueden simular trazas largas.
+
+Uso:
+    python cauce_segmentado.py --instrucciones 200000 --comparar
+"""
+
+import argparse
+import sys
+import time
+from array import array
+
+ETAPAS = ('IF', 'ID', 'EX', 'MEM', 'WB')
+
+# Registros del marcador que no salen de los operandos
+REGISTRO_BANDERAS = 0
+REGISTRO_PILA = 5
+OP1, OP2 = -1, -2  # el registro codificado en el operando 1 / 2
+
+# opcode -> (registros leídos, registros escritos)
+USO_REGISTROS = {
+    0x01: ((), (OP1,)),                                  # MOV
+    0x02: ((OP1,), (OP1,)),                              # ADD
+    0x03: ((OP1,), (OP1,)),                              # SUB
+    0x05: ((), (OP1,)),                                  # LOAD [dir]
+    0x06: ((OP1,), ()),                                  # STORE [dir]
+    0x07: ((OP2,), (OP1,)),                              # LOAD [reg]
+    0x08: ((OP1, OP2), ()),                              # STORE [reg]
+    0x09: ((OP1,), (REGISTRO_BANDERAS,)),                # CMP
+    0x0A: ((REGISTRO_BANDERAS,), ()),                    # JZ
+    0x0B: ((REGISTRO_BANDERAS,), ()),                    # JNZ
+    0x0C: ((REGISTRO_BANDERAS,), ()),                    # JL
+    0x0D: ((REGISTRO_BANDERAS,), ()),                    # JG
+    0x0E: ((OP1, REGISTRO_PILA), (REGISTRO_PILA,)),      # PUSH
+    0x0F: ((REGISTRO_PILA,), (OP1, REGISTRO_PILA)),      # POP
+    0x10: ((REGISTRO_PILA,), (REGISTRO_PILA,)),          # CALL
+    0x11: ((REGISTRO_PILA,), (REGISTRO_PILA,)),          # RET
+}
+SALTOS = {0x04, 0x0A, 0x0B, 0x0C, 0x0D, 0x10, 0x11}
+ACCESOS_MEMORIA = {0x05, 0x06, 0x07, 0x08, 0x0E, 0x0F, 0x10, 0x11}
+# Ciclos desde EX hasta que el resultado en el operando 1 se puede adelantar
+# (1 para la ALU, 2 para las cargas que lo obtienen en MEM)
+LATENCIA_RESULTADO = {0x05: 2, 0x07: 2, 0x0F: 2}
+NUM_REGISTROS = 256
+# Sin adelantamiento: el productor escribe en WB (EX + 2) y el consumidor lee en la segunda mitad de ese ciclo
+ESPERA_SIN_ADELANTAMIENTO = 3
+
+LATENCIAS_POR_DEFECTO = {'cache_l2': 10, 'memoria': 100}
+
+# --- Predictores de saltos -----------------------------------------------------
+
+class PredictorEstatico:
+    """Siempre predice lo mismo"""
+
+    def __init__(self, tomado=False):
+        self.tomado = tomado
+
+    def predecir(self, pc):
+        return self.tomado
+
+    def actualizar(self, pc, tomado):
+        pass
+
+class PredictorDosBits:
+    """Tabla de contadores saturados de 2 bits indexada por PC"""
+
+    def __init__(self, entradas=1024):
+        if entradas & (entradas - 1):
+            raise ValueError("El número de entradas debe ser potencia de 2")
+        self.mascara = entradas - 1
+        self.contadores = array('B', [1]) * entradas  # débilmente no tomado
+
+    def indice(self, pc):
+        return pc & self.mascara
+
+    def predecir(self, pc):
+        return self.contadores[self.indice(pc)] >= 2
+
+    def actualizar(self, pc, tomado):
+        indice = self.indice(pc)
+        contador = self.contadores[indice]
+        if tomado:
+            if contador < 3:
+                self.contadores[indice] = contador + 1
+        elif contador > 0:
+            self.contadores[indice] = contador - 1
+
+class PredictorGshare(PredictorDosBits):
+    """Contadores de 2 bits indexados por PC XOR historia global"""
+
+    def __init__(self, entradas=1024, bits_historia=8):
+        super().__init__(entradas)
+        self.mascara_historia = (1 << bits_historia) - 1
+        self.historia = 0
+
+    def indice(self, pc):
+        return (pc ^ self.historia) & self.mascara
+
+    def actualizar(self, pc, tomado):
+        super().actualizar(pc, tomado)
+        self.historia = ((self.historia << 1) | tomado) & self.mascara_historia
+
+PREDICTORES = {
+    'no_tomado': lambda **opciones: PredictorEstatico(False),
+    'tomado': lambda **opciones: PredictorEstatico(True),
+    'dosbits': PredictorDosBits,
+    'gshare': PredictorGshare,
+}
+
+def crear_predictor(nombre, **opciones):
+    """Instancia un predictor por nombre ('no_tomado', 'tomado', 'dosbits', 'gshare')"""
+    if nombre not in PREDICTORES:
+        raise ValueError(f"Predictor desconocido: {nombre}")
+    return PREDICTORES[nombre](**opciones)
+
+# --- Cauce -----------------------------------------------------------------------
+
+class CauceSegmentado:
+    """Temporización de 5 etapas para un Microprocesador"""
+
+    def __init__(self, micro, predictor='dosbits', adelantamiento=True, etapa_resolucion='EX',
+                 entradas_btb=256, latencias=None, **opciones_predictor):
+        if etapa_resolucion not in ('ID', 'EX'):
+            raise ValueError("Los saltos se resuelven en ID o en EX")
+        if entradas_btb & (entradas_btb - 1):
+            raise ValueError("El número de entradas de la BTB debe ser potencia de 2")
+        self.micro = micro
+        self.predictor = crear_predictor(predictor, **opciones_predictor) if isinstance(predictor, str) else predictor
+        self.adelantamiento = adelantamiento
+        self.penalizacion = ETAPAS.index(etapa_resolucion)  # instrucciones descartadas
+        self.latencias = dict(LATENCIAS_POR_DEFECTO, **(latencias or {}))
+        self.mascara_btb = entradas_btb - 1
+        self.btb_pc = array('q', [-1]) * entradas_btb
+        self.btb_objetivo = array('q', [0]) * entradas_btb
+        self.disponible = array('q', [0]) * NUM_REGISTROS  # ciclo desde el que cada registro puede entrar a EX
+        self.latches = array('Q', [0]) * len(ETAPAS)       # palabra de instrucción en cada etapa
+        self.ciclo_ex = 0
+        self.reiniciar_estadisticas()
+
+    def reiniciar_estadisticas(self):
+        """Pone a cero los contadores de ciclos y de predicción"""
+        self.instrucciones = 0
+        self.paradas = {'datos': 0, 'control': 0, 'memoria': 0, 'llenado': 0}
+        self.saltos = 0
+        self.aciertos = 0
+
+    def ejecutar(self, limite_instrucciones=None):
+        """Ejecuta el programa cargado en el microprocesador; retorna las instrucciones ejecutadas"""
+        micro = self.micro
+        programa = micro.programa_actual
+        if programa is None:
+            return 0
+        registros = micro.registros
+        total = len(programa.instrucciones)
+        sistema = micro.sistema_memoria
+        buscar = micro.buscar_instruccion if sistema is not None else programa.instrucciones.__getitem__
+        ejecutar = micro.ejecutar_instruccion
+        l1, l2 = micro.cache_l1, micro.cache_l2
+        lat_l2 = self.latencias['cache_l2']
+        lat_memoria = self.latencias['memoria']
+        disponible = self.disponible
+        latches = self.latches
+        ultima_etapa = len(ETAPAS) - 1
+        predictor = self.predictor
+        btb_pc, btb_objetivo, mascara_btb = self.btb_pc, self.btb_objetivo, self.mascara_btb
+        penalizacion = self.penalizacion
+        adelantamiento = self.adelantamiento
+        uso_registros = USO_REGISTROS
+        saltos = SALTOS
+        accesos_memoria = ACCESOS_MEMORIA
+        latencia_resultado = LATENCIA_RESULTADO
+
+        ciclo_ex = self.ciclo_ex
+        posicion = self.instrucciones
+        datos = control = memoria = 0
+        saltos_vistos = aciertos = 0
+        ejecutadas = 0
+        micro.estado = "EJECUTANDO"
+        while 0 <= registros['PC'] < total:
+            if limite_instrucciones is not None and ejecutadas >= limite_instrucciones:
+                micro.estado = "INTERRUMPIDO"
+                break
+            pc = registros['PC']
+
+            # IF: una búsqueda que falla en L1 detiene el cauce
+            impactos_l1, impactos_l2 = l1.impactos, l2.impactos
+            instruccion = buscar(pc)
+            ciclo = ciclo_ex + 1
+            if sistema is not None and l1.impactos == impactos_l1:
+                espera = lat_l2 if l2.impactos != impactos_l2 else lat_l2 + lat_memoria
+                memoria += espera
+                ciclo += espera
+
+            # ID/EX: dependencias de datos
+            opcode = instruccion >> 24
+            operando1 = (instruccion >> 16) & 0xFF
+            operando2 = (instruccion >> 8) & 0xFF
+            uso = uso_registros.get(opcode)
+            if uso is not None:
+                for fuente in uso[0]:
+                    registro = operando1 if fuente == OP1 else operando2 if fuente == OP2 else fuente
+                    if disponible[registro] > ciclo:
+                        datos += disponible[registro] - ciclo
+                        ciclo = disponible[registro]
+            ciclo_ex = ciclo
+
+            if opcode in accesos_memoria:
+                # MEM: los fallos de datos en L1 detienen el cauce
+                accesos_l1, impactos_l1 = l1.accesos, l1.impactos
+                accesos_l2, impactos_l2 = l2.accesos, l2.impactos
+                ejecutar(instruccion)
+                espera = ((l1.accesos - accesos_l1 - l1.impactos + impactos_l1) * lat_l2
+                          + (l2.accesos - accesos_l2 - l2.impactos + impactos_l2) * lat_memoria)
+                memoria += espera
+                ciclo_ex += espera
+            else:
+                ejecutar(instruccion)
+            ejecutadas += 1
+            if uso is not None:
+                for destino in uso[1]:
+                    if destino == OP1:
+                        disponible[operando1] = ciclo_ex + (latencia_resultado.get(opcode, 1) if adelantamiento
+                                                         else ESPERA_SIN_ADELANTAMIENTO)
+                    else:
+                        disponible[operando2 if destino == OP2 else destino] = ciclo_ex + (
+                            1 if adelantamiento else ESPERA_SIN_ADELANTAMIENTO)
+
+            # Saltos: dirección por el predictor, objetivo por la BTB
+            if opcode in saltos:
+                destino = registros['PC']
+                tomado = destino != pc + 1
+                indice = pc & mascara_btb
+                acierto = predictor.predecir(pc) == tomado and (
+                    not tomado or (btb_pc[indice] == pc and btb_objetivo[indice] == destino))
+                predictor.actualizar(pc, tomado)
+                if tomado:
+                    btb_pc[indice] = pc
+                    btb_objetivo[indice] = destino
+                saltos_vistos += 1
+                if acierto:
+                    aciertos += 1
+                else:
+                    control += penalizacion
+                    ciclo_ex += penalizacion
+
+            latches[(posicion + ejecutadas) % len(latches)] = instruccion
+
+        if ejecutadas:
+            self.paradas['llenado'] += ultima_etapa
+        self.ciclo_ex = ciclo_ex
+        self.instrucciones += ejecutadas
+        self.paradas['datos'] += datos
+        self.paradas['control'] += control
+        self.paradas['memoria'] += memoria
+        self.saltos += saltos_vistos
+        self.aciertos += aciertos
+        micro.ciclos += datos + control + memoria + (ultima_etapa if ejecutadas else 0)
+        if micro.estado == "EJECUTANDO":
+            micro.estado = "DETENIDO"
+        return ejecutadas
+
+    def etapas(self):
+        """Palabras de instrucción de las últimas instrucciones por etapa (WB la más antigua)"""
+        cantidad = len(self.latches)
+        return {etapa: self.latches[(self.instrucciones - desplazamiento) % cantidad]
+                for desplazamiento, etapa in enumerate(reversed(ETAPAS)) if desplazamiento < self.instrucciones}
+
+    @property
+    def ciclos(self):
+        return self.instrucciones + sum(self.paradas.values())
+
+    def informe(self):
+        """CPI total y desglosado por causa"""
+        instrucciones = self.instrucciones or 1
+        return {
+            'instrucciones': self.instrucciones,
+            'ciclos': self.ciclos,
+            'cpi': self.ciclos / instrucciones,
+            'cpi_desglose': {'base': 1.0 if self.instrucciones else 0.0,
+                             **{causa: ciclos / instrucciones for causa, ciclos in self.paradas.items()}},
+            'paradas': dict(self.paradas),
+            'predictor': type(self.predictor).__name__,
+            'adelantamiento': self.adelantamiento,
+            'saltos': self.saltos,
+            'tasa_aciertos': self.aciertos / self.saltos * 100 if self.saltos else 0,
+        }
+
+def imprimir_informe(informe, titulo=None, salida=None):
+    """Imprime el CPI desglosado"""
+    if titulo:
+        print(f"=== {titulo} ===", file=salida)
+    desglose = informe['cpi_desglose']
+    print(f"Instrucciones: {informe['instrucciones']:,}  ciclos: {informe['ciclos']:,}  CPI: {informe['cpi']:.3f}",
+          file=salida)
+    print("  " + "  ".join(f"{causa} {valor:.3f}" for causa, valor in desglose.items()), file=salida)
+    if informe['saltos']:
+        print(f"  saltos: {informe['saltos']:,}  aciertos: {informe['tasa_aciertos']:.1f}%", file=salida)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula el cauce segmentado de 5 etapas")
+    parser.add_argument('--instrucciones', type=int, default=100_000, help="Instrucciones a ejecutar")
+    parser.add_argument('--tamano', type=int, default=4096, help="Instrucciones del programa generado")
+    parser.add_argument('--predictor', choices=sorted(PREDICTORES), default='dosbits')
+    parser.add_argument('--sin-adelantamiento', action='store_true')
+    parser.add_argument('--resolucion', choices=('ID', 'EX'), default='EX', help="Etapa que resuelve los saltos")
+    parser.add_argument('--localidad', default='bucles', help="Localidad de los saltos (generador_cargas)")
+    parser.add_argument('--con-memoria', action='store_true', help="Buscar instrucciones a través de las caches")
+    parser.add_argument('--comparar', action='store_true', help="Comparar todos los predictores con y sin adelantamiento")
+    parser.add_argument('--semilla', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    from generador_cargas import generar_programa
+    from memoria import Proceso, SistemaMemoria
+    from microprocesador import Microprocesador
+    from utils import CONFIGURACION_POR_DEFECTO
+
+    instrucciones = [int(palabra) for palabra in
+                     generar_programa(args.tamano, semilla=args.semilla, localidad=args.localidad)[0]]
+    config = dict(CONFIGURACION_POR_DEFECTO)
+
+    def correr(predictor, adelantamiento):
+        micro = Microprocesador(config['tamano_cache_l1'], config['tamano_cache_l2'])
+        programa = Proceso(1, "cauce", args.tamano * 4 // 1024 or 1, instrucciones)
+        if args.con_memoria:
+            sistema = SistemaMemoria(config)
+            sistema.asignar_memoria(programa, len(instrucciones) * 4)
+            micro.conectar_memoria(sistema)
+        micro.cargar_programa(programa)
+        cauce = micro.activar_cauce(predictor=predictor, adelantamiento=adelantamiento,
+                                    etapa_resolucion=args.resolucion)
+        inicio = time.perf_counter()
+        restantes = args.instrucciones
+        while restantes > 0:
+            ejecutadas = micro.ejecutar_programa(limite_ciclos=restantes)
+            restantes -= ejecutadas
+            if restantes > 0:
+                micro.cargar_programa(programa)  # el programa terminó: se vuelve a empezar
+                if not ejecutadas:
+                    break
+        informe = cauce.informe()
+        informe['tiempo_real_s'] = time.perf_counter() - inicio
+        return informe
+
+    casos = ([(p, a) for a in (True, False) for p in sorted(PREDICTORES)] if args.comparar
+             else [(args.predictor, not args.sin_adelantamiento)])
+    for predictor, adelantamiento in casos:
+        informe = correr(predictor, adelantamiento)
+        imprimir_informe(informe, f"{predictor}, {'con' if adelantamiento else 'sin'} adelantamiento")
+        print(f"  {informe['instrucciones'] / informe['tiempo_real_s']:,.0f} instrucciones/s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
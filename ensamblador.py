@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Ensamblador y desensamblador para la ISA del simulador.
+
+Sintaxis (una instrucción por línea, mayúsculas o minúsculas):
+
+    ; comentario
+    .entrada inicio        ; punto de entrada (etiqueta o número)
+    inicio: MOV CX, 10
+            MOV BX, 64
+    bucle:  LOAD AX, [0x100]      ; dirección de datos absoluta de 16 bits
+            ADD AX, 1
+            STORE AX, [BX]        ; direccionamiento indirecto por registro
+            CALL rutina
+            SUB CX, 1
+            CMP CX, 0
+            JNZ bucle
+            JMP inicio
+    rutina: PUSH DX
+            POP DX
+            RET
+    tabla:  .palabra 0xDEADBEEF  ; palabra literal entre las instrucciones
+
+Las etiquetas son índices de instrucción: sirven para saltos, llamadas y
+.entrada, pero no como operando de memoria, porque los datos de LOAD/STORE
+están en otro espacio y .palabra no los inicializa.
+
+El resultado es una imagen .simx (ver imagen_programa). Las imágenes se
+guardan en una cache indexada por el hash de la fuente y las líneas ya
+analizadas se reutilizan cuando la fuente cambia. Los archivos de la cache
+menos usados se borran cuando ocupa más de LIMITE_CACHE bytes.
+
+Uso:
+    python ensamblador.py ensamblar programa.asm programa.simx
+    python ensamblador.py desensamblar programa.simx
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from array import array
+from imagen_programa import escribir_imagen, cargar_imagen
+
+VERSION_ENSAMBLADOR = 4
+
+# Tamaño máximo del directorio de cache (imágenes y memos de líneas)
+LIMITE_CACHE = 1 << 30
+
+# Mnemónico -> (opcode, tipos de operandos). 'reg' y 'dir' van en el byte del
+# operando 1 (bits 16-23), 'imm' en el del operando 2 (bits 8-15) y 'dir16'
+# en los bits 0-15. 'mem' es [dir16] o [registro]; la forma indirecta usa el
+# opcode de INDIRECTAS con el registro base en el operando 2.
+INSTRUCCIONES = {
+    'MOV': (0x01, ('reg', 'imm')),
+    'ADD': (0x02, ('reg', 'imm')),
+    'SUB': (0x03, ('reg', 'imm')),
+    'JMP': (0x04, ('dir',)),
+    'LOAD': (0x05, ('reg', 'mem')),
+    'STORE': (0x06, ('reg', 'mem')),
+    'CMP': (0x09, ('reg', 'imm')),
+    'JZ': (0x0A, ('dir16',)),
+    'JNZ': (0x0B, ('dir16',)),
+    'JL': (0x0C, ('dir16',)),
+    'JG': (0x0D, ('dir16',)),
+    'PUSH': (0x0E, ('reg',)),
+    'POP': (0x0F, ('reg',)),
+    'CALL': (0x10, ('dir16',)),
+    'RET': (0x11, ()),
+}
+INDIRECTAS = {'LOAD': 0x07, 'STORE': 0x08}
+REGISTROS = {'AX': 0x01, 'BX': 0x02, 'CX': 0x03, 'DX': 0x04}
+
+# Campo de cada tipo de operando: (desplazamiento, valor máximo)
+_CAMPOS = {'reg': (16, 0xFF), 'dir': (16, 0xFF), 'imm': (8, 0xFF), 'dir16': (0, 0xFFFF), 'mem': (0, 0xFFFF)}
+
+_MNEMONICO_DE = {opcode: (mnemonico, tipos) for mnemonico, (opcode, tipos) in INSTRUCCIONES.items()}
+_MNEMONICO_DE.update({opcode: (mnemonico, ('reg', 'ind')) for mnemonico, opcode in INDIRECTAS.items()})
+_REGISTRO_DE = {codigo: nombre for nombre, codigo in REGISTROS.items()}
+
+# Bits que usa cada forma de instrucción (el resto los ignora el procesador)
+_BITS_USADOS = {
+    ('reg', 'imm'): 0xFFFFFF00, ('dir',): 0xFFFF0000, ('dir16',): 0xFF00FFFF,
+    ('reg', 'mem'): 0xFFFFFFFF, ('reg', 'ind'): 0xFFFFFF00, ('reg',): 0xFFFF0000, (): 0xFF000000,
+}
+
+# Compiladas una sola vez para todo el módulo
+_LINEA = re.compile(r'^\s*(?:([A-Za-z_.$][\w.$]*)\s*:)?\s*(?:([.A-Za-z]\w*)\s*(.*?))?\s*$')
+_SEPARADOR = re.compile(r'\s*,\s*')
+_IDENTIFICADOR = re.compile(r'^[A-Za-z_.$][\w.$]*$')
+
+class ErrorEnsamblado(ValueError):
+    """Error de sintaxis o de operandos en la fuente"""
+
+    def __init__(self, mensaje, linea=None):
+        super().__init__(f"línea {linea}: {mensaje}" if linea else mensaje)
+        self.linea = linea
+
+def _numero(texto):
+    return int(texto, 0)
+
+class Ensamblador:
+    """Ensambla fuentes a palabras de 32 bits reutilizando las líneas ya analizadas"""
+
+    def __init__(self, limite_memo=1 << 20):
+        # texto de la línea -> (etiqueta, mnemónico, operandos, palabras, símbolo)
+        self.memo = {}
+        self.limite_memo = limite_memo
+        self.lineas_analizadas = 0
+
+    def analizar_linea(self, texto, numero=None):
+        """Analiza y codifica una línea; lo que depende de etiquetas queda en 'símbolo'
+
+        Las palabras ya codificadas se guardan en el memo, así que una línea que
+        no cambió no se vuelve a analizar.
+        """
+        analizada = self.memo.get(texto)
+        if analizada is not None:
+            return analizada
+
+        self.lineas_analizadas += 1
+        coincidencia = _LINEA.match(texto.split(';', 1)[0])
+        if coincidencia is None:
+            raise ErrorEnsamblado(f"sintaxis inválida: {texto.strip()!r}", numero)
+        etiqueta, mnemonico, resto = coincidencia.groups()
+        operandos = tuple(_SEPARADOR.split(resto)) if resto else ()
+        palabras = ()
+        simbolo = None
+
+        if mnemonico:
+            mnemonico = mnemonico.upper()
+            if mnemonico == '.ENTRADA':
+                if len(operandos) != 1:
+                    raise ErrorEnsamblado(".entrada espera un operando", numero)
+            elif mnemonico == '.PALABRA':
+                try:
+                    palabras = tuple(_numero(op) & 0xFFFFFFFF for op in operandos)
+                except ValueError:
+                    raise ErrorEnsamblado("valor inválido en .palabra", numero)
+            elif mnemonico in INSTRUCCIONES:
+                palabra, simbolo = self._codificar(mnemonico, operandos, numero)
+                palabras = (palabra,)
+            else:
+                raise ErrorEnsamblado(f"instrucción desconocida {mnemonico}", numero)
+
+        analizada = (etiqueta, mnemonico, operandos, palabras, simbolo)
+        if len(self.memo) >= self.limite_memo:
+            self.memo.clear()
+        self.memo[texto] = analizada
+        return analizada
+
+    def _codificar(self, mnemonico, operandos, numero):
+        """Codifica una instrucción; retorna (palabra, etiqueta pendiente o None)"""
+        opcode, tipos = INSTRUCCIONES[mnemonico]
+        if len(operandos) != len(tipos):
+            raise ErrorEnsamblado(f"{mnemonico} espera {len(tipos)} operandos", numero)
+
+        palabra = opcode << 24
+        simbolo = None
+        for tipo, operando in zip(tipos, operandos):
+            if tipo == 'reg':
+                codigo = REGISTROS.get(operando.upper())
+                if codigo is None:
+                    raise ErrorEnsamblado(f"registro desconocido {operando}", numero)
+                palabra |= codigo << 16
+                continue
+            if tipo == 'mem':
+                if not (operando.startswith('[') and operando.endswith(']')):
+                    raise ErrorEnsamblado(f"se esperaba [dirección] o [registro]: {operando}", numero)
+                operando = operando[1:-1].strip()
+                base = REGISTROS.get(operando.upper())
+                if base is not None:
+                    palabra = (INDIRECTAS[mnemonico] << 24) | (palabra & 0x00FFFFFF) | (base << 8)
+                    continue
+                if _IDENTIFICADOR.match(operando):
+                    raise ErrorEnsamblado(f"{operando} es una etiqueta de instrucción; "
+                                          f"{mnemonico} espera una dirección de datos numérica", numero)
+            desplazamiento, maximo = _CAMPOS[tipo]
+            try:
+                valor = _numero(operando)
+            except ValueError:
+                if tipo == 'imm' or not _IDENTIFICADOR.match(operando):
+                    raise ErrorEnsamblado(f"operando inválido {operando}", numero)
+                simbolo = (operando, desplazamiento, maximo)
+                continue
+            if not 0 <= valor <= maximo:
+                raise ErrorEnsamblado(f"{operando} no cabe en {maximo.bit_length()} bits", numero)
+            palabra |= valor << desplazamiento
+        return palabra, simbolo
+
+    def ensamblar_lineas(self, lineas):
+        """Ensambla un iterable de líneas; retorna (array('I') de palabras, punto de entrada)
+
+        Las líneas se consumen en flujo: las referencias a etiquetas se anotan
+        y se resuelven al terminar, sin una segunda pasada sobre la fuente.
+        """
+        palabras = array('I')
+        etiquetas = {}
+        pendientes = []  # (índice de palabra, símbolo, línea)
+        entrada = 0
+        entrada_simbolo = None
+        memo = self.memo
+
+        for numero, texto in enumerate(lineas, start=1):
+            etiqueta, mnemonico, operandos, codificadas, simbolo = (
+                memo.get(texto) or self.analizar_linea(texto, numero))
+            if etiqueta:
+                if etiqueta in etiquetas:
+                    raise ErrorEnsamblado(f"etiqueta repetida {etiqueta}", numero)
+                etiquetas[etiqueta] = len(palabras)
+            if simbolo:
+                pendientes.append((len(palabras), simbolo, numero))
+            if codificadas:
+                palabras.extend(codificadas)
+            elif mnemonico == '.ENTRADA':
+                if _IDENTIFICADOR.match(operandos[0]):
+                    entrada_simbolo = (operandos[0], numero)
+                else:
+                    try:
+                        entrada = _numero(operandos[0])
+                    except ValueError:
+                        raise ErrorEnsamblado(".entrada inválida", numero)
+
+        # Resolver referencias hacia adelante
+        for indice, (simbolo, desplazamiento, maximo), numero in pendientes:
+            if simbolo not in etiquetas:
+                raise ErrorEnsamblado(f"etiqueta no definida {simbolo}", numero)
+            valor = etiquetas[simbolo]
+            if valor > maximo:
+                raise ErrorEnsamblado(f"{simbolo} no cabe en {maximo.bit_length()} bits", numero)
+            palabras[indice] |= valor << desplazamiento
+        if entrada_simbolo:
+            simbolo, numero = entrada_simbolo
+            if simbolo not in etiquetas:
+                raise ErrorEnsamblado(f"etiqueta no definida {simbolo}", numero)
+            entrada = etiquetas[simbolo]
+
+        return palabras, entrada
+
+    def ensamblar(self, fuente):
+        """Ensambla un texto fuente; retorna (palabras, punto de entrada)"""
+        return self.ensamblar_lineas(fuente.splitlines())
+
+def desensamblar_palabra(palabra):
+    """Retorna el texto de una instrucción
+
+    Los bits que el procesador ignora (p. ej. el byte bajo en MOV, o el
+    operando 2 en JMP) no se pueden escribir en la fuente: si no son cero se
+    anota la palabra original como comentario.
+    """
+    opcode = palabra >> 24
+    operando1 = (palabra >> 16) & 0xFF
+    operando2 = (palabra >> 8) & 0xFF
+    if opcode not in _MNEMONICO_DE:
+        return f".palabra 0x{palabra:08X}"
+
+    mnemonico, tipos = _MNEMONICO_DE[opcode]
+    registro = _REGISTRO_DE.get(operando1)
+    if tipos and tipos[0] == 'reg' and registro is None:
+        return f".palabra 0x{palabra:08X}"
+    if tipos == ('reg', 'imm'):
+        texto = f"{mnemonico} {registro}, {operando2}"
+    elif tipos == ('reg', 'mem'):
+        texto = f"{mnemonico} {registro}, [{palabra & 0xFFFF}]"
+    elif tipos == ('reg', 'ind'):
+        base = _REGISTRO_DE.get(operando2)
+        if base is None:
+            return f".palabra 0x{palabra:08X}"
+        texto = f"{mnemonico} {registro}, [{base}]"
+    elif tipos == ('reg',):
+        texto = f"{mnemonico} {registro}"
+    elif tipos == ('dir',):
+        texto = f"{mnemonico} {operando1}"
+    elif tipos == ('dir16',):
+        texto = f"{mnemonico} {palabra & 0xFFFF}"
+    else:
+        texto = mnemonico
+    ignorados = palabra & ~_BITS_USADOS[tipos] & 0xFFFFFFFF
+    return f"{texto:<16}; 0x{palabra:08X}" if ignorados else texto
+
+def desensamblar(palabras, punto_entrada=0):
+    """Retorna las líneas de fuente equivalentes a una secuencia de palabras"""
+    lineas = [f".entrada {punto_entrada}"] if punto_entrada else []
+    lineas.extend(desensamblar_palabra(palabra) for palabra in palabras)
+    return lineas
+
+def directorio_cache():
+    """Directorio de la cache de ensamblado (SIMULADOR_CACHE o ~/.cache/simuladorcpu)"""
+    base = os.environ.get('SIMULADOR_CACHE') or os.path.join(os.path.expanduser('~'), '.cache', 'simuladorcpu')
+    return os.path.join(base, 'ensamblador')
+
+def _hash_archivo(ruta):
+    resumen = hashlib.sha256(f"v{VERSION_ENSAMBLADOR}:".encode())
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(1 << 20), b''):
+            resumen.update(bloque)
+    return resumen.hexdigest()
+
+def ensamblar_archivo(ruta_fuente, ruta_salida=None, usar_cache=True, ensamblador=None):
+    """Ensambla un archivo a imagen .simx; retorna la ruta de la imagen
+
+    Con la cache activa, una fuente ya ensamblada no se vuelve a procesar y, si
+    cambió, solo se analizan las líneas nuevas (el memo de líneas se conserva
+    por archivo fuente entre ejecuciones).
+    """
+    if not usar_cache:
+        if ruta_salida is None:
+            raise ValueError("Sin cache hace falta la ruta de la imagen de salida")
+        palabras, entrada = (ensamblador or Ensamblador()).ensamblar_lineas(_leer_lineas(ruta_fuente))
+        escribir_imagen(ruta_salida, palabras, punto_entrada=entrada)
+        return ruta_salida
+
+    cache = directorio_cache()
+    os.makedirs(cache, exist_ok=True)
+    imagen_cache = os.path.join(cache, _hash_archivo(ruta_fuente) + '.simx')
+
+    if os.path.exists(imagen_cache):
+        os.utime(imagen_cache)  # la fecha de modificación marca el último uso al podar
+    else:
+        clave_fuente = hashlib.sha256(f"v{VERSION_ENSAMBLADOR}:{os.path.abspath(ruta_fuente)}".encode()).hexdigest()
+        ruta_memo = os.path.join(cache, clave_fuente + '.lineas.json')
+        if ensamblador is None:
+            ensamblador = Ensamblador()
+            ensamblador.memo = _cargar_memo(ruta_memo)
+
+        palabras, entrada = ensamblador.ensamblar_lineas(_leer_lineas(ruta_fuente))
+        temporal = f"{imagen_cache}.{os.getpid()}.tmp"
+        escribir_imagen(temporal, palabras, punto_entrada=entrada)
+        os.replace(temporal, imagen_cache)
+
+        # Solo se conservan las líneas de la versión actual de la fuente
+        vigentes = set(_leer_lineas(ruta_fuente))
+        memo = {linea: analizada for linea, analizada in ensamblador.memo.items() if linea in vigentes}
+        with open(ruta_memo + '.tmp', 'w', encoding='utf-8') as archivo:
+            json.dump(memo, archivo, ensure_ascii=False)
+        os.replace(ruta_memo + '.tmp', ruta_memo)
+        podar_cache(cache, conservar=(imagen_cache, ruta_memo))
+
+    if ruta_salida is None:
+        return imagen_cache
+    shutil.copyfile(imagen_cache, ruta_salida)
+    return ruta_salida
+
+def _cargar_memo(ruta):
+    """Memo de líneas guardado en JSON; {} si no existe o no es válido"""
+    try:
+        with open(ruta, encoding='utf-8') as archivo:
+            datos = json.load(archivo)
+        # JSON no tiene tuplas: se reconstruye (etiqueta, mnemónico, operandos, palabras, símbolo)
+        return {linea: (etiqueta, mnemonico, tuple(operandos), tuple(palabras),
+                        tuple(simbolo) if simbolo else None)
+                for linea, (etiqueta, mnemonico, operandos, palabras, simbolo) in datos.items()}
+    except (OSError, ValueError, TypeError, AttributeError):
+        return {}
+
+def podar_cache(directorio=None, limite=LIMITE_CACHE, conservar=()):
+    """Borra los archivos de la cache usados hace más tiempo hasta que ocupe `limite` bytes
+
+    Retorna los bytes liberados. Los archivos de `conservar` no se borran.
+    """
+    directorio = directorio or directorio_cache()
+    archivos = []
+    try:
+        with os.scandir(directorio) as entradas:
+            for entrada in entradas:
+                if entrada.is_file():
+                    estado = entrada.stat()
+                    archivos.append((estado.st_mtime, estado.st_size, entrada.path))
+    except FileNotFoundError:
+        return 0
+    total = sum(tamano for _, tamano, _ in archivos)
+    conservar = {os.path.abspath(ruta) for ruta in conservar}
+    liberados = 0
+    for _, tamano, ruta in sorted(archivos):
+        if total - liberados <= limite:
+            break
+        if os.path.abspath(ruta) in conservar:
+            continue
+        try:
+            os.remove(ruta)
+            liberados += tamano
+        except OSError:
+            pass
+    return liberados
+
+def _leer_lineas(ruta):
+    """Itera las líneas de un archivo sin cargarlo completo"""
+    with open(ruta, encoding='utf-8') as archivo:
+        for linea in archivo:
+            yield linea.rstrip('\n')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ensamblador y desensamblador del simulador")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    ensamblar = subparsers.add_parser('ensamblar', help="Ensambla una fuente a imagen .simx")
+    ensamblar.add_argument('fuente')
+    ensamblar.add_argument('salida')
+    ensamblar.add_argument('--sin-cache', action='store_true', help="No usar ni actualizar la cache")
+
+    desensamblar_cmd = subparsers.add_parser('desensamblar', help="Muestra la fuente de una imagen .simx")
+    desensamblar_cmd.add_argument('imagen')
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.comando == 'ensamblar':
+            ensamblar_archivo(args.fuente, args.salida, usar_cache=not args.sin_cache)
+        else:
+            with cargar_imagen(args.imagen) as imagen:
+                for linea in desensamblar(imagen.instrucciones, imagen.punto_entrada):
+                    print(linea)
+    except ErrorEnsamblado as e:
+        print(f"{args.fuente}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Exportador de métricas en formato Prometheus / OpenMetrics.
+
+Un hilo muestreador toma periódicamente las estadísticas del equipo
+(utils.obtener_estadisticas_reales) y los contadores del simulador, y publica
+una instantánea. El texto de exposición se genera una sola vez por
+instantánea y se sirve desde cache, así que el costo de cada consulta no
+depende de la frecuencia con que se consulte.
+
+Uso:
+    python exportador_metricas.py --puerto 9108
+    curl -s localhost:9108/metrics
+    curl -s -H 'Accept: application/openmetrics-text' localhost:9108/metrics
+"""
+
+import argparse
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils import obtener_estadisticas_reales
+
+TIPO_PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+TIPO_OPENMETRICS = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+def _escapar(valor):
+    return str(valor).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+def _valor(numero):
+    if isinstance(numero, float) and numero != numero:
+        return 'NaN'
+    return repr(float(numero)) if isinstance(numero, float) else str(numero)
+
+def generar_texto(familias, openmetrics=False):
+    """Texto de exposición de [(nombre, tipo, ayuda, [(etiquetas, valor)])]"""
+    lineas = []
+    for nombre, tipo, ayuda, muestras in familias:
+        # En el formato de Prometheus el nombre de un contador ya incluye _total
+        familia = nombre if openmetrics or tipo != 'counter' else nombre + '_total'
+        lineas.append(f"# HELP {familia} {ayuda}")
+        lineas.append(f"# TYPE {familia} {tipo}")
+        sufijo = '_total' if tipo == 'counter' else ''
+        for etiquetas, valor in muestras:
+            if etiquetas:
+                texto = ','.join(f'{clave}="{_escapar(v)}"' for clave, v in etiquetas.items())
+                lineas.append(f"{nombre}{sufijo}{{{texto}}} {_valor(valor)}")
+            else:
+                lineas.append(f"{nombre}{sufijo} {_valor(valor)}")
+    if openmetrics:
+        lineas.append('# EOF')
+    return ('\n'.join(lineas) + '\n').encode('utf-8')
+
+def familias_equipo(estadisticas):
+    """Familias de métricas del equipo a partir de obtener_estadisticas_reales()"""
+    if not estadisticas:
+        return []
+    cpu, memoria, swap = estadisticas['cpu'], estadisticas['memoria'], estadisticas['swap']
+    disco, red, sistema = estadisticas['disco'], estadisticas['red'], estadisticas['sistema']
+    return [
+        ('simulador_host_cpu_porcentaje', 'gauge', "Uso total de CPU del equipo",
+         [({}, cpu['total'])]),
+        ('simulador_host_cpu_nucleo_porcentaje', 'gauge', "Uso de CPU por núcleo lógico",
+         [({'nucleo': i}, valor) for i, valor in enumerate(cpu['por_nucleo'])]),
+        ('simulador_host_cpu_frecuencia_mhz', 'gauge', "Frecuencia actual de la CPU",
+         [({}, cpu['frecuencia_actual'])]),
+        ('simulador_host_memoria_bytes', 'gauge', "Memoria RAM del equipo",
+         [({'tipo': tipo}, memoria[clave]) for tipo, clave in
+          (('total', 'total'), ('usada', 'usada'), ('libre', 'libre'))]),
+        ('simulador_host_memoria_porcentaje', 'gauge', "Porcentaje de RAM usada",
+         [({}, memoria['porcentaje'])]),
+        ('simulador_host_swap_bytes', 'gauge', "Memoria de intercambio del equipo",
+         [({'tipo': 'total'}, swap['total']), ({'tipo': 'usada'}, swap['usado'])]),
+        ('simulador_host_swap_porcentaje', 'gauge', "Porcentaje de swap usado",
+         [({}, swap['porcentaje'])]),
+        ('simulador_host_disco_bytes', 'gauge', "Espacio del disco raíz",
+         [({'tipo': tipo}, disco[tipo]) for tipo in ('total', 'usado', 'libre')]),
+        ('simulador_host_disco_porcentaje', 'gauge', "Porcentaje de disco usado",
+         [({}, disco['porcentaje'])]),
+        ('simulador_host_red_bytes', 'counter', "Bytes transferidos por red",
+         [({'direccion': 'enviados'}, red['bytes_enviados']),
+          ({'direccion': 'recibidos'}, red['bytes_recibidos'])]),
+        ('simulador_host_red_paquetes', 'counter', "Paquetes transferidos por red",
+         [({'direccion': 'enviados'}, red['paquetes_enviados']),
+          ({'direccion': 'recibidos'}, red['paquetes_recibidos'])]),
+        ('simulador_host_tiempo_actividad_segundos', 'gauge', "Segundos desde el arranque del equipo",
+         [({}, sistema['tiempo_actividad'])]),
+        ('simulador_host_procesos', 'gauge', "Procesos en ejecución",
+         [({}, sistema['procesos_activos'])]),
+    ]
+
+def familias_simulador(micro=None, sistema_memoria=None):
+    """Familias de métricas del microprocesador y del sistema de memoria simulados"""
+    familias = []
+    if micro is not None:
+        caches = (('L1', micro.cache_l1), ('L2', micro.cache_l2))
+        familias += [
+            ('simulador_ciclos', 'counter', "Ciclos ejecutados por el microprocesador",
+             [({}, micro.ciclos)]),
+            ('simulador_cache_accesos', 'counter', "Accesos a cada nivel de cache",
+             [({'cache': nombre}, cache.accesos) for nombre, cache in caches]),
+            ('simulador_cache_impactos', 'counter', "Impactos en cada nivel de cache",
+             [({'cache': nombre}, cache.impactos) for nombre, cache in caches]),
+            ('simulador_cache_tasa_impactos', 'gauge', "Fracción de accesos que impactan en la cache",
+             [({'cache': nombre}, cache.impactos / cache.accesos if cache.accesos else 0.0)
+              for nombre, cache in caches]),
+        ]
+    if sistema_memoria is not None:
+        estadisticas = sistema_memoria.estadisticas
+        familias += [
+            ('simulador_memoria_accesos', 'counter', "Accesos al sistema de memoria",
+             [({}, estadisticas['accesos_memoria'])]),
+            ('simulador_fallos_pagina', 'counter', "Fallos de página",
+             [({}, estadisticas['fallos_pagina'])]),
+            ('simulador_paginas_swap', 'gauge', "Páginas en el espacio de intercambio",
+             [({}, sistema_memoria.memoria_virtual.paginas_swap)]),
+        ]
+    return familias
+
+class ExportadorMetricas:
+    """Servidor HTTP de métricas con un hilo muestreador"""
+
+    def __init__(self, micro=None, sistema_memoria=None, host='127.0.0.1', puerto=9108, intervalo=5.0,
+                 incluir_equipo=True):
+        self.micro = micro
+        self.sistema_memoria = sistema_memoria
+        self.direccion = (host, puerto)
+        self.intervalo = intervalo
+        self.incluir_equipo = incluir_equipo
+
+        self._bloqueo = threading.Lock()
+        self._familias = []
+        self._version = 0
+        self._textos = {}  # openmetrics -> (versión, bytes)
+        self._detener = threading.Event()
+        self._hilos = []
+        self.servidor = None
+        self.consultas = 0
+
+    def publicar(self, familias):
+        """Publica una instantánea nueva; el texto se regenera en la siguiente consulta"""
+        with self._bloqueo:
+            self._familias = familias
+            self._version += 1
+
+    def muestrear(self):
+        """Toma y publica una instantánea"""
+        familias = familias_equipo(obtener_estadisticas_reales()) if self.incluir_equipo else []
+        familias += familias_simulador(self.micro, self.sistema_memoria)
+        familias.append(('simulador_exportador_marca_tiempo_segundos', 'gauge',
+                         "Momento de la última instantánea", [({}, time.time())]))
+        self.publicar(familias)
+
+    def exposicion(self, openmetrics=False):
+        """Bytes de la exposición de la última instantánea (generados una vez por instantánea)"""
+        with self._bloqueo:
+            version, texto = self._textos.get(openmetrics, (None, None))
+            if version != self._version:
+                texto = generar_texto(self._familias, openmetrics)
+                self._textos[openmetrics] = (self._version, texto)
+            self.consultas += 1
+            return texto
+
+    def _bucle_muestreo(self):
+        while not self._detener.is_set():
+            try:
+                self.muestrear()
+            except Exception as e:
+                print(f"Error muestreando métricas: {e}")
+            self._detener.wait(self.intervalo)
+
+    def iniciar(self):
+        """Arranca el muestreador y el servidor en hilos de fondo"""
+        exportador = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+                cuerpo = exportador.exposicion(openmetrics)
+                self.send_response(200)
+                self.send_header('Content-Type', TIPO_OPENMETRICS if openmetrics else TIPO_PROMETHEUS)
+                self.send_header('Content-Length', str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, formato, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer(self.direccion, Manejador)
+        self.servidor.daemon_threads = True
+        self.muestrear()
+        for objetivo in (self._bucle_muestreo, self.servidor.serve_forever):
+            hilo = threading.Thread(target=objetivo, daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+        return self
+
+    @property
+    def url(self):
+        host, puerto = self.servidor.server_address[:2] if self.servidor else self.direccion
+        return f"http://{host}:{puerto}/metrics"
+
+    def detener(self):
+        """Detiene el servidor y el muestreador"""
+        self._detener.set()
+        if self.servidor:
+            self.servidor.shutdown()
+            self.servidor.server_close()
+        for hilo in self._hilos:
+            hilo.join(timeout=2)
+        self._hilos = []
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta métricas del equipo y del simulador para Prometheus")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=9108)
+    parser.add_argument('--intervalo', type=float, default=5.0, help="Segundos entre instantáneas")
+    args = parser.parse_args(argv)
+
+    from microprocesador import Microprocesador
+    from memoria import SistemaMemoria
+    from utils import CONFIGURACION_POR_DEFECTO
+
+    config = dict(CONFIGURACION_POR_DEFECTO)
+    exportador = ExportadorMetricas(Microprocesador(config['tamano_cache_l1'], config['tamano_cache_l2']),
+                                    SistemaMemoria(config), args.host, args.puerto, args.intervalo)
+    exportador.iniciar()
+    print(f"Sirviendo métricas en {exportador.url} (Ctrl+C para terminar)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        exportador.detener()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Generador vectorizado de cargas sintéticas con NumPy.
+
+Produce las palabras de instrucción por bloques, con una mezcla de opcodes
+configurable, semilla reproducible y modelos de localidad para los destinos
+de salto y para las direcciones de datos:
+
+    uniforme  destinos y direcciones sin localidad
+    bucles    bucles que se repiten `repeticiones_bucle` veces (contador en
+              CX y salto JNZ hacia atrás) y recorridos secuenciales de datos
+              que se repiten
+    zipf      destinos y páginas de datos elegidos con distribución Zipf
+
+Ningún salto apunta a sí mismo. Los destinos por debajo de 256 se codifican
+con JMP (destino de 8 bits); los demás con JNZ (destino de 16 bits), que
+sin CMP previo se toma siempre, así que el código más allá de la
+instrucción 255 también se alcanza.
+
+Las direcciones de datos (una por instrucción, en bytes) se guardan en el
+segmento 'datos' de la imagen .simx.
+
+Uso:
+    python generador_cargas.py carga.simx --instrucciones 100000000 --localidad zipf --semilla 1
+    python generador_cargas.py carga.simx --mezcla MOV=0.3,ADD=0.3,SUB=0.3,JMP=0.1
+"""
+
+import argparse
+import sys
+import time
+import numpy as np
+from imagen_programa import SEGMENTO_CODIGO, SEGMENTO_DATOS, reservar_imagen
+
+OPCODES = {'MOV': 0x01, 'ADD': 0x02, 'SUB': 0x03, 'JMP': 0x04}
+MEZCLA_POR_DEFECTO = {'MOV': 0.25, 'ADD': 0.25, 'SUB': 0.25, 'JMP': 0.25}
+LOCALIDADES = ('uniforme', 'bucles', 'zipf')
+
+# Rango de inmediatos por opcode (los mismos que usaba utils.generar_programa_ejemplo)
+RANGOS_INMEDIATOS = {'MOV': (0, 255), 'ADD': (1, 100), 'SUB': (1, 50), 'JMP': (0, 0)}
+
+# El destino de JMP ocupa el byte del operando 1: solo alcanza 256 instrucciones;
+# el de JNZ ocupa los 16 bits bajos
+DESTINOS_CORTOS = 256
+DESTINOS_MAXIMOS = 1 << 16
+OPCODE_CMP = 0x09
+OPCODE_JNZ = 0x0B
+
+# Contador de los bucles del modelo 'bucles' (CX)
+REGISTRO_CONTADOR = 0x03
+
+TAMANO_BLOQUE = 1 << 22
+
+# Resolución de las tablas de muestreo (probabilidad mínima representable 2**-bits)
+BITS_TABLA_TIPOS = 16
+BITS_TABLA_ZIPF = 20
+
+def _tabla_cuantiles(pesos, bits=BITS_TABLA_ZIPF):
+    """Tabla que asigna 2**bits cuantiles equiespaciados a índices de `pesos`
+
+    Indexarla con enteros aleatorios uniformes equivale a muestrear la
+    distribución, sin buscar en la acumulada para cada muestra.
+    """
+    acumulada = np.cumsum(np.asarray(pesos, dtype=np.float64))
+    acumulada /= acumulada[-1]
+    cuantiles = (np.arange(1 << bits, dtype=np.float64) + 0.5) / (1 << bits)
+    return np.minimum(np.searchsorted(acumulada, cuantiles, side='right'), len(acumulada) - 1).astype(np.uint32)
+
+def _pesos_zipf(cantidad, exponente):
+    """Pesos 1/r**s de los rangos 1..cantidad"""
+    return np.arange(1, cantidad + 1, dtype=np.float64) ** -exponente
+
+class GeneradorCargas:
+    """Genera instrucciones y direcciones de datos por bloques"""
+
+    def __init__(self, mezcla=None, semilla=None, localidad='uniforme', registros=(1, 2),
+                 tamano_bucle=64, repeticiones_bucle=8, exponente_zipf=1.2,
+                 espacio_datos=1 << 20, tamano_pagina=4096, instrucciones_totales=None):
+        if localidad not in LOCALIDADES:
+            raise ValueError(f"Localidad desconocida: {localidad}")
+        if localidad == 'bucles' and REGISTRO_CONTADOR in registros:
+            raise ValueError("El modelo 'bucles' usa CX como contador: elija otros registros")
+        mezcla = mezcla or MEZCLA_POR_DEFECTO
+        desconocidos = set(mezcla) - set(OPCODES)
+        if desconocidos:
+            raise ValueError(f"Opcodes desconocidos en la mezcla: {', '.join(sorted(desconocidos))}")
+
+        self.nombres = [nombre for nombre in OPCODES if mezcla.get(nombre, 0) > 0]
+        pesos = np.array([mezcla[nombre] for nombre in self.nombres], dtype=np.float64)
+        self.tabla_tipos = _tabla_cuantiles(pesos, BITS_TABLA_TIPOS).astype(np.uint8)
+
+        self.opcodes = np.array([OPCODES[n] << 24 for n in self.nombres], dtype=np.uint32)
+        self.inmediato_min = np.array([RANGOS_INMEDIATOS[n][0] for n in self.nombres], dtype=np.uint32)
+        self.inmediato_span = np.array([RANGOS_INMEDIATOS[n][1] - RANGOS_INMEDIATOS[n][0] + 1
+                                        for n in self.nombres], dtype=np.uint32)
+        self.es_salto = np.array([n == 'JMP' for n in self.nombres])
+        # 256 entradas para elegir registro con un solo byte aleatorio
+        self.tabla_registros = (np.resize(np.asarray(registros, dtype=np.uint32), 256) << 16)
+
+        self.localidad = localidad
+        self.tamano_bucle = tamano_bucle
+        self.repeticiones_bucle = repeticiones_bucle
+        self.tamano_pagina = tamano_pagina
+        self.palabras_datos = max(1, espacio_datos // 4)
+        self.paginas_datos = max(1, espacio_datos // tamano_pagina)
+
+        # Los saltos no salen del programa: con menos de DESTINOS_MAXIMOS
+        # instrucciones los destinos se limitan a su longitud
+        self.destinos = (min(instrucciones_totales, DESTINOS_MAXIMOS) if instrucciones_totales
+                         else DESTINOS_MAXIMOS)
+
+        self.rng = np.random.default_rng(semilla)
+        if localidad == 'zipf':
+            # Rango Zipf -> destino o página "caliente", con un orden fijo por semilla
+            calientes = self.rng.permutation(self.destinos).astype(np.uint32)
+            self.tabla_destinos = calientes[_tabla_cuantiles(_pesos_zipf(self.destinos, exponente_zipf))]
+            paginas = self.rng.permutation(self.paginas_datos).astype(np.uint32)
+            self.tabla_paginas = paginas[_tabla_cuantiles(_pesos_zipf(self.paginas_datos, exponente_zipf))]
+
+    def _cuantiles(self, tamano, bits):
+        """Enteros aleatorios de `bits` bits para indexar una tabla de cuantiles"""
+        return self.rng.integers(0, 1 << 32, tamano, dtype=np.uint32) >> np.uint32(32 - bits)
+
+    def instrucciones(self, inicio, tamano):
+        """Palabras de las instrucciones [inicio, inicio + tamano) como ndarray uint32"""
+        rng = self.rng
+        tipo = self.tabla_tipos[rng.integers(0, 1 << BITS_TABLA_TIPOS, tamano, dtype=np.uint16)]
+
+        aleatorio = rng.integers(0, 256, tamano, dtype=np.uint8).astype(np.uint32)
+        inmediato = self.inmediato_min[tipo] + ((aleatorio * self.inmediato_span[tipo]) >> np.uint32(8))
+        registro = self.tabla_registros[rng.integers(0, 256, tamano, dtype=np.uint8)]
+        palabras = self.opcodes[tipo] | registro | (inmediato << np.uint32(8))
+
+        saltos = np.flatnonzero(self.es_salto[tipo])
+        if len(saltos):
+            if self.localidad == 'bucles':
+                self._bucles(palabras, inicio, saltos)
+            else:
+                palabras[saltos] = _codificar_saltos(self._destinos(inicio + saltos))
+        return palabras
+
+    def _destinos(self, posiciones):
+        """Destinos de salto para las instrucciones en `posiciones` (uniforme o zipf)"""
+        cantidad = len(posiciones)
+        if self.localidad == 'zipf':
+            destinos = self.tabla_destinos[self._cuantiles(cantidad, BITS_TABLA_ZIPF)]
+        else:
+            destinos = self.rng.integers(0, self.destinos, cantidad, dtype=np.uint32)
+        # Un salto a sí mismo no termina nunca: se cambia por la instrucción anterior
+        propios = destinos == posiciones
+        destinos[propios] = np.where(posiciones[propios] > 0, posiciones[propios] - 1, 1)
+        return destinos
+
+    def _bucles(self, palabras, inicio, saltos):
+        """Convierte los saltos del bloque en bucles contados que terminan
+
+        Para el salto en p con destino d:
+            d-1  MOV CX, repeticiones
+            ...
+            p-2  SUB CX, 1
+            p-1  CMP CX, 0
+            p    JNZ d
+        El bucle no se solapa con el del salto anterior ni sale del bloque; un
+        salto sin sitio para él (o con destino fuera de los 16 bits) queda
+        como CMP CX, 0.
+        """
+        retroceso = self.rng.integers(1, self.tamano_bucle + 1, len(saltos))
+        anteriores = np.concatenate(([-1], saltos[:-1]))
+        destinos = np.maximum(saltos - retroceso, anteriores + 2)
+        con_bucle = (destinos <= saltos - 2) & (inicio + destinos < DESTINOS_MAXIMOS)
+
+        contador = np.uint32(REGISTRO_CONTADOR << 16)
+        comparacion = np.uint32(OPCODE_CMP << 24) | contador
+        palabras[saltos] = comparacion
+        saltos, destinos = saltos[con_bucle], destinos[con_bucle]
+        repeticiones = min(max(self.repeticiones_bucle, 1), 255)
+        palabras[destinos - 1] = np.uint32(OPCODES['MOV'] << 24) | contador | np.uint32(repeticiones << 8)
+        palabras[saltos - 2] = np.uint32(OPCODES['SUB'] << 24) | contador | np.uint32(1 << 8)
+        palabras[saltos - 1] = comparacion
+        palabras[saltos] = np.uint32(OPCODE_JNZ << 24) | (inicio + destinos).astype(np.uint32)
+
+    def direcciones(self, inicio, tamano):
+        """Direcciones de datos (bytes) de las instrucciones [inicio, inicio + tamano)"""
+        if self.localidad == 'bucles':
+            # Recorrido secuencial de una ventana que se repite antes de avanzar
+            k = np.arange(inicio, inicio + tamano, dtype=np.int64)
+            ventana = self.tamano_bucle * 16
+            palabra = k % ventana + (k // (ventana * self.repeticiones_bucle)) * ventana
+            return ((palabra % self.palabras_datos) * 4).astype(np.uint32)
+        if self.localidad == 'zipf':
+            pagina = self.tabla_paginas[self._cuantiles(tamano, BITS_TABLA_ZIPF)]
+            desplazamiento = self.rng.integers(0, self.tamano_pagina // 4, tamano, dtype=np.uint32) << np.uint32(2)
+            return pagina * np.uint32(self.tamano_pagina) + desplazamiento
+        return self.rng.integers(0, self.palabras_datos, tamano, dtype=np.uint32) << np.uint32(2)
+
+    def bloques(self, cantidad, tamano_bloque=TAMANO_BLOQUE):
+        """Itera (inicio, instrucciones, direcciones) por bloques"""
+        for inicio in range(0, cantidad, tamano_bloque):
+            tamano = min(tamano_bloque, cantidad - inicio)
+            yield inicio, self.instrucciones(inicio, tamano), self.direcciones(inicio, tamano)
+
+def _codificar_saltos(destinos):
+    """Palabras de salto incondicional: JMP si el destino cabe en 8 bits, JNZ si no"""
+    destinos = destinos.astype(np.uint32)
+    return np.where(destinos < DESTINOS_CORTOS,
+                    np.uint32(OPCODES['JMP'] << 24) | (destinos << np.uint32(16)),
+                    np.uint32(OPCODE_JNZ << 24) | destinos).astype(np.uint32)
+
+def generar_programa(cantidad, **opciones):
+    """Genera `cantidad` instrucciones en memoria; retorna (instrucciones, direcciones)"""
+    generador = GeneradorCargas(instrucciones_totales=cantidad, **opciones)
+    return generador.instrucciones(0, cantidad), generador.direcciones(0, cantidad)
+
+def generar_imagen(ruta, cantidad, con_datos=True, tamano_bloque=TAMANO_BLOQUE, **opciones):
+    """Escribe una imagen .simx de `cantidad` instrucciones directamente en el archivo"""
+    generador = GeneradorCargas(instrucciones_totales=cantidad, **opciones)
+    segmentos = [('codigo', SEGMENTO_CODIGO, cantidad)]
+    if con_datos:
+        segmentos.append(('datos', SEGMENTO_DATOS, cantidad))
+    desplazamientos = reservar_imagen(ruta, segmentos)
+
+    codigo = np.memmap(ruta, dtype='<u4', mode='r+', offset=desplazamientos['codigo'], shape=(cantidad,))
+    datos = (np.memmap(ruta, dtype='<u4', mode='r+', offset=desplazamientos['datos'], shape=(cantidad,))
+             if con_datos else None)
+    try:
+        for inicio in range(0, cantidad, tamano_bloque):
+            tamano = min(tamano_bloque, cantidad - inicio)
+            codigo[inicio:inicio + tamano] = generador.instrucciones(inicio, tamano)
+            if con_datos:
+                datos[inicio:inicio + tamano] = generador.direcciones(inicio, tamano)
+        codigo.flush()
+        if con_datos:
+            datos.flush()
+    finally:
+        del codigo, datos
+    return ruta
+
+def leer_mezcla(texto):
+    """Convierte 'MOV=0.3,ADD=0.3,...' en un diccionario de pesos"""
+    mezcla = {}
+    for parte in texto.split(','):
+        nombre, _, peso = parte.partition('=')
+        mezcla[nombre.strip().upper()] = float(peso)
+    return mezcla
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera cargas sintéticas en formato .simx")
+    parser.add_argument('salida')
+    parser.add_argument('--instrucciones', type=int, default=1_000_000)
+    parser.add_argument('--mezcla', type=leer_mezcla, default=None, metavar='OP=PESO,...')
+    parser.add_argument('--localidad', choices=LOCALIDADES, default='uniforme')
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--tamano-bucle', type=int, default=64)
+    parser.add_argument('--exponente-zipf', type=float, default=1.2)
+    parser.add_argument('--espacio-datos', type=int, default=1 << 20, help="Bytes del espacio de datos")
+    parser.add_argument('--sin-datos', action='store_true', help="No escribir el segmento de direcciones")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    try:
+        generar_imagen(args.salida, args.instrucciones, con_datos=not args.sin_datos,
+                       mezcla=args.mezcla, semilla=args.semilla, localidad=args.localidad,
+                       tamano_bucle=args.tamano_bucle, exponente_zipf=args.exponente_zipf,
+                       espacio_datos=args.espacio_datos)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    duracion = time.perf_counter() - inicio
+    print(f"{args.instrucciones} instrucciones -> {args.salida} en {duracion:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
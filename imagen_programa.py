@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Formato binario de programas del simulador (.simx).
+
+    cabecera | tabla de segmentos | datos de los segmentos
+
+Todos los campos son little-endian. Cada segmento es una secuencia de
+palabras uint32 alineada a 4 bytes; el segmento 'codigo' contiene las
+instrucciones y el punto de entrada es un índice dentro de él. La imagen se
+mapea con mmap y las instrucciones se exponen como memoryview sin copiarlas.
+
+Uso:
+    python imagen_programa.py convertir programas/programa1.exe chrome.simx
+    python imagen_programa.py info chrome.simx
+"""
+
+import argparse
+import mmap
+import struct
+import sys
+from array import array
+
+MAGICO = b'SIMX'
+VERSION = 1
+
+SEGMENTO_CODIGO = 0
+SEGMENTO_DATOS = 1
+
+_CABECERA = struct.Struct('<4sHHII')  # mágico, versión, nº segmentos, punto de entrada, reservado
+_SEGMENTO = struct.Struct('<16sIII')  # nombre, tipo, desplazamiento (bytes), nº de palabras
+
+# memoryview puede leer las palabras en su lugar si el orden nativo coincide con el del archivo
+_ACCESO_DIRECTO = sys.byteorder == 'little' and array('I').itemsize == 4
+
+def _palabras_a_bytes(palabras):
+    """Convierte una secuencia de palabras (lista, array, memoryview o ndarray) a bytes little-endian"""
+    if hasattr(palabras, 'dtype'):
+        return palabras.astype('<u4', copy=False).tobytes()
+    if isinstance(palabras, memoryview) and palabras.format == 'I' and _ACCESO_DIRECTO:
+        return palabras.tobytes()
+    datos = array('I', palabras)
+    if sys.byteorder != 'little':
+        datos.byteswap()
+    return datos.tobytes()
+
+def escribir_imagen(ruta, instrucciones, punto_entrada=0, segmentos=None):
+    """Escribe una imagen con el segmento 'codigo' y segmentos opcionales {nombre: (tipo, palabras)}"""
+    todos = [('codigo', SEGMENTO_CODIGO, instrucciones)]
+    for nombre, (tipo, palabras) in (segmentos or {}).items():
+        todos.append((nombre, tipo, palabras))
+
+    desplazamiento = _CABECERA.size + _SEGMENTO.size * len(todos)
+    tabla = []
+    datos = []
+    for nombre, tipo, palabras in todos:
+        contenido = _palabras_a_bytes(palabras)
+        tabla.append(_SEGMENTO.pack(nombre.encode('ascii'), tipo, desplazamiento, len(contenido) // 4))
+        datos.append(contenido)
+        desplazamiento += len(contenido)
+
+    with open(ruta, 'wb') as archivo:
+        archivo.write(_CABECERA.pack(MAGICO, VERSION, len(todos), punto_entrada, 0))
+        for entrada in tabla:
+            archivo.write(entrada)
+        for contenido in datos:
+            archivo.write(contenido)
+
+def reservar_imagen(ruta, segmentos, punto_entrada=0):
+    """Crea una imagen con los segmentos [(nombre, tipo, nº palabras)] sin datos
+
+    Retorna {nombre: desplazamiento en bytes} para que el llamador escriba cada
+    segmento por bloques (por ejemplo con numpy.memmap) sin tenerlo completo
+    en memoria.
+    """
+    desplazamiento = _CABECERA.size + _SEGMENTO.size * len(segmentos)
+    desplazamientos = {}
+    with open(ruta, 'wb') as archivo:
+        archivo.write(_CABECERA.pack(MAGICO, VERSION, len(segmentos), punto_entrada, 0))
+        for nombre, tipo, palabras in segmentos:
+            archivo.write(_SEGMENTO.pack(nombre.encode('ascii'), tipo, desplazamiento, palabras))
+            desplazamientos[nombre] = desplazamiento
+            desplazamiento += palabras * 4
+        archivo.truncate(desplazamiento)
+    return desplazamientos
+
+class ImagenPrograma:
+    """Imagen de programa mapeada en memoria"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = open(ruta, 'rb')
+        try:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._archivo.close()
+            raise ValueError(f"{ruta} está vacío")
+        self._vistas = []
+
+        try:
+            magico, version, num_segmentos, self.punto_entrada, _ = _CABECERA.unpack_from(self._mapa, 0)
+            if magico != MAGICO or version != VERSION:
+                raise ValueError(f"{ruta} no es una imagen de programa compatible")
+
+            self.segmentos = {}
+            self.tipos = {}
+            for i in range(num_segmentos):
+                nombre, tipo, desplazamiento, palabras = _SEGMENTO.unpack_from(
+                    self._mapa, _CABECERA.size + i * _SEGMENTO.size)
+                nombre = nombre.rstrip(b'\0').decode('ascii')
+                if desplazamiento + palabras * 4 > len(self._mapa):
+                    raise ValueError(f"El segmento {nombre} de {ruta} está truncado")
+                self.segmentos[nombre] = self._vista(desplazamiento, palabras)
+                self.tipos[nombre] = tipo
+        except Exception:
+            self.cerrar()
+            raise
+
+        if 'codigo' not in self.segmentos:
+            self.cerrar()
+            raise ValueError(f"{ruta} no tiene segmento de código")
+        self.instrucciones = self.segmentos['codigo']
+
+    def _vista(self, desplazamiento, palabras):
+        """Palabras de un segmento: vista directa del mapa o, si el orden de bytes difiere, copia"""
+        crudo = memoryview(self._mapa)[desplazamiento:desplazamiento + palabras * 4]
+        if _ACCESO_DIRECTO:
+            vista = crudo.cast('I')
+            self._vistas.append(crudo)
+            self._vistas.append(vista)
+            return vista
+        datos = array('I', crudo.tobytes())
+        datos.byteswap()
+        crudo.release()
+        return datos
+
+    def __len__(self):
+        return len(self.instrucciones)
+
+    def cerrar(self):
+        """Libera las vistas y el mapa (las instrucciones dejan de ser accesibles)"""
+        for vista in reversed(self._vistas):
+            vista.release()
+        self._vistas = []
+        if getattr(self, '_mapa', None) is not None:
+            self._mapa.close()
+            self._mapa = None
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+def cargar_imagen(ruta):
+    """Mapea una imagen de programa; las instrucciones quedan en imagen.instrucciones"""
+    return ImagenPrograma(ruta)
+
+def crear_proceso(imagen, proceso_id, nombre=None):
+    """Crea un Proceso que ejecuta las instrucciones de la imagen sin copiarlas"""
+    from memoria import Proceso
+
+    tamano_kb = max(1, (len(imagen.instrucciones) * 4 + 1023) // 1024)
+    proceso = Proceso(proceso_id, nombre or imagen.ruta, tamano_kb, imagen.instrucciones)
+    proceso.direccion_inicio = imagen.punto_entrada
+    return proceso
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Herramientas para imágenes de programa .simx")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    convertir = subparsers.add_parser('convertir', help="Convierte un programa de programas/ a imagen binaria")
+    convertir.add_argument('fuente')
+    convertir.add_argument('salida')
+    convertir.add_argument('--lista', default=None, help="Nombre de la lista a convertir (por defecto la primera)")
+    convertir.add_argument('--entrada', type=int, default=0, help="Punto de entrada")
+
+    info = subparsers.add_parser('info', help="Muestra la cabecera y segmentos de una imagen")
+    info.add_argument('imagen')
+
+    args = parser.parse_args(argv)
+
+    if args.comando == 'convertir':
+        from lotes import cargar_programas_fuente
+
+        programas = dict(cargar_programas_fuente(args.fuente))
+        nombre = args.lista or next(iter(programas))
+        if nombre not in programas:
+            parser.error(f"{args.fuente} no define {nombre}")
+        escribir_imagen(args.salida, programas[nombre], punto_entrada=args.entrada)
+        print(f"{nombre}: {len(programas[nombre])} instrucciones -> {args.salida}")
+    else:
+        with cargar_imagen(args.imagen) as imagen:
+            print(f"Punto de entrada: {imagen.punto_entrada}")
+            for nombre, palabras in imagen.segmentos.items():
+                tipo = 'codigo' if imagen.tipos[nombre] == SEGMENTO_CODIGO else 'datos'
+                print(f"  {nombre:<16} {tipo:<7} {len(palabras)} palabras")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Instrumentación opcional del simulador.
+
+Mientras está activa, la instrumentación sustituye en las instancias la tabla
+de despacho del microprocesador y los métodos de cache y memoria por
+versiones medidas; al desactivarla se restauran los originales, así que la
+simulación sin instrumentar no paga ningún costo.
+
+    with Instrumentacion(micro, sistema_memoria) as inst:
+        micro.ejecutar_programa()
+    inst.exportar_pstats('perfil.pstats')        # python -m pstats perfil.pstats
+    inst.exportar_chrome('traza.json')           # chrome://tracing o Perfetto
+"""
+
+import json
+import time
+from collections import Counter, defaultdict
+from microprocesador import MNEMONICOS
+
+class Instrumentacion:
+    """Contadores por opcode, proceso, fallo, desalojo y región de cache"""
+
+    def __init__(self, micro=None, sistema_memoria=None, tamano_region=4096, eventos=False,
+                 limite_eventos=1_000_000):
+        self.micro = micro
+        self.sistema_memoria = sistema_memoria or (micro.sistema_memoria if micro else None)
+        self.tamano_region = tamano_region
+        self.registrar_eventos = eventos
+        self.limite_eventos = limite_eventos
+        self.activa = False
+        self._sustituidos = []  # (objeto, atributo, valor original o None si era de la clase)
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Pone a cero todos los contadores"""
+        self.ejecuciones = Counter()       # opcode -> instrucciones
+        self.tiempo_ns = Counter()         # opcode -> ns
+        self.accesos_proceso = Counter()   # proceso_id -> accesos a memoria
+        self.tiempo_memoria_ns = 0
+        self.fallos_proceso = Counter()    # proceso_id -> fallos de página
+        self.fallos_pagina = Counter()     # número de página -> fallos
+        self.desalojos_proceso = Counter() # proceso_id dueño de la página desalojada -> desalojos
+        self.desalojos_pagina = Counter()  # número de página desalojada -> desalojos
+        self.cache = defaultdict(lambda: defaultdict(lambda: [0, 0]))  # cache -> región -> [impactos, fallos]
+        self.eventos = []
+        self._origen_ns = time.perf_counter_ns()
+
+    # --- activación -----------------------------------------------------------
+
+    def activar(self, micro=None, sistema_memoria=None):
+        """Sustituye los puntos medidos por sus versiones instrumentadas
+
+        Se puede pasar otro microprocesador o sistema de memoria para seguir
+        acumulando en los mismos contadores (p. ej. un programa tras otro).
+        """
+        if self.activa:
+            self.desactivar()
+        if micro is not None:
+            self.micro = micro
+            self.sistema_memoria = sistema_memoria or micro.sistema_memoria
+        elif sistema_memoria is not None:
+            self.sistema_memoria = sistema_memoria
+        if self.micro is not None:
+            self._sustituir(self.micro, 'despacho', {
+                opcode: self._medir_operacion(opcode, operacion)
+                for opcode, operacion in self.micro.despacho.items()})
+            for nombre, cache in (('L1', self.micro.cache_l1), ('L2', self.micro.cache_l2)):
+                self._sustituir(cache, 'leer', self._medir_cache(nombre, cache.leer))
+        if self.sistema_memoria is not None:
+            self._sustituir(self.sistema_memoria, 'acceder_memoria',
+                            self._medir_acceso(self.sistema_memoria.acceder_memoria))
+            self._sustituir(self.sistema_memoria, 'traducir_direccion',
+                            self._medir_acceso(self.sistema_memoria.traducir_direccion))
+            paginacion = self.sistema_memoria.paginacion
+            self._sustituir(paginacion, 'reemplazar_pagina', self._medir_desalojo(paginacion.reemplazar_pagina))
+            # Desalojos sin reemplazo (p. ej. el reequilibrio de cuotas de asignacion_marcos)
+            self._sustituir(self.sistema_memoria, 'desalojar_pagina',
+                            self._medir_desalojo_directo(self.sistema_memoria.desalojar_pagina))
+        self.activa = True
+        return self
+
+    def desactivar(self):
+        """Restaura los métodos y la tabla de despacho originales"""
+        for objeto, atributo, original in reversed(self._sustituidos):
+            if original is None:
+                delattr(objeto, atributo)  # vuelve a usarse el método de la clase
+            else:
+                setattr(objeto, atributo, original)
+        self._sustituidos = []
+        self.activa = False
+
+    def _sustituir(self, objeto, atributo, nuevo):
+        self._sustituidos.append((objeto, atributo, vars(objeto).get(atributo)))
+        setattr(objeto, atributo, nuevo)
+
+    def __enter__(self):
+        return self.activar()
+
+    def __exit__(self, *exc):
+        self.desactivar()
+
+    # --- envoltorios ----------------------------------------------------------
+
+    def _evento(self, nombre, inicio_ns, duracion_ns, pid=0, categoria='cpu', argumentos=None):
+        if len(self.eventos) < self.limite_eventos:
+            evento = {'name': nombre, 'cat': categoria, 'ph': 'X', 'pid': pid, 'tid': 0,
+                      'ts': (inicio_ns - self._origen_ns) / 1000, 'dur': duracion_ns / 1000}
+            if argumentos:
+                evento['args'] = argumentos
+            self.eventos.append(evento)
+
+    def _medir_operacion(self, opcode, operacion):
+        ejecuciones = self.ejecuciones
+        tiempo_ns = self.tiempo_ns
+        reloj = time.perf_counter_ns
+        nombre = MNEMONICOS.get(opcode, f"0x{opcode:02X}")
+
+        if self.registrar_eventos:
+            def medida(operando1, operando2):
+                inicio = reloj()
+                operacion(operando1, operando2)
+                duracion = reloj() - inicio
+                ejecuciones[opcode] += 1
+                tiempo_ns[opcode] += duracion
+                self._evento(nombre, inicio, duracion, self._pid_actual())
+        else:
+            def medida(operando1, operando2):
+                inicio = reloj()
+                operacion(operando1, operando2)
+                ejecuciones[opcode] += 1
+                tiempo_ns[opcode] += reloj() - inicio
+        return medida
+
+    def _pid_actual(self):
+        programa = self.micro.programa_actual if self.micro else None
+        return programa.id if programa is not None else 0
+
+    def _medir_cache(self, nombre, leer):
+        regiones = self.cache[nombre]
+        tamano_region = self.tamano_region
+
+        def medida(direccion):
+            resultado = leer(direccion)
+            regiones[direccion // tamano_region][resultado is None] += 1
+            return resultado
+        return medida
+
+    def _medir_acceso(self, acceder):
+        sistema = self.sistema_memoria
+        estadisticas = sistema.estadisticas
+        reloj = time.perf_counter_ns
+
+        def medida(direccion, proceso_id, operacion='lectura'):
+            fallos = estadisticas['fallos_pagina']
+            inicio = reloj()
+            resultado = acceder(direccion, proceso_id, operacion)
+            duracion = reloj() - inicio
+            self.tiempo_memoria_ns += duracion
+            self.accesos_proceso[proceso_id] += 1
+            if estadisticas['fallos_pagina'] != fallos:
+                self.fallos_proceso[proceso_id] += 1
+                self.fallos_pagina[direccion // sistema.paginacion.tamano_pagina] += 1
+                if self.registrar_eventos:
+                    self._evento('fallo de página', inicio, duracion, proceso_id, 'memoria',
+                                 {'direccion': direccion})
+            return resultado
+        return medida
+
+    def _medir_desalojo(self, reemplazar):
+        def medida(pagina_victima, nueva_direccion, nuevo_proceso_id):
+            proceso_id, pagina = pagina_victima
+            self.desalojos_proceso[proceso_id] += 1
+            self.desalojos_pagina[pagina] += 1
+            return reemplazar(pagina_victima, nueva_direccion, nuevo_proceso_id)
+        return medida
+
+    def _medir_desalojo_directo(self, desalojar):
+        def medida(proceso_id, pagina):
+            desalojada = desalojar(proceso_id, pagina)
+            if desalojada:
+                self.desalojos_proceso[proceso_id] += 1
+                self.desalojos_pagina[pagina] += 1
+            return desalojada
+        return medida
+
+    # --- resultados -----------------------------------------------------------
+
+    def resumen(self):
+        """Retorna los contadores como diccionario serializable"""
+        return {
+            'opcodes': {MNEMONICOS.get(op, f"0x{op:02X}"): {
+                'ejecuciones': n, 'tiempo_ns': self.tiempo_ns[op],
+                'ns_por_instruccion': self.tiempo_ns[op] / n} for op, n in sorted(self.ejecuciones.items())},
+            'accesos_por_proceso': dict(self.accesos_proceso),
+            'fallos_por_proceso': dict(self.fallos_proceso),
+            'fallos_por_pagina': dict(self.fallos_pagina.most_common()),
+            'desalojos_por_proceso': dict(self.desalojos_proceso),
+            'desalojos_por_pagina': dict(self.desalojos_pagina.most_common()),
+            'cache_por_region': {cache: {region * self.tamano_region: {'impactos': i, 'fallos': f}
+                                         for region, (i, f) in sorted(regiones.items())}
+                                 for cache, regiones in self.cache.items()},
+        }
+
+    def imprimir(self, salida=None):
+        """Imprime un resumen legible"""
+        print("Opcode   Ejecuciones   Tiempo (ms)   ns/instr", file=salida)
+        for nombre, datos in self.resumen()['opcodes'].items():
+            print(f"{nombre:<8}{datos['ejecuciones']:>12}{datos['tiempo_ns'] / 1e6:>14.3f}"
+                  f"{datos['ns_por_instruccion']:>11.0f}", file=salida)
+        if self.accesos_proceso:
+            print("Proceso  Accesos   Fallos   Desalojos", file=salida)
+            for proceso_id in sorted(self.accesos_proceso):
+                print(f"{proceso_id:<8}{self.accesos_proceso[proceso_id]:>8}{self.fallos_proceso[proceso_id]:>9}"
+                      f"{self.desalojos_proceso[proceso_id]:>12}", file=salida)
+        for cache, regiones in sorted(self.cache.items()):
+            impactos = sum(i for i, _ in regiones.values())
+            total = impactos + sum(f for _, f in regiones.values())
+            print(f"Cache {cache}: {len(regiones)} regiones, {impactos}/{total} impactos", file=salida)
+
+    def estadisticas_pstats(self):
+        """Entradas en el formato de cProfile: (archivo, línea, función) -> (cc, nc, tt, ct, llamadores)"""
+        entradas = {}
+        for opcode, cantidad in self.ejecuciones.items():
+            segundos = self.tiempo_ns[opcode] / 1e9
+            clave = ('microprocesador', opcode, MNEMONICOS.get(opcode, f"0x{opcode:02X}"))
+            entradas[clave] = (cantidad, cantidad, segundos, segundos, {})
+        accesos = sum(self.accesos_proceso.values())
+        if accesos:
+            segundos = self.tiempo_memoria_ns / 1e9
+            entradas[('memoria', 0, 'acceder_memoria')] = (accesos, accesos, segundos, segundos, {})
+        return entradas
+
+    def exportar_pstats(self, ruta):
+        """Escribe un archivo legible con pstats / snakeviz"""
+        import pstats
+
+        class _Perfil:
+            def __init__(self, stats):
+                self.stats = stats
+
+            def create_stats(self):
+                pass
+
+        pstats.Stats(_Perfil(self.estadisticas_pstats())).dump_stats(ruta)
+
+    def exportar_chrome(self, ruta):
+        """Escribe los eventos (requiere eventos=True) y los contadores en formato trace-event"""
+        eventos = list(self.eventos)
+        fin = (time.perf_counter_ns() - self._origen_ns) / 1000
+        for nombre, contador in (('ejecuciones', self.ejecuciones), ('fallos', self.fallos_proceso)):
+            eventos.append({'name': nombre, 'ph': 'C', 'pid': 0, 'ts': fin,
+                            'args': {str(MNEMONICOS.get(k, k)) if nombre == 'ejecuciones' else str(k): v
+                                     for k, v in contador.items()}})
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ns'}, archivo)
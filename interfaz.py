@@ -1,26 +1,31 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import threading
+from tkinter import ttk, messagebox
 import time
+import queue
 import random
-import os
-import subprocess
 import psutil
 import platform
 from memoria import Proceso
+from monitor_procesos import MuestreadorProcesos, IndiceProcesos
+from lanzador_programas import LanzadorProgramas, resolver_comando
+from planificador_refresco import PlanificadorRefresco
+from registro_metricas import CAMPOS
+from utils import obtener_muestra_compacta
 
 class InterfazGrafica:
     """Interfaz gráfica para el simulador con datos reales y diseño moderno"""
 
-    def __init__(self, microprocesador, sistema_memoria):
+    def __init__(self, microprocesador, sistema_memoria, reproductor=None):
         self.micro = microprocesador
         self.memoria = sistema_memoria
         self.root = None
         self.ejecutando = False
         self.actualizar_id = None
 
+        # Fuente de métricas: psutil en vivo o un ReproductorMetricas
+        self.reproductor = reproductor
+        self.muestra = {}
+
         # Configuración de tema
         self.tema_oscuro = False
         self.colores = self.obtener_colores_tema_claro()
@@ -33,6 +38,21 @@ class InterfazGrafica:
         self.proceso_real_pid = None
         self.proceso_real_objeto = None
 
+        # Muestreo en segundo plano de todos los procesos monitoreados
+        self.muestreador = MuestreadorProcesos()
+
+        # Índice nombre -> pids, actualizado en cada ciclo
+        self.indice_procesos = IndiceProcesos()
+
+        # Lanzamientos en segundo plano; los resultados vuelven al hilo de Tk por la cola
+        self.lanzador = LanzadorProgramas()
+        self.cola_lanzamientos = queue.Queue()
+        self.revisando_lanzamientos = False
+
+        # Cada panel se refresca con su propia cadencia
+        self.planificador = PlanificadorRefresco()
+        self.pestanas = {}
+
     def obtener_colores_tema_claro(self):
         """Define los colores para el tema claro"""
         return {
@@ -169,10 +189,11 @@ class InterfazGrafica:
     def actualizar_estilo_graficos(self):
         """Actualiza el estilo de los gráficos de matplotlib según el tema"""
         if hasattr(self, 'fig'):
+            from matplotlib import style
             if self.tema_oscuro:
-                plt.style.use('dark_background')
+                style.use('dark_background')
             else:
-                plt.style.use('default')
+                style.use('default')
             
             # Actualizar colores específicos
             if hasattr(self, 'ax_memoria'):
@@ -188,7 +209,10 @@ class InterfazGrafica:
     def iniciar(self):
         """Inicia la interfaz gráfica"""
         self.root = tk.Tk()
-        self.root.title("Simulador de Microprocesador - Datos Reales del Sistema")
+        if self.reproductor:
+            self.root.title(f"Simulador de Microprocesador - Reproduciendo {self.reproductor.lector.ruta}")
+        else:
+            self.root.title("Simulador de Microprocesador - Datos Reales del Sistema")
         self.root.geometry("1400x900")
         self.root.minsize(1200, 700)
 
@@ -203,7 +227,9 @@ class InterfazGrafica:
         self.root.rowconfigure(0, weight=1)
 
         self.crear_interfaz()
-        self.actualizar_estado()
+        self.registrar_tareas_refresco()
+        # El primer refresco espera a que la ventana se dibuje
+        self.actualizar_id = self.root.after_idle(self.actualizar_estado)
         self.root.mainloop()
 
     def cerrar_aplicacion(self):
@@ -211,6 +237,7 @@ class InterfazGrafica:
         self.ejecutando = False
         if self.actualizar_id:
             self.root.after_cancel(self.actualizar_id)
+        self.muestreador.cerrar()
         self.root.quit()
         self.root.destroy()
 
@@ -239,11 +266,14 @@ class InterfazGrafica:
         # Notebook principal con pestañas
         notebook_principal = ttk.Notebook(panel_principal)
         notebook_principal.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        notebook_principal.bind('<<NotebookTabChanged>>', lambda e: self.refrescar_pronto())
+        self.notebook_principal = notebook_principal
 
         # Pestaña de Dashboard
         tab_dashboard = ttk.Frame(notebook_principal)
         notebook_principal.add(tab_dashboard, text="📊 Dashboard")
         tab_dashboard.columnconfigure(0, weight=1)
+        self.pestanas['dashboard'] = tab_dashboard
         tab_dashboard.rowconfigure(0, weight=1)
         self.crear_panel_dashboard(tab_dashboard)
 
@@ -251,13 +281,23 @@ class InterfazGrafica:
         tab_procesos = ttk.Frame(notebook_principal)
         notebook_principal.add(tab_procesos, text="🔄 Procesos del Sistema")
         tab_procesos.columnconfigure(0, weight=1)
+        self.pestanas['procesos'] = tab_procesos
         tab_procesos.rowconfigure(0, weight=1)
         self.crear_panel_procesos_sistema(tab_procesos)
 
+        # Pestaña de Procesos Monitoreados
+        tab_monitoreados = ttk.Frame(notebook_principal)
+        notebook_principal.add(tab_monitoreados, text="👁️ Procesos Monitoreados")
+        tab_monitoreados.columnconfigure(0, weight=1)
+        self.pestanas['monitoreados'] = tab_monitoreados
+        tab_monitoreados.rowconfigure(0, weight=1)
+        self.crear_panel_procesos_monitoreados(tab_monitoreados)
+
         # Pestaña de Métricas Detalladas
         tab_metricas = ttk.Frame(notebook_principal)
         notebook_principal.add(tab_metricas, text="📈 Métricas Detalladas")
         tab_metricas.columnconfigure(0, weight=1)
+        self.pestanas['metricas'] = tab_metricas
         tab_metricas.rowconfigure(0, weight=1)
         self.crear_panel_metricas_detalladas(tab_metricas)
 
@@ -265,6 +305,7 @@ class InterfazGrafica:
         tab_config = ttk.Frame(notebook_principal)
         notebook_principal.add(tab_config, text="⚙️ Configuración")
         tab_config.columnconfigure(0, weight=1)
+        self.pestanas['configuracion'] = tab_config
         tab_config.rowconfigure(0, weight=1)
         self.crear_panel_configuracion(tab_config)
 
@@ -430,15 +471,29 @@ class InterfazGrafica:
             self.labels_registros[registro] = label_valor
 
     def crear_panel_graficos(self, parent):
-        """Crea el panel de gráficos"""
-        # Crear figura con subplots
-        self.fig, (self.ax_memoria, self.ax_cpu, self.ax_procesos) = plt.subplots(1, 3, figsize=(15, 4))
+        """Crea el panel de gráficos; la figura se construye al mostrarse por primera vez"""
+        self.frame_graficos = parent
+        self.label_cargando_graficos = ttk.Label(parent, text="Cargando gráficos...")
+        self.label_cargando_graficos.grid(row=0, column=0)
+
+    def crear_figura_graficos(self):
+        """Importa matplotlib y crea la figura de los gráficos"""
+        from matplotlib import style
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        style.use('dark_background' if self.tema_oscuro else 'default')
+
+        # Crear figura con subplots (sin pyplot: no se necesita su gestor de ventanas)
+        self.fig = Figure(figsize=(15, 4))
+        self.ax_memoria, self.ax_cpu, self.ax_procesos = self.fig.subplots(1, 3)
         
         # Configurar la figura para el tema
         self.fig.patch.set_facecolor(self.colores['fondo_secundario'])
         
         # Crear canvas
-        self.canvas_graficos = FigureCanvasTkAgg(self.fig, parent)
+        self.label_cargando_graficos.destroy()
+        self.canvas_graficos = FigureCanvasTkAgg(self.fig, self.frame_graficos)
         self.canvas_graficos.get_tk_widget().grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 
     def crear_panel_procesos_sistema(self, parent):
@@ -497,6 +552,51 @@ class InterfazGrafica:
         v_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         h_scrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
 
+    def crear_panel_procesos_monitoreados(self, parent):
+        """Crea la tabla con todos los procesos monitoreados"""
+        monitoreados_frame = ttk.LabelFrame(parent, text="👁️ Procesos Monitoreados", padding="10")
+        monitoreados_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        monitoreados_frame.columnconfigure(0, weight=1)
+        monitoreados_frame.rowconfigure(1, weight=1)
+
+        # Controles
+        frame_controles = ttk.Frame(monitoreados_frame)
+        frame_controles.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+        ttk.Button(frame_controles, text="Mostrar en Dashboard",
+                  command=self.seleccionar_proceso_monitoreado).grid(row=0, column=0, padx=(0, 10))
+        ttk.Button(frame_controles, text="Dejar de Monitorear",
+                  command=self.quitar_proceso_monitoreado).grid(row=0, column=1)
+
+        # Tabla
+        frame_tabla = ttk.Frame(monitoreados_frame)
+        frame_tabla.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        frame_tabla.columnconfigure(0, weight=1)
+        frame_tabla.rowconfigure(0, weight=1)
+
+        columns = ('pid', 'nombre', 'cpu', 'cpu_promedio', 'memoria', 'memoria_maxima', 'estado', 'hilos')
+        self.tree_monitoreados = ttk.Treeview(frame_tabla, columns=columns, show='headings', height=20)
+
+        column_config = [
+            ('pid', 'PID', 70, tk.CENTER),
+            ('nombre', 'Nombre', 200, tk.W),
+            ('cpu', 'CPU %', 80, tk.CENTER),
+            ('cpu_promedio', 'CPU Prom. %', 90, tk.CENTER),
+            ('memoria', 'Memoria (MB)', 100, tk.CENTER),
+            ('memoria_maxima', 'Memoria Máx. (MB)', 120, tk.CENTER),
+            ('estado', 'Estado', 80, tk.CENTER),
+            ('hilos', 'Hilos', 60, tk.CENTER)
+        ]
+
+        for col, heading, width, anchor in column_config:
+            self.tree_monitoreados.heading(col, text=heading)
+            self.tree_monitoreados.column(col, width=width, anchor=anchor)
+        self.tree_monitoreados.bind('<Double-1>', lambda e: self.seleccionar_proceso_monitoreado())
+
+        v_scrollbar = ttk.Scrollbar(frame_tabla, orient=tk.VERTICAL, command=self.tree_monitoreados.yview)
+        self.tree_monitoreados.configure(yscrollcommand=v_scrollbar.set)
+        self.tree_monitoreados.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        v_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+
     def crear_panel_metricas_detalladas(self, parent):
         """Crea el panel de métricas detalladas con scroll"""
         # Frame principal
@@ -538,9 +638,10 @@ class InterfazGrafica:
         self.intervalo_var = tk.IntVar(value=1000)
         intervalos = [("1 segundo", 1000), ("2 segundos", 2000), ("5 segundos", 5000)]
         
+        self.intervalo_anterior = self.intervalo_var.get()
         for i, (texto, valor) in enumerate(intervalos):
             ttk.Radiobutton(config_frame, text=texto, variable=self.intervalo_var, 
-                           value=valor).grid(row=1, column=i, sticky=tk.W, pady=5)
+                           value=valor, command=self.cambiar_intervalo).grid(row=1, column=i, sticky=tk.W, pady=5)
 
         # Separador
         ttk.Separator(config_frame, orient=tk.HORIZONTAL).grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=20)
@@ -559,69 +660,97 @@ class InterfazGrafica:
         for i, info in enumerate(info_sistema):
             ttk.Label(config_frame, text=info).grid(row=4+i, column=0, sticky=tk.W, pady=2)
 
+        # Rendimiento de los paneles
+        ttk.Separator(config_frame, orient=tk.HORIZONTAL).grid(row=10, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=20)
+        ttk.Label(config_frame, text="Rendimiento de la Interfaz:", font=('Arial', 10, 'bold')).grid(row=11, column=0, sticky=tk.W, pady=(0, 10))
+
+        columns = ('panel', 'intervalo', 'ultimo', 'promedio', 'omitidas')
+        self.tree_rendimiento = ttk.Treeview(config_frame, columns=columns, show='headings', height=9)
+        column_config = [
+            ('panel', 'Panel', 160, tk.W),
+            ('intervalo', 'Intervalo (ms)', 100, tk.CENTER),
+            ('ultimo', 'Último (ms)', 100, tk.CENTER),
+            ('promedio', 'Promedio (ms)', 100, tk.CENTER),
+            ('omitidas', 'Omitidas', 80, tk.CENTER)
+        ]
+        for col, heading, width, anchor in column_config:
+            self.tree_rendimiento.heading(col, text=heading)
+            self.tree_rendimiento.column(col, width=width, anchor=anchor)
+        self.tree_rendimiento.grid(row=12, column=0, columnspan=3, sticky=(tk.W, tk.E))
+
     # ... (los métodos restantes de abrir programas, monitoreo, y actualización se mantienen igual)
+    PROCESOS_POPULARES = ('winword.exe', 'excel.exe', 'chrome.exe', 'firefox.exe',
+                          'code.exe', 'devenv.exe', 'pycharm.exe', 'studio64.exe',
+                          'notepad.exe', 'calc.exe', 'explorer.exe')
+
     def obtener_procesos_populares(self):
         """Obtiene lista de procesos populares del sistema"""
-        procesos_populares = []
         try:
-            for proc in psutil.process_iter(['name']):
-                nombre = proc.info['name']
-                if nombre and nombre.lower() in ['winword.exe', 'excel.exe', 'chrome.exe', 'firefox.exe', 
-                                               'code.exe', 'devenv.exe', 'pycharm.exe', 'studio64.exe',
-                                               'notepad.exe', 'calc.exe', 'explorer.exe']:
-                    if nombre not in procesos_populares:
-                        procesos_populares.append(nombre)
-        except:
-            pass
-        return sorted(procesos_populares)
+            return sorted(self.indice_procesos.actualizar().presentes(self.PROCESOS_POPULARES))
+        except Exception:
+            return []
+
+    def buscar_proceso_por_nombre(self, nombre):
+        """Retorna un psutil.Process con ese nombre usando el índice, o None"""
+        for reintento in range(2):
+            for pid in sorted(self.indice_procesos.buscar(nombre)):
+                # Comprueba que el pid no cambió de nombre ni pasó a otro proceso
+                proceso = self.indice_procesos.verificar(pid, nombre)
+                if proceso is not None:
+                    return proceso
+            # El índice puede tener hasta un ciclo de antigüedad
+            if reintento == 0:
+                self.indice_procesos.actualizar()
+        return None
 
     def abrir_programa_real(self, nombre_ejecutable, nombre_amigable):
-        """Abre un programa real y comienza a monitorearlo"""
+        """Abre un programa real y comienza a monitorearlo sin bloquear la interfaz"""
         try:
             # Buscar el proceso primero
-            proceso_encontrado = None
-            for proc in psutil.process_iter(['pid', 'name']):
-                if proc.info['name'] and proc.info['name'].lower() == nombre_ejecutable.lower():
-                    proceso_encontrado = proc
-                    break
-
-            if not proceso_encontrado:
-                # Intentar abrir el programa
-                if nombre_ejecutable.lower() == "winword.exe":
-                    os.startfile("winword")
-                elif nombre_ejecutable.lower() == "excel.exe":
-                    os.startfile("excel")
-                elif nombre_ejecutable.lower() == "chrome.exe":
-                    os.startfile("chrome")
-                elif nombre_ejecutable.lower() == "studio64.exe":
-                    # Buscar Android Studio en ubicaciones comunes
-                    paths = [
-                        r"C:\Program Files\Android\Android Studio\bin\studio64.exe",
-                        r"C:\Program Files (x86)\Android\Android Studio\bin\studio64.exe"
-                    ]
-                    for path in paths:
-                        if os.path.exists(path):
-                            subprocess.Popen([path])
-                            break
-                else:
-                    os.startfile(nombre_ejecutable)
-                
-                # Esperar un momento y buscar el proceso
-                time.sleep(2)
-                for proc in psutil.process_iter(['pid', 'name']):
-                    if proc.info['name'] and proc.info['name'].lower() == nombre_ejecutable.lower():
-                        proceso_encontrado = proc
-                        break
+            proceso_encontrado = self.buscar_proceso_por_nombre(nombre_ejecutable)
 
             if proceso_encontrado:
                 self.agregar_proceso_monitoreo(proceso_encontrado, nombre_amigable)
-                messagebox.showinfo("Éxito", f"Monitoreando {nombre_amigable}\nPID: {proceso_encontrado.info['pid']}")
-            else:
-                messagebox.showwarning("Advertencia", f"No se pudo encontrar o abrir {nombre_amigable}")
+                messagebox.showinfo("Éxito", f"Monitoreando {nombre_amigable}\nPID: {proceso_encontrado.pid}")
+                return
+
+            comando = resolver_comando(nombre_ejecutable)
+            if not comando:
+                messagebox.showwarning("Advertencia", f"No se encontró {nombre_amigable} en este sistema")
+                return
+
+            # El lanzador sigue al pid del hijo (y sus descendientes) en otro hilo
+            self.lanzador.lanzar(comando,
+                                 lambda proceso, error: self.cola_lanzamientos.put((proceso, error, nombre_amigable)))
+            self.revisar_lanzamientos()
 
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo abrir {nombre_amigable}: {str(e)}")
 
+    def revisar_lanzamientos(self):
+        """Atiende en el hilo de Tk los lanzamientos que ya terminaron"""
+        while True:
+            try:
+                proceso, error, nombre_amigable = self.cola_lanzamientos.get_nowait()
+            except queue.Empty:
+                break
+
+            if proceso is not None:
+                self.agregar_proceso_monitoreo(proceso, nombre_amigable)
+                messagebox.showinfo("Éxito", f"Monitoreando {nombre_amigable}\nPID: {proceso.pid}")
+            else:
+                messagebox.showwarning("Advertencia", f"No se pudo abrir {nombre_amigable}: {error}")
+
+        # Seguir revisando mientras queden lanzamientos pendientes
+        if self.lanzador.en_curso() or not self.cola_lanzamientos.empty():
+            if not self.revisando_lanzamientos and self.root:
+                self.revisando_lanzamientos = True
+                self.root.after(100, self._revisar_lanzamientos_programado)
+
+    def _revisar_lanzamientos_programado(self):
+        self.revisando_lanzamientos = False
+        self.revisar_lanzamientos()
+
     def abrir_programa_personalizado(self):
         """Abre un programa personalizado"""
         programa = self.programa_var.get()
@@ -635,12 +764,12 @@ class InterfazGrafica:
             return
 
         try:
-            for proc in psutil.process_iter(['pid', 'name']):
-                if proc.info['name'] and proc.info['name'] == nombre_proceso:
-                    nombre_amigable = nombre_proceso.replace('.exe', '').title()
-                    self.agregar_proceso_monitoreo(proc, nombre_amigable)
-                    messagebox.showinfo("Éxito", f"Monitoreando {nombre_amigable}\nPID: {proc.info['pid']}")
-                    return
+            proc = self.buscar_proceso_por_nombre(nombre_proceso)
+            if proc:
+                nombre_amigable = nombre_proceso.replace('.exe', '').title()
+                self.agregar_proceso_monitoreo(proc, nombre_amigable)
+                messagebox.showinfo("Éxito", f"Monitoreando {nombre_amigable}\nPID: {proc.pid}")
+                return
             messagebox.showwarning("Advertencia", f"No se encontró el proceso {nombre_proceso}")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo monitorear el proceso: {str(e)}")
@@ -648,13 +777,19 @@ class InterfazGrafica:
     def agregar_proceso_monitoreo(self, proceso_psutil, nombre_amigable):
         """Agrega un proceso real para monitoreo"""
         try:
+            # Un pid ya monitoreado solo pasa a ser el seleccionado
+            for proceso in self.procesos:
+                if proceso.id == proceso_psutil.pid and proceso.estado == "MONITOREANDO":
+                    self.proceso_seleccionado = proceso
+                    self.proceso_real_objeto = proceso_psutil
+                    return
+
             # Obtener información real del proceso
             mem_info = proceso_psutil.memory_info()
-            cpu_percent = proceso_psutil.cpu_percent(interval=0.1)
             
             # Crear proceso simulado con datos reales
             nuevo_proceso = Proceso(
-                proceso_psutil.info['pid'],
+                proceso_psutil.pid,
                 nombre_amigable,
                 int(mem_info.rss / 1024),  # Tamaño en KB
                 []
@@ -662,59 +797,154 @@ class InterfazGrafica:
             nuevo_proceso.estado = "MONITOREANDO"
             nuevo_proceso.proceso_real = proceso_psutil
             
-            # Agregar a la lista de procesos
+            # Agregar a la lista de procesos y al muestreador
             self.procesos.append(nuevo_proceso)
+            self.muestreador.agregar(proceso_psutil, nombre_amigable)
             self.proceso_seleccionado = nuevo_proceso
             self.proceso_real_objeto = proceso_psutil
 
         except Exception as e:
             print(f"Error agregando proceso: {e}")
 
+    def seleccionar_proceso_monitoreado(self):
+        """Muestra en el dashboard el proceso elegido en la tabla de monitoreados"""
+        seleccion = self.tree_monitoreados.selection()
+        if not seleccion:
+            return
+        pid = int(self.tree_monitoreados.item(seleccion[0], 'values')[0])
+        for proceso in self.procesos:
+            if proceso.id == pid and proceso.estado == "MONITOREANDO":
+                self.proceso_seleccionado = proceso
+                self.proceso_real_objeto = proceso.proceso_real
+                break
+
+    def quitar_proceso_monitoreado(self):
+        """Deja de monitorear el proceso elegido en la tabla"""
+        seleccion = self.tree_monitoreados.selection()
+        if not seleccion:
+            return
+        pid = int(self.tree_monitoreados.item(seleccion[0], 'values')[0])
+        self.muestreador.quitar(pid)
+        self.marcar_proceso_terminado(pid, "DETENIDO")
+
+    def marcar_proceso_terminado(self, pid, estado="TERMINADO"):
+        """Marca un proceso monitoreado como finalizado y lo deselecciona"""
+        for proceso in self.procesos:
+            if proceso.id == pid and proceso.estado == "MONITOREANDO":
+                proceso.estado = estado
+                if proceso is self.proceso_seleccionado:
+                    self.proceso_seleccionado = None
+                    self.proceso_real_objeto = None
+
+    def muestra_proceso_seleccionado(self):
+        """Retorna la última muestra del proceso seleccionado o None"""
+        if self.proceso_seleccionado is None or self.proceso_real_objeto is None:
+            return None
+        return self.muestreador.muestra(self.proceso_seleccionado.id)
+
+    def registrar_tareas_refresco(self):
+        """Registra cada panel en el planificador con su cadencia y presupuesto (ms)"""
+        base = self.intervalo_var.get()
+        dashboard = lambda: self.pestana_visible('dashboard')
+        marca_muestra = lambda: self.muestra.get('marca_tiempo')
+
+        # Los datos se toman siempre; los paneles solo se dibujan si están a la vista
+        self.planificador.registrar('muestreo', self.actualizar_datos, base, presupuesto_ms=100)
+        self.planificador.registrar('sistema', self.actualizar_info_sistema, base, presupuesto_ms=20,
+                                    visible=dashboard, version=marca_muestra)
+        self.planificador.registrar('proceso', self.actualizar_info_proceso_monitoreado, base,
+                                    presupuesto_ms=20, visible=dashboard)
+        self.planificador.registrar('registros', self.actualizar_registros_simulados, base,
+                                    presupuesto_ms=20, visible=dashboard)
+        self.planificador.registrar('graficos', self.actualizar_graficos, base, presupuesto_ms=150,
+                                    visible=dashboard)
+        self.planificador.registrar('monitoreados', self.actualizar_procesos_monitoreados, base,
+                                    presupuesto_ms=50, visible=lambda: self.pestana_visible('monitoreados'))
+        self.planificador.registrar('metricas', self.actualizar_metricas_sistema, base, presupuesto_ms=50,
+                                    visible=lambda: self.pestana_visible('metricas'))
+        self.planificador.registrar('procesos_sistema', self.actualizar_procesos_sistema, base * 2,
+                                    presupuesto_ms=200, visible=lambda: self.pestana_visible('procesos'))
+        self.planificador.registrar('rendimiento', self.actualizar_rendimiento, base, presupuesto_ms=20,
+                                    visible=lambda: self.pestana_visible('configuracion'))
+
+    def pestana_visible(self, nombre):
+        """Indica si la pestaña está seleccionada y la ventana no está minimizada"""
+        if not self.root or self.root.state() == 'iconic':
+            return False
+        return self.notebook_principal.select() == str(self.pestanas[nombre])
+
+    def cambiar_intervalo(self):
+        """Aplica el intervalo elegido escalando la cadencia de todos los paneles"""
+        nuevo = self.intervalo_var.get()
+        self.planificador.cambiar_intervalo_base(nuevo / self.intervalo_anterior)
+        self.intervalo_anterior = nuevo
+        self.refrescar_pronto()
+
+    def refrescar_pronto(self):
+        """Adelanta el siguiente ciclo (p. ej. al mostrar una pestaña con datos vencidos)"""
+        if self.root and self.actualizar_id:
+            self.root.after_cancel(self.actualizar_id)
+            self.actualizar_id = self.root.after(10, self.actualizar_estado)
+
     def actualizar_estado(self):
-        """Actualiza el estado de la interfaz con datos reales"""
+        """Ejecuta los refrescos pendientes y programa el siguiente ciclo"""
         if not self.root:
             return
         
         try:
-            # Actualizar información del sistema
-            self.actualizar_info_sistema()
-            
-            # Actualizar información del proceso monitoreado
-            self.actualizar_info_proceso_monitoreado()
-            
-            # Actualizar registros simulados (únicos datos simulados)
-            self.actualizar_registros_simulados()
-            
-            # Actualizar visualización de gráficos
-            self.actualizar_graficos()
-            
-            # Actualizar métricas del sistema
-            self.actualizar_metricas_sistema()
-            
-            # Actualizar procesos del sistema
-            self.actualizar_procesos_sistema()
-            
+            self.planificador.ejecutar_pendientes()
         except Exception as e:
             print(f"Error actualizando estado: {e}")
         
-        # Programar próxima actualización
+        # Programar próxima actualización para cuando toque el siguiente panel
         if self.root and self.root.winfo_exists():
-            intervalo = self.intervalo_var.get() if hasattr(self, 'intervalo_var') else 1000
-            self.actualizar_id = self.root.after(intervalo, self.actualizar_estado)
+            self.actualizar_id = self.root.after(self.planificador.tiempo_hasta_siguiente(),
+                                                 self.actualizar_estado)
+
+    def actualizar_datos(self):
+        """Recoge los datos compartidos por todos los paneles"""
+        # Incorporar el último muestreo de procesos y lanzar el siguiente sin bloquear
+        self.muestreador.recoger()
+        for pid in self.muestreador.tomar_desaparecidos():
+            self.marcar_proceso_terminado(pid)
+        self.muestreador.solicitar()
+
+        # Mantener el índice de nombres al día (solo consulta los pids nuevos)
+        if not self.reproductor:
+            self.indice_procesos.actualizar()
+
+        # Una sola muestra del sistema por ciclo, compartida por todos los paneles
+        self.muestra = self.obtener_muestra()
+
+    def actualizar_rendimiento(self):
+        """Muestra el tiempo de dibujo medido de cada panel"""
+        for item in self.tree_rendimiento.get_children():
+            self.tree_rendimiento.delete(item)
+        for nombre, intervalo, ultimo, promedio, omitidas in self.planificador.resumen():
+            self.tree_rendimiento.insert('', tk.END, values=(
+                nombre, f"{intervalo:.0f}", f"{ultimo:.1f}", f"{promedio:.1f}", str(omitidas)))
+
+    def obtener_muestra(self):
+        """Obtiene la muestra del ciclo actual, en vivo o desde la reproducción"""
+        if self.reproductor:
+            return self.reproductor.muestra_actual()
+        return dict(zip((nombre for nombre, _ in CAMPOS), obtener_muestra_compacta()))
 
     def actualizar_info_sistema(self):
         """Actualiza la información general del sistema"""
         try:
+            muestra = self.muestra
+            if not muestra:
+                return
+
             # CPU total
-            cpu_total = psutil.cpu_percent(interval=0.1)
-            self.labels_sistema['label_cpu_total'].config(text=f"{cpu_total:.1f}%")
+            self.labels_sistema['label_cpu_total'].config(text=f"{muestra['cpu_total']:.1f}%")
             
             # Memoria del sistema
-            memoria = psutil.virtual_memory()
-            mem_total_gb = memoria.total / (1024**3)
-            mem_usada_mb = memoria.used / (1024**2)
-            mem_libre_mb = memoria.available / (1024**2)
-            mem_porcentaje = memoria.percent
+            mem_total_gb = muestra['memoria_total'] / (1024**3)
+            mem_usada_mb = muestra['memoria_usada'] / (1024**2)
+            mem_libre_mb = muestra['memoria_libre'] / (1024**2)
+            mem_porcentaje = muestra['porcentaje_memoria']
             
             self.labels_sistema['label_ram_total'].config(text=f"{mem_total_gb:.1f} GB")
             self.labels_sistema['label_ram_usada'].config(text=f"{mem_usada_mb:.1f} MB")
@@ -722,76 +952,64 @@ class InterfazGrafica:
             self.labels_sistema['label_ram_porcentaje'].config(text=f"{mem_porcentaje:.1f}%")
             
             # Otros datos del sistema
-            self.labels_sistema['label_procesos_activos'].config(text=str(len(psutil.pids())))
-            self.labels_sistema['label_tiempo_activo'].config(text=f"{time.time() - psutil.boot_time():.0f}s")
+            self.labels_sistema['label_procesos_activos'].config(text=str(muestra['procesos_activos']))
+            if self.reproductor:
+                # En reproducción se muestra la hora grabada
+                marca = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(muestra['marca_tiempo']))
+                self.labels_sistema['label_tiempo_activo'].config(text=marca)
+            else:
+                self.labels_sistema['label_tiempo_activo'].config(text=f"{time.time() - psutil.boot_time():.0f}s")
             
             # Disco
-            disco = psutil.disk_usage('/')
-            self.labels_sistema['label_disco_usado'].config(text=f"{disco.percent:.1f}%")
+            self.labels_sistema['label_disco_usado'].config(text=f"{muestra['porcentaje_disco']:.1f}%")
             
         except Exception as e:
             print(f"Error actualizando info del sistema: {e}")
 
     def actualizar_info_proceso_monitoreado(self):
         """Actualiza la información del proceso monitoreado"""
+        muestra = self.muestra_proceso_seleccionado()
+        if muestra:
+            self.labels_proceso['label_proc_nombre'].config(text=muestra['nombre'])
+            self.labels_proceso['label_proc_pid'].config(text=str(muestra['pid']))
+            self.labels_proceso['label_proc_cpu'].config(text=f"{muestra['cpu']:.1f}%")
+            self.labels_proceso['label_proc_ram'].config(text=f"{muestra['memoria_mb']:.1f} MB")
+            self.labels_proceso['label_proc_estado'].config(text=muestra['estado'])
+            self.labels_proceso['label_proc_hilos'].config(text=str(muestra['hilos']))
+            self.labels_proceso['label_proc_usuario'].config(text=muestra['usuario'])
+            self.labels_proceso['label_proc_tiempo'].config(text=f"{muestra['tiempo']:.0f}s")
+        elif self.proceso_real_objeto is None:
+            # Limpiar información si no hay proceso monitoreado
+            for label in self.labels_proceso.values():
+                label.config(text="-")
+            self.labels_proceso['label_proc_nombre'].config(text="Ninguno")
+            self.labels_proceso['label_proc_cpu'].config(text="0%")
+            self.labels_proceso['label_proc_ram'].config(text="0 MB")
+            self.labels_proceso['label_proc_hilos'].config(text="0")
+
+    def actualizar_procesos_monitoreados(self):
+        """Actualiza la tabla de procesos monitoreados"""
         try:
-            if self.proceso_real_objeto:
-                proceso = self.proceso_real_objeto
-                
-                # Actualizar información del proceso
-                self.labels_proceso['label_proc_nombre'].config(text=proceso.name())
-                self.labels_proceso['label_proc_pid'].config(text=str(proceso.pid))
-                
-                # CPU del proceso
-                cpu_proc = proceso.cpu_percent(interval=0.1)
-                self.labels_proceso['label_proc_cpu'].config(text=f"{cpu_proc:.1f}%")
-                
-                # Memoria del proceso
-                mem_info = proceso.memory_info()
-                mem_mb = mem_info.rss / (1024**2)
-                self.labels_proceso['label_proc_ram'].config(text=f"{mem_mb:.1f} MB")
-                
-                # Estado del proceso
-                try:
-                    estado = proceso.status()
-                    self.labels_proceso['label_proc_estado'].config(text=estado)
-                except:
-                    self.labels_proceso['label_proc_estado'].config(text="ACTIVO")
-                
-                # Número de hilos
-                try:
-                    hilos = proceso.num_threads()
-                    self.labels_proceso['label_proc_hilos'].config(text=str(hilos))
-                except:
-                    self.labels_proceso['label_proc_hilos'].config(text="N/A")
-                
-                # Usuario
-                try:
-                    usuario = proceso.username()
-                    self.labels_proceso['label_proc_usuario'].config(text=usuario)
-                except:
-                    self.labels_proceso['label_proc_usuario'].config(text="N/A")
-                
-                # Tiempo de ejecución
-                try:
-                    tiempo = time.time() - proceso.create_time()
-                    self.labels_proceso['label_proc_tiempo'].config(text=f"{tiempo:.0f}s")
-                except:
-                    self.labels_proceso['label_proc_tiempo'].config(text="N/A")
-                    
-            else:
-                # Limpiar información si no hay proceso monitoreado
-                for label in self.labels_proceso.values():
-                    label.config(text="-")
-                self.labels_proceso['label_proc_nombre'].config(text="Ninguno")
-                self.labels_proceso['label_proc_cpu'].config(text="0%")
-                self.labels_proceso['label_proc_ram'].config(text="0 MB")
-                self.labels_proceso['label_proc_hilos'].config(text="0")
-                
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            # El proceso ya no existe
-            self.proceso_real_objeto = None
-            self.actualizar_info_proceso_monitoreado()
+            for item in self.tree_monitoreados.get_children():
+                self.tree_monitoreados.delete(item)
+
+            for pid in sorted(self.muestreador.monitoreados()):
+                muestra = self.muestreador.muestra(pid)
+                historial = self.muestreador.historial.get(pid)
+                if not muestra or not historial:
+                    continue
+                self.tree_monitoreados.insert('', tk.END, values=(
+                    pid,
+                    self.muestreador.nombres.get(pid, muestra['nombre']),
+                    f"{muestra['cpu']:.1f}",
+                    f"{historial.promedio_cpu():.1f}",
+                    f"{muestra['memoria_mb']:.1f}",
+                    f"{historial.maximo_memoria():.1f}",
+                    muestra['estado'],
+                    str(muestra['hilos'])
+                ))
+        except Exception as e:
+            print(f"Error actualizando procesos monitoreados: {e}")
 
     def actualizar_registros_simulados(self):
         """Actualiza los registros del microprocesador (simulados)"""
@@ -804,14 +1022,20 @@ class InterfazGrafica:
     def actualizar_graficos(self):
         """Actualiza los gráficos en tiempo real"""
         try:
+            if not hasattr(self, 'fig'):
+                self.crear_figura_graficos()
+
             self.ax_memoria.clear()
             self.ax_cpu.clear()
             self.ax_procesos.clear()
             
+            muestra = self.muestra
+            if not muestra:
+                return
+
             # Datos de memoria del sistema
-            memoria = psutil.virtual_memory()
-            mem_usada = memoria.used / (1024**3)
-            mem_libre = memoria.available / (1024**3)
+            mem_usada = muestra['memoria_usada'] / (1024**3)
+            mem_libre = muestra['memoria_libre'] / (1024**3)
             
             # Gráfico de memoria
             self.ax_memoria.pie([mem_usada, mem_libre], 
@@ -821,13 +1045,9 @@ class InterfazGrafica:
             self.ax_memoria.set_title('Uso de Memoria RAM')
             
             # Gráfico de CPU
-            cpu_total = psutil.cpu_percent(interval=0.1)
-            cpu_proc = 0
-            if self.proceso_real_objeto:
-                try:
-                    cpu_proc = self.proceso_real_objeto.cpu_percent(interval=0.1)
-                except:
-                    pass
+            cpu_total = muestra['cpu_total']
+            muestra_proceso = self.muestra_proceso_seleccionado()
+            cpu_proc = muestra_proceso['cpu'] if muestra_proceso else 0
             
             categorias_cpu = ['Sistema', 'Proceso']
             valores_cpu = [cpu_total, cpu_proc]
@@ -844,9 +1064,9 @@ class InterfazGrafica:
                 self.ax_cpu.text(bar.get_x() + bar.get_width()/2., height + 1,
                                 f'{valor:.1f}%', ha='center', va='bottom')
             
-            # Gráfico de procesos (top 5 por memoria)
+            # Gráfico de procesos (top 5 por memoria; la grabación no incluye procesos)
             procesos = []
-            for proc in psutil.process_iter(['name', 'memory_info']):
+            for proc in ([] if self.reproductor else psutil.process_iter(['name', 'memory_info'])):
                 try:
                     info = proc.info
                     if info['memory_info']:
@@ -884,12 +1104,24 @@ class InterfazGrafica:
             
             # Obtener métricas del sistema
             metricas = []
+
+            if self.reproductor:
+                # Solo se dispone de las columnas grabadas
+                muestra = self.muestra
+                metricas.append(("=== REPRODUCCIÓN ===", "=========="))
+                metricas.append(("Archivo", self.reproductor.lector.ruta))
+                metricas.append(("Progreso", f"{self.reproductor.progreso() * 100:.1f}%"))
+                for nombre, valor in muestra.items():
+                    metricas.append((nombre.replace('_', ' ').capitalize(),
+                                     f"{valor:.2f}" if isinstance(valor, float) else str(valor)))
+                for metrica, valor in metricas:
+                    self.tree_metricas.insert('', tk.END, values=(metrica, valor))
+                return
             
             # Información de CPU
-            cpu_per_core = psutil.cpu_percent(percpu=True)
             metricas.extend([
                 ("=== INFORMACIÓN DE CPU ===", "=========="),
-                ("CPU Total del Sistema", f"{psutil.cpu_percent(interval=0.1):.1f}%"),
+                ("CPU Total del Sistema", f"{self.muestra.get('cpu_total', 0):.1f}%"),
                 ("Núcleos de CPU Físicos", str(psutil.cpu_count(logical=False))),
                 ("Núcleos de CPU Lógicos", str(psutil.cpu_count(logical=True))),
                 ("Frecuencia de CPU Actual", f"{psutil.cpu_freq().current:.1f} MHz"),
@@ -938,22 +1170,19 @@ class InterfazGrafica:
             ])
             
             # Información del proceso monitoreado (si existe)
-            if self.proceso_real_objeto:
-                try:
-                    proc = self.proceso_real_objeto
-                    mem_info = proc.memory_info()
-                    metricas.extend([
-                        ("=== PROCESO MONITOREADO ===", "=========="),
-                        ("Nombre del Proceso", proc.name()),
-                        ("PID del Proceso", str(proc.pid)),
-                        ("CPU del Proceso", f"{proc.cpu_percent(interval=0.1):.1f}%"),
-                        ("Memoria del Proceso", f"{mem_info.rss / (1024**2):.2f} MB"),
-                        ("Estado del Proceso", proc.status()),
-                        ("Hilos del Proceso", str(proc.num_threads())),
-                        ("Tiempo de Ejecución", f"{time.time() - proc.create_time():.0f} segundos"),
-                    ])
-                except:
-                    pass
+            muestra_proceso = self.muestra_proceso_seleccionado()
+            if muestra_proceso:
+                metricas.extend([
+                    ("=== PROCESO MONITOREADO ===", "=========="),
+                    ("Nombre del Proceso", muestra_proceso['nombre']),
+                    ("PID del Proceso", str(muestra_proceso['pid'])),
+                    ("CPU del Proceso", f"{muestra_proceso['cpu']:.1f}%"),
+                    ("Memoria del Proceso", f"{muestra_proceso['memoria_mb']:.2f} MB"),
+                    ("Estado del Proceso", muestra_proceso['estado']),
+                    ("Hilos del Proceso", str(muestra_proceso['hilos'])),
+                    ("Tiempo de Ejecución", f"{muestra_proceso['tiempo']:.0f} segundos"),
+                ])
+            metricas.append(("Procesos Monitoreados", str(len(self.muestreador.monitoreados()))))
             
             for metrica, valor in metricas:
                 self.tree_metricas.insert('', tk.END, values=(metrica, valor))
@@ -963,6 +1192,10 @@ class InterfazGrafica:
 
     def actualizar_procesos_sistema(self):
         """Actualiza la tabla de procesos del sistema"""
+        if self.reproductor:
+            # La grabación solo contiene métricas globales
+            return
+
         try:
             # Limpiar tabla
             for item in self.tree_procesos.get_children():
@@ -0,0 +1,184 @@
+import os
+import platform
+import shutil
+import subprocess
+import threading
+import time
+import psutil
+
+# Comandos candidatos por ejecutable (en minúsculas) y sistema operativo.
+# Se usa el primero cuyo programa exista. En Windows `start /wait` mantiene a
+# cmd como padre del programa para poder seguirlo como descendiente.
+COMANDOS_PROGRAMAS = {
+    'winword.exe': {
+        'Windows': [['cmd', '/c', 'start', '', '/wait', 'winword']],
+        'Otros': [['libreoffice', '--writer'], ['soffice', '--writer']]
+    },
+    'excel.exe': {
+        'Windows': [['cmd', '/c', 'start', '', '/wait', 'excel']],
+        'Otros': [['libreoffice', '--calc'], ['soffice', '--calc']]
+    },
+    'chrome.exe': {
+        'Windows': [['cmd', '/c', 'start', '', '/wait', 'chrome']],
+        'Otros': [['google-chrome'], ['chromium'], ['chromium-browser'], ['firefox']]
+    },
+    'studio64.exe': {
+        'Windows': [[r"C:\Program Files\Android\Android Studio\bin\studio64.exe"],
+                    [r"C:\Program Files (x86)\Android\Android Studio\bin\studio64.exe"]],
+        'Otros': [['android-studio'], ['studio.sh'], ['/opt/android-studio/bin/studio.sh']]
+    },
+    'code.exe': {
+        'Windows': [['cmd', '/c', 'start', '', '/wait', 'code']],
+        'Otros': [['code'], ['codium']]
+    },
+    'notepad.exe': {
+        'Windows': [['notepad.exe']],
+        'Otros': [['gedit'], ['gnome-text-editor'], ['mousepad'], ['kate'], ['xed']]
+    },
+    'calc.exe': {
+        'Windows': [['calc.exe']],
+        'Otros': [['gnome-calculator'], ['kcalc'], ['galculator'], ['xcalc']]
+    },
+    'mspaint.exe': {
+        'Windows': [['mspaint.exe']],
+        'Otros': [['pinta'], ['kolourpaint'], ['gimp']]
+    },
+    'cmd.exe': {
+        'Windows': [['cmd', '/c', 'start', '', '/wait', 'cmd']],
+        'Otros': [['x-terminal-emulator'], ['gnome-terminal', '--wait'], ['konsole'], ['xterm']]
+    },
+    'explorer.exe': {
+        'Windows': [['explorer.exe']],
+        'Otros': [['nautilus', '--new-window'], ['thunar'], ['dolphin'], ['pcmanfm']]
+    },
+}
+
+def resolver_comando(nombre_ejecutable):
+    """Retorna la lista de argumentos para abrir un programa en este sistema o None"""
+    sistema = 'Windows' if platform.system() == 'Windows' else 'Otros'
+    candidatos = COMANDOS_PROGRAMAS.get(nombre_ejecutable.lower(), {}).get(sistema)
+    if candidatos is None:
+        # Programa desconocido: se intenta ejecutar tal cual
+        candidatos = [[nombre_ejecutable]]
+
+    for comando in candidatos:
+        programa = comando[0]
+        if os.path.isabs(programa) and os.path.exists(programa):
+            return comando
+        ruta = shutil.which(programa)
+        if ruta:
+            return [ruta] + comando[1:]
+    return None
+
+# Procesos que solo envuelven al programa real (ver `start /wait` arriba)
+_ENVOLTORIOS = {'cmd.exe'}
+
+def _esta_vivo(proceso):
+    try:
+        return proceso.is_running() and proceso.status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+
+def _procesos_de_sesion(sid):
+    procesos = []
+    for pid in psutil.pids():
+        try:
+            if os.getsid(pid) == sid:
+                procesos.append(psutil.Process(pid))
+        except (OSError, psutil.NoSuchProcess):
+            continue
+    return procesos
+
+class LanzadorProgramas:
+    """Lanza programas en segundo plano y sigue su pid sin bloquear la interfaz"""
+
+    def __init__(self, espera_maxima=10.0, gracia=0.5, intervalo=0.1):
+        self.espera_maxima = espera_maxima  # segundos hasta dar el lanzamiento por fallido
+        self.gracia = gracia  # segundos vivo para considerar listo al proceso
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._en_curso = 0
+
+    def en_curso(self):
+        """Número de lanzamientos que aún no notificaron su resultado"""
+        with self._lock:
+            return self._en_curso
+
+    def lanzar(self, comando, al_listo):
+        """Lanza `comando` en un hilo; llama a al_listo(proceso_psutil, error) desde ese hilo"""
+        with self._lock:
+            self._en_curso += 1
+        hilo = threading.Thread(target=self._seguir, args=(comando, al_listo),
+                                name=f"lanzador-{os.path.basename(comando[0])}", daemon=True)
+        hilo.start()
+        return hilo
+
+    def _seguir(self, comando, al_listo):
+        try:
+            proceso, error = self._esperar_listo(comando)
+        except Exception as e:
+            proceso, error = None, e
+        try:
+            al_listo(proceso, error)
+        finally:
+            # Después de notificar: quien ve en_curso() == 0 ya tiene el resultado
+            with self._lock:
+                self._en_curso -= 1
+
+    def _esperar_listo(self, comando):
+        """Lanza el comando y espera a que él o alguno de sus descendientes quede en ejecución"""
+        opciones = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL,
+                    'stderr': subprocess.DEVNULL}
+        if os.name == 'posix':
+            # Sesión propia: el programa no muere al cerrar el simulador
+            opciones['start_new_session'] = True
+        try:
+            hijo = subprocess.Popen(comando, **opciones)
+        except OSError as e:
+            return None, e
+
+        conocidos = {}  # pid -> psutil.Process (el hijo y todos sus descendientes vistos)
+        try:
+            conocidos[hijo.pid] = psutil.Process(hijo.pid)
+        except psutil.NoSuchProcess:
+            pass
+
+        inicio = time.monotonic()
+        while time.monotonic() - inicio < self.espera_maxima:
+            # Los lanzadores suelen crear el proceso real y terminar: se recuerdan los
+            # descendientes mientras su padre vive, porque al morir éste se reasignan
+            for proceso in list(conocidos.values()):
+                try:
+                    for descendiente in proceso.children(recursive=True):
+                        conocidos.setdefault(descendiente.pid, descendiente)
+                except psutil.NoSuchProcess:
+                    continue
+
+            transcurrido = time.monotonic() - inicio
+            vivos = [p for pid, p in conocidos.items() if pid != hijo.pid and _esta_vivo(p)]
+            if hijo.poll() is None:
+                if transcurrido >= self.gracia:
+                    raiz = conocidos.get(hijo.pid)
+                    if raiz is None:
+                        return None, RuntimeError(f"No se pudo seguir el proceso lanzado (pid {hijo.pid})")
+                    try:
+                        envoltorio = raiz.name().lower() in _ENVOLTORIOS
+                    except psutil.Error:
+                        envoltorio = None  # acaba de terminar: la siguiente vuelta lo ve con poll()
+                    if envoltorio is not None:
+                        if vivos and envoltorio:
+                            return min(vivos, key=lambda p: p.create_time()), None
+                        return raiz, None
+            else:
+                if not vivos and os.name == 'posix':
+                    # Descendientes que se reasignaron antes de verlos: comparten la sesión del hijo
+                    vivos = [p for p in _procesos_de_sesion(hijo.pid) if _esta_vivo(p)]
+                if vivos:
+                    # El descendiente más antiguo suele ser el proceso principal del programa
+                    return min(vivos, key=lambda p: p.create_time()), None
+                if transcurrido >= self.gracia:
+                    return None, RuntimeError(f"El programa terminó con código {hijo.returncode}")
+
+            time.sleep(self.intervalo)
+
+        return None, TimeoutError(f"El programa no quedó en ejecución en {self.espera_maxima:.0f} s")
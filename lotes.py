@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Modo por lotes del simulador: carga programas, ejecuta la simulación hasta
+terminar y emite las estadísticas en texto o JSON, sin interfaz gráfica.
+
+Ejemplos:
+    python lotes.py --programa programas/programa1.exe
+    python lotes.py --imagen chrome.simx --limite-ciclos 5000000
+    python lotes.py --asm programa.asm
+    python lotes.py --generar prueba:64 --semilla 1 --config config.json --formato json
+    python main.py --simular --programa programas/programa2.exe
+"""
+
+import argparse
+import ast
+import json
+import os
+import random
+import sys
+import time
+from microprocesador import Microprocesador
+from memoria import SistemaMemoria, Proceso
+from utils import CONFIGURACION_POR_DEFECTO, generar_programa_ejemplo
+from imagen_programa import cargar_imagen
+
+def cargar_programas_fuente(ruta):
+    """Lee las listas de instrucciones de un archivo de programas/ sin ejecutarlo"""
+    with open(ruta, encoding='utf-8') as archivo:
+        arbol = ast.parse(archivo.read(), filename=ruta)
+
+    programas = []
+    for nodo in arbol.body:
+        if isinstance(nodo, ast.Assign) and isinstance(nodo.value, ast.List):
+            # literal_eval solo acepta literales: no se ejecuta código del archivo
+            instrucciones = ast.literal_eval(nodo.value)
+            for destino in nodo.targets:
+                if isinstance(destino, ast.Name):
+                    programas.append((destino.id, [int(i) for i in instrucciones]))
+    if not programas:
+        raise ValueError(f"{ruta} no define ninguna lista de instrucciones")
+    return programas
+
+def cargar_config(fuente=None):
+    """Combina la configuración por defecto con un archivo JSON o un texto JSON"""
+    config = dict(CONFIGURACION_POR_DEFECTO)
+    if fuente:
+        if os.path.exists(fuente):
+            with open(fuente, encoding='utf-8') as archivo:
+                config.update(json.load(archivo))
+        else:
+            config.update(json.loads(fuente))
+    return config
+
+def simular_programa(proceso, config, limite_ciclos=None, instrumentacion=None):
+    """Ejecuta un proceso en un microprocesador y sistema de memoria nuevos; retorna sus estadísticas"""
+    micro = Microprocesador(config['tamano_cache_l1'], config['tamano_cache_l2'])
+    sistema_memoria = SistemaMemoria(config)
+
+    sistema_memoria.asignar_memoria(proceso, len(proceso.instrucciones) * 4)
+    micro.conectar_memoria(sistema_memoria)
+    micro.cargar_programa(proceso)
+
+    if instrumentacion is not None:
+        instrumentacion.activar(micro, sistema_memoria)
+    inicio = time.perf_counter()
+    try:
+        ejecutadas = micro.ejecutar_programa(limite_ciclos)
+    finally:
+        duracion = time.perf_counter() - inicio
+        if instrumentacion is not None:
+            instrumentacion.desactivar()
+
+    return {
+        'nombre': proceso.nombre,
+        'instrucciones': len(proceso.instrucciones),
+        'instrucciones_ejecutadas': ejecutadas,
+        'terminado': micro.estado == "DETENIDO",
+        'tiempo_s': duracion,
+        'instrucciones_por_segundo': ejecutadas / duracion if duracion > 0 else 0,
+        'microprocesador': micro.obtener_estado(),
+        'cache_l1': micro.cache_l1.obtener_estadisticas(),
+        'cache_l2': micro.cache_l2.obtener_estadisticas(),
+        'memoria': sistema_memoria.obtener_estadisticas(),
+    }
+
+def ejecutar_lote(programas, config, limite_ciclos=None, instrumentacion=None):
+    """Simula cada (nombre, instrucciones[, punto_entrada]) y retorna el informe completo"""
+    resultados = []
+    for i, (nombre, instrucciones, *entrada) in enumerate(programas, start=1):
+        tamano_kb = max(1, (len(instrucciones) * 4 + 1023) // 1024)
+        proceso = Proceso(i, nombre, tamano_kb, instrucciones)
+        proceso.direccion_inicio = entrada[0] if entrada else 0
+        resultados.append(simular_programa(proceso, config, limite_ciclos, instrumentacion))
+    informe = {'config': config, 'programas': resultados}
+    if instrumentacion is not None:
+        informe['instrumentacion'] = instrumentacion.resumen()
+    return informe
+
+def imprimir_informe(informe, salida=sys.stdout):
+    """Imprime el informe en texto legible"""
+    for resultado in informe['programas']:
+        l1, l2, mem = resultado['cache_l1'], resultado['cache_l2'], resultado['memoria']
+        print(f"=== {resultado['nombre']} ===", file=salida)
+        print(f"Instrucciones ejecutadas: {resultado['instrucciones_ejecutadas']} "
+              f"de {resultado['instrucciones']} ({'terminado' if resultado['terminado'] else 'interrumpido'})",
+              file=salida)
+        print(f"Tiempo: {resultado['tiempo_s']:.4f} s ({resultado['instrucciones_por_segundo']:.0f} instr/s)",
+              file=salida)
+        print(f"Ciclos: {resultado['microprocesador']['ciclos']}", file=salida)
+        registros = resultado['microprocesador']['registros']
+        print("Registros: " + ", ".join(f"{r}={v}" for r, v in registros.items()), file=salida)
+        print(f"Cache L1: {l1['accesos']} accesos, {l1['tasa_impactos']:.1f}% impactos", file=salida)
+        print(f"Cache L2: {l2['accesos']} accesos, {l2['tasa_impactos']:.1f}% impactos", file=salida)
+        print(f"Memoria: {mem['accesos_memoria']} accesos, {mem['fallos_pagina']} fallos de página "
+              f"({mem['tasa_fallos_pagina']:.1f}%), {mem['paginas_swap']} páginas en swap", file=salida)
+
+def crear_parser():
+    """Define los argumentos del modo por lotes"""
+    parser = argparse.ArgumentParser(description="Ejecuta el simulador por lotes sin interfaz gráfica")
+    parser.add_argument('--programa', action='append', default=[], metavar='RUTA',
+                        help="Archivo de programas/ a simular (se puede repetir)")
+    parser.add_argument('--imagen', action='append', default=[], metavar='RUTA',
+                        help="Imagen binaria .simx a simular (se puede repetir)")
+    parser.add_argument('--asm', action='append', default=[], metavar='RUTA',
+                        help="Fuente en ensamblador a simular (se ensambla con cache)")
+    parser.add_argument('--generar', action='append', default=[], metavar='NOMBRE:KB',
+                        help="Genera un programa de ejemplo con utils.generar_programa_ejemplo")
+    parser.add_argument('--semilla', type=int, default=None,
+                        help="Semilla aleatoria para los programas generados")
+    parser.add_argument('--config', default=None, metavar='RUTA|JSON',
+                        help="Archivo JSON o texto JSON con la configuración del sistema")
+    parser.add_argument('--limite-ciclos', type=int, default=1000000,
+                        help="Ciclos máximos por programa (los saltos pueden formar bucles)")
+    parser.add_argument('--instrumentar', action='store_true',
+                        help="Cuenta tiempo por opcode, accesos, fallos y desalojos por proceso y cache por región")
+    parser.add_argument('--perfil', default=None, metavar='RUTA',
+                        help="Exporta la instrumentación en formato pstats (implica --instrumentar)")
+    parser.add_argument('--traza-chrome', default=None, metavar='RUTA',
+                        help="Exporta eventos en formato Chrome trace (implica --instrumentar)")
+    parser.add_argument('--formato', choices=['texto', 'json'], default='texto',
+                        help="Formato del informe")
+    parser.add_argument('--salida', default=None, metavar='RUTA',
+                        help="Archivo donde escribir el informe (por defecto la salida estándar)")
+    return parser
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+
+    if args.semilla is not None:
+        random.seed(args.semilla)
+
+    programas = []
+    for ruta in args.programa:
+        programas.extend(cargar_programas_fuente(ruta))
+    for especificacion in args.generar:
+        nombre, _, tamano = especificacion.partition(':')
+        programas.append((nombre, generar_programa_ejemplo(nombre, int(tamano or 4))))
+
+    # Las imágenes se ejecutan directamente desde el mapa en memoria
+    fuentes_imagenes = [(ruta, os.path.basename(ruta)) for ruta in args.imagen]
+    if args.asm:
+        from ensamblador import ensamblar_archivo, ErrorEnsamblado
+        try:
+            fuentes_imagenes.extend((ensamblar_archivo(ruta), os.path.basename(ruta)) for ruta in args.asm)
+        except ErrorEnsamblado as e:
+            print(f"Error ensamblando: {e}", file=sys.stderr)
+            return 1
+    imagenes = [cargar_imagen(ruta) for ruta, _ in fuentes_imagenes]
+    for imagen, (_, nombre) in zip(imagenes, fuentes_imagenes):
+        programas.append((nombre, imagen.instrucciones, imagen.punto_entrada))
+    if not programas:
+        crear_parser().error("indique al menos un --programa, --imagen, --asm o --generar")
+
+    instrumentacion = None
+    if args.instrumentar or args.perfil or args.traza_chrome:
+        from instrumentacion import Instrumentacion
+        instrumentacion = Instrumentacion(eventos=bool(args.traza_chrome))
+
+    try:
+        informe = ejecutar_lote(programas, cargar_config(args.config), args.limite_ciclos, instrumentacion)
+    finally:
+        programas.clear()
+        for imagen in imagenes:
+            imagen.cerrar()
+
+    salida = open(args.salida, 'w', encoding='utf-8') if args.salida else sys.stdout
+    try:
+        if args.formato == 'json':
+            json.dump(informe, salida, indent=2, ensure_ascii=False)
+            print(file=salida)
+        else:
+            imprimir_informe(informe, salida)
+            if instrumentacion is not None:
+                instrumentacion.imprimir(salida)
+    finally:
+        if args.salida:
+            salida.close()
+
+    if args.perfil:
+        instrumentacion.exportar_pstats(args.perfil)
+    if args.traza_chrome:
+        instrumentacion.exportar_chrome(args.traza_chrome)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,31 +7,108 @@ Autor: Asistente DeepSeek
 import sys
 import os
 import random
+import argparse
 from microprocesador import Microprocesador, Cache, MMU
 from memoria import SistemaMemoria, MemoriaPrincipal, GestorPaginacion, GestorSegmentacion, GestorMemoriaVirtual, Proceso
-from interfaz import InterfazGrafica
+from utils import CONFIGURACION_POR_DEFECTO
 
-def main():
+def _real_positivo(texto):
+    """Tipo de argparse: número real mayor que cero"""
+    try:
+        valor = float(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{texto!r} no es un número")
+    if not valor > 0 or valor == float('inf'):
+        raise argparse.ArgumentTypeError(f"debe ser positivo: {texto}")
+    return valor
+
+def crear_parser():
+    """Define los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Simulador de Arquitectura de Microprocesador")
+    parser.add_argument('--sin-interfaz', action='store_true',
+                        help="Graba métricas del sistema sin abrir la ventana")
+    parser.add_argument('--salida', default='metricas.bin',
+                        help="Archivo de métricas para el modo sin interfaz")
+    parser.add_argument('--frecuencia', type=_real_positivo, default=1.0,
+                        help="Muestras por segundo en el modo sin interfaz")
+    parser.add_argument('--duracion', type=float, default=None,
+                        help="Segundos a grabar (por defecto hasta Ctrl+C)")
+    parser.add_argument('--muestras', type=int, default=None,
+                        help="Número de muestras a grabar")
+    parser.add_argument('--lote', type=int, default=64,
+                        help="Muestras acumuladas antes de escribir a disco")
+    parser.add_argument('--reproducir', metavar='ARCHIVO', default=None,
+                        help="Muestra en la interfaz un archivo de métricas grabado")
+    parser.add_argument('--velocidad', type=float, default=1.0,
+                        help="Factor de velocidad de la reproducción (0: un registro por actualización)")
+    parser.add_argument('--desde', type=float, default=None,
+                        help="Marca de tiempo (epoch) desde la que empezar a reproducir")
+    parser.add_argument('--metricas-puerto', type=int, default=None, metavar='PUERTO',
+                        help="Sirve métricas Prometheus/OpenMetrics en http://HOST:PUERTO/metrics")
+    parser.add_argument('--metricas-host', default='127.0.0.1',
+                        help="Dirección en la que escucha el exportador de métricas")
+    parser.add_argument('--simular', nargs=argparse.REMAINDER, default=None, metavar='ARGS',
+                        help="Ejecuta la simulación por lotes sin interfaz (ver: main.py --simular --help)")
+    return parser
+
+def iniciar_exportador(args, micro=None, sistema_memoria=None):
+    """Arranca el exportador de métricas si se pidió un puerto"""
+    if args.metricas_puerto is None:
+        return None
+    from exportador_metricas import ExportadorMetricas
+
+    exportador = ExportadorMetricas(micro, sistema_memoria, args.metricas_host, args.metricas_puerto)
+    exportador.iniciar()
+    print(f"Métricas en {exportador.url}")
+    return exportador
+
+def main(argv=None):
     """Función principal del simulador"""
+    args = crear_parser().parse_args(argv)
+
+    if args.simular is not None:
+        import lotes
+        return lotes.main(args.simular)
+
+    if args.sin_interfaz:
+        from registro_metricas import grabar_sin_interfaz
+
+        exportador = iniciar_exportador(args)
+        print(f"Grabando métricas en {args.salida} a {args.frecuencia} muestras/s (Ctrl+C para terminar)")
+        grabadas = grabar_sin_interfaz(args.salida, intervalo=1.0 / args.frecuencia,
+                                       duracion=args.duracion, muestras=args.muestras,
+                                       lote=args.lote)
+        print(f"{grabadas} muestras grabadas")
+        if exportador:
+            exportador.detener()
+        return
+
     print("=== Simulador de Arquitectura de Microprocesador ===")
     print("Inicializando componentes...")
-    
+
     # Configuración del sistema
-    config = {
-        'tamano_memoria_principal': 1024,  # KB
-        'tamano_cache_l1': 64,  # KB
-        'tamano_cache_l2': 256,  # KB
-        'tamano_pagina': 4,  # KB
-        'algoritmo_reemplazo': 'LRU'
-    }
-    
+    config = dict(CONFIGURACION_POR_DEFECTO)
+
     # Crear instancias
-    microprocesador = Microprocesador()
+    microprocesador = Microprocesador(config['tamano_cache_l1'], config['tamano_cache_l2'])
     sistema_memoria = SistemaMemoria(config)
-    
-    # Iniciar interfaz gráfica
-    app = InterfazGrafica(microprocesador, sistema_memoria)
-    app.iniciar()
+
+    reproductor = None
+    if args.reproducir:
+        from registro_metricas import LectorMetricas, ReproductorMetricas
+        reproductor = ReproductorMetricas(LectorMetricas(args.reproducir),
+                                          velocidad=args.velocidad, inicio=args.desde)
+
+    exportador = iniciar_exportador(args, microprocesador, sistema_memoria)
+
+    # Iniciar interfaz gráfica (Tk solo se importa en este modo)
+    from interfaz import InterfazGrafica
+    app = InterfazGrafica(microprocesador, sistema_memoria, reproductor=reproductor)
+    try:
+        app.iniciar()
+    finally:
+        if exportador:
+            exportador.detener()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -1,6 +1,6 @@
 import random
+from array import array
 from collections import OrderedDict, deque
-import psutil
 
 class Proceso:
     """Representa un proceso en el sistema con datos reales"""
@@ -27,6 +27,13 @@ class Proceso:
         """Verifica si el proceso ha terminado"""
         return self.contador_programa >= len(self.instrucciones)
 
+POLITICAS_PAGINAS_GRANDES = ('nunca', 'promocion', 'al_fallo')
+
+
+class ErrorMemoriaAgotada(MemoryError):
+    """Un fallo de página no se pudo atender: no hay marco libre ni víctima"""
+
+
 class SistemaMemoria:
     """Sistema completo de gestión de memoria con datos reales"""
     
@@ -37,7 +44,17 @@ class SistemaMemoria:
         self.memoria_principal = MemoriaPrincipal(config['tamano_memoria_principal'])
         
         # Gestores de memoria
-        self.paginacion = GestorPaginacion(config['tamano_pagina'])
+        # Páginas grandes: 'nunca', 'promocion' (se juntan las regiones muy usadas)
+        # o 'al_fallo' (el primer fallo de una región vacía carga la página grande)
+        self.paginas_grandes = config.get('paginas_grandes', 'nunca')
+        if self.paginas_grandes not in POLITICAS_PAGINAS_GRANDES:
+            raise ValueError(f"Política de páginas grandes desconocida: {self.paginas_grandes}")
+        self.umbral_promocion = config.get('umbral_promocion', 0.5)
+        self.paginacion = GestorPaginacion(config['tamano_pagina'],
+                                           self.memoria_principal.tamano // (config['tamano_pagina'] * 1024),
+                                           config.get('tamano_pagina_grande', 2048)
+                                           if self.paginas_grandes != 'nunca' else 0)
+        self.paginacion.reservar_grandes = self.paginas_grandes == 'al_fallo'
         self.segmentacion = GestorSegmentacion()
         self.memoria_virtual = GestorMemoriaVirtual(config['tamano_memoria_principal'])
         
@@ -50,13 +67,27 @@ class SistemaMemoria:
         self.estadisticas = {
             'accesos_memoria': 0,
             'fallos_pagina': 0,
+            'fallos_cow': 0,
             'fragmentacion_externa': 0,
             'fragmentacion_interna': 0
         }
+
+        # Último punto de control guardado o restaurado (base de los incrementales)
+        self.ultimo_checkpoint = None
+
+        # Funciones (inicio, fin) que descartan de las caches las direcciones
+        # físicas de un marco cuando cambia de página
+        self.invalidadores = []
+
+        # Reparto de marcos por proceso (ver asignacion_marcos.py); None: reemplazo global
+        self.asignacion = None
     
     def obtener_estadisticas_reales(self):
         """Obtiene estadísticas reales del sistema"""
         try:
+            # psutil solo se necesita aquí; el núcleo del simulador no depende de él
+            import psutil
+
             memoria = psutil.virtual_memory()
             swap = psutil.swap_memory()
             
@@ -82,7 +113,16 @@ class SistemaMemoria:
         proceso_id = proceso.id
         
         if self.modo_memoria == 'paginacion':
-            return self.paginacion.asignar_memoria(proceso_id, tamano)
+            paginas = self.paginacion.asignar_memoria(proceso_id, tamano)
+            tabla = self.paginacion.tabla_paginas[proceso_id]
+            for pagina in paginas:
+                info = tabla.get(pagina)
+                if info is None:
+                    if pagina % self.paginacion.paginas_por_grande == 0:
+                        self._llenar_grande(proceso_id, pagina // self.paginacion.paginas_por_grande)
+                elif info['presente']:
+                    self._preparar_marco(proceso_id, pagina)
+            return paginas
         else:
             return self.segmentacion.asignar_memoria(proceso_id, tamano)
     
@@ -90,24 +130,219 @@ class SistemaMemoria:
         """Libera memoria de un proceso"""
         if self.modo_memoria == 'paginacion':
             self.paginacion.liberar_memoria(proceso_id)
+            self.memoria_virtual.liberar_proceso(proceso_id)
         else:
             self.segmentacion.liberar_memoria(proceso_id)
     
+    def activar_asignacion(self, **opciones):
+        """Reparte los marcos entre procesos con cuotas; retorna el GestorAsignacion"""
+        from asignacion_marcos import GestorAsignacion
+        self.asignacion = GestorAsignacion(self, **opciones)
+        return self.asignacion
+
+    def desactivar_asignacion(self):
+        """Vuelve al reemplazo global sin cuotas"""
+        self.asignacion = None
+
     def acceder_memoria(self, direccion, proceso_id, operacion='lectura'):
-        """Simula acceso a memoria"""
+        """Simula acceso a memoria; retorna False si hubo fallo de página"""
         self.estadisticas['accesos_memoria'] += 1
+        if self.asignacion is not None:
+            self.asignacion.registrar_acceso(proceso_id)
         
         if self.modo_memoria == 'paginacion':
-            exito = self.paginacion.acceder_pagina(direccion, proceso_id, operacion)
+            exito = self.paginacion.traducir(direccion, proceso_id, operacion) is not None
             if not exito:
                 self.estadisticas['fallos_pagina'] += 1
                 self.manejar_fallo_pagina(direccion, proceso_id)
             return exito
         else:
             return self.segmentacion.acceder_segmento(direccion, proceso_id, operacion)
+
+    def traducir_direccion(self, direccion, proceso_id, operacion='lectura'):
+        """Traduce una dirección lógica a una física de memoria_principal
+
+        Es el camino de la MMU: un fallo de página se atiende aquí mismo y se
+        retorna la dirección ya cargada. Si no hay ningún marco para la página
+        lanza ErrorMemoriaAgotada.
+        """
+        self.estadisticas['accesos_memoria'] += 1
+        if self.asignacion is not None:
+            self.asignacion.registrar_acceso(proceso_id)
+
+        if self.modo_memoria != 'paginacion':
+            # Los segmentos simulados empiezan en 0: la dirección lógica es la física
+            return direccion
+        fisica = self.paginacion.traducir(direccion, proceso_id, operacion)
+        if fisica is None:
+            self.estadisticas['fallos_pagina'] += 1
+            self.manejar_fallo_pagina(direccion, proceso_id)
+            fisica = self.paginacion.traducir(direccion, proceso_id, operacion)
+            if fisica is None:
+                raise ErrorMemoriaAgotada(
+                    f"Sin marcos para la dirección {direccion:#x} del proceso {proceso_id}")
+        return fisica
     
+    def fork(self, proceso_id, nuevo_id):
+        """Duplica el espacio de direcciones de un proceso sin copiar marcos (copy-on-write)"""
+        paginas = self.paginacion.fork(proceso_id, nuevo_id)
+        self.memoria_virtual.copiar_proceso(proceso_id, nuevo_id)
+        return paginas
+
+    def compartir_codigo(self, proceso_id, clave, tamano):
+        """Mapea `tamano` bytes de código de solo lectura compartido por los procesos con la misma clave"""
+        return self.paginacion.compartir_codigo(proceso_id, clave, tamano)
+
     def manejar_fallo_pagina(self, direccion, proceso_id):
-        """Maneja fallos de página usando el algoritmo de reemplazo seleccionado"""
+        """Carga la página en un marco libre o en el de la víctima del algoritmo de reemplazo
+
+        Atiende también las escrituras en páginas copy-on-write (copia privada
+        del marco compartido) y las páginas de código ya cargadas por otro
+        proceso (se mapea el mismo marco).
+        """
+        paginacion = self.paginacion
+        nueva_pagina = direccion // paginacion.tamano_pagina
+        datos = None
+        info = paginacion.tabla_paginas.get(proceso_id, {}).get(nueva_pagina)
+        if info is not None:
+            if info['presente']:
+                # Escritura en una página copy-on-write
+                self.estadisticas['fallos_cow'] = self.estadisticas.get('fallos_cow', 0) + 1
+                marco = info['marco']
+                if marco not in paginacion.compartidos:
+                    paginacion.hacer_privada(proceso_id, nueva_pagina)
+                    return
+                datos = self.memoria_principal.copiar_bloque(marco * paginacion.tamano_pagina,
+                                                             paginacion.tamano_pagina)
+                paginacion.desmapear(proceso_id, nueva_pagina)
+                info.pop('imagen', None)
+            elif paginacion.mapear_imagen(proceso_id, nueva_pagina):
+                return
+
+        if self.paginas_grandes == 'al_fallo' and datos is None and self._fallo_grande(proceso_id, nueva_pagina):
+            return
+
+        pagina_victima = None
+        if self.asignacion is not None:
+            # Con cuotas la víctima sale del propio proceso o de uno que excede la suya
+            self.asignacion.registrar_fallo(proceso_id, nueva_pagina)
+            pagina_victima = self.asignacion.elegir_victima(proceso_id)
+        if pagina_victima is None:
+            if paginacion.cargar_pagina(proceso_id, nueva_pagina) is None and paginacion.grandes_en_memoria:
+                # Sin marcos libres se divide la página grande peor aprovechada:
+                # sus subpáginas sin usar quedan libres y las demás son víctimas normales
+                paginacion.degradar(*paginacion.grande_menos_aprovechada())
+                paginacion.cargar_pagina(proceso_id, nueva_pagina)
+            if paginacion.paginas_en_memoria.get((proceso_id, nueva_pagina)) is not None:
+                self._preparar_marco(proceso_id, nueva_pagina, datos)
+                if self.paginas_grandes != 'nunca' and datos is None:
+                    self._intentar_promocion(proceso_id, nueva_pagina // paginacion.paginas_por_grande)
+                return
+            pagina_victima = self._elegir_victima()
+
+        # Reemplazar página: el contenido de la víctima pasa al área de intercambio
+        if pagina_victima:
+            self._guardar_marco(paginacion.paginas_en_memoria[pagina_victima])
+            paginacion.reemplazar_pagina(pagina_victima, direccion, nuevo_proceso_id=proceso_id)
+            self._preparar_marco(proceso_id, nueva_pagina, datos)
+
+    def _fallo_grande(self, proceso_id, pagina):
+        """Atiende el fallo con una página grande si su región virtual no tiene páginas en uso"""
+        paginacion = self.paginacion
+        numero_grande = pagina // paginacion.paginas_por_grande
+        if not paginacion.hay_region_libre() or not self._region_promovible(proceso_id, numero_grande):
+            return False
+        if any(info['presente'] for _, info in paginacion.paginas_region(proceso_id, numero_grande)):
+            return False
+        swap = self._paginas_en_swap(proceso_id, numero_grande)
+        paginacion.instalar_grande(proceso_id, numero_grande)
+        self._llenar_grande(proceso_id, numero_grande, swap=swap)
+        return True
+
+    def _intentar_promocion(self, proceso_id, numero_grande):
+        """Promueve la región si tiene al menos umbral_promocion de sus páginas presentes y privadas"""
+        paginacion = self.paginacion
+        if not paginacion.hay_region_libre() or not self._region_promovible(proceso_id, numero_grande):
+            return False
+        entradas = paginacion.paginas_region(proceso_id, numero_grande)
+        presentes = sum(1 for _, info in entradas if info['presente'])
+        if presentes < self.umbral_promocion * paginacion.paginas_por_grande:
+            return False
+        swap = self._paginas_en_swap(proceso_id, numero_grande)
+        _, movidas = paginacion.promover(proceso_id, numero_grande)
+        self._llenar_grande(proceso_id, numero_grande, movidas, swap)
+        return True
+
+    def _region_promovible(self, proceso_id, numero_grande):
+        """Una región con páginas compartidas, de código o copy-on-write no se junta"""
+        compartidos = self.paginacion.compartidos
+        for _, info in self.paginacion.paginas_region(proceso_id, numero_grande):
+            if 'imagen' in info or info.get('cow') or (info['presente'] and info['marco'] in compartidos):
+                return False
+        return True
+
+    def _paginas_en_swap(self, proceso_id, numero_grande):
+        espacio_swap = self.memoria_virtual.espacio_swap
+        return [pagina for pagina, info in self.paginacion.paginas_region(proceso_id, numero_grande)
+                if not info['presente'] and (proceso_id, pagina) in espacio_swap]
+
+    def _llenar_grande(self, proceso_id, numero_grande, movidas=(), swap=()):
+        """Deja en la página grande ceros, las páginas base movidas y las que estaban en el intercambio"""
+        paginacion = self.paginacion
+        tamano_pagina = paginacion.tamano_pagina
+        info = paginacion.tabla_grandes[proceso_id][numero_grande]
+        inicio = info['marco'] * tamano_pagina
+        memoria = self.memoria_principal
+        memoria.cargar_bloque(inicio, paginacion.tamano_grande)
+        for subpagina, anterior in movidas:
+            memoria.cargar_bloque(inicio + subpagina * tamano_pagina, tamano_pagina,
+                                  memoria.copiar_bloque(anterior * tamano_pagina, tamano_pagina))
+            for invalidar in self.invalidadores:
+                invalidar(anterior * tamano_pagina, (anterior + 1) * tamano_pagina)
+        primera = numero_grande * paginacion.paginas_por_grande
+        for pagina in swap:
+            memoria.cargar_bloque(inicio + (pagina - primera) * tamano_pagina, tamano_pagina,
+                                  self.memoria_virtual.intercambiar_salida(proceso_id, pagina))
+            info['tocadas'] |= 1 << (pagina - primera)
+        for invalidar in self.invalidadores:
+            invalidar(inicio, inicio + paginacion.tamano_grande)
+
+    def desalojar_pagina(self, proceso_id, pagina):
+        """Lleva una página presente al intercambio; su marco queda libre si nadie más lo comparte"""
+        paginacion = self.paginacion
+        marco = paginacion.paginas_en_memoria.get((proceso_id, pagina))
+        if marco is None:
+            return False
+        tamano_pagina = paginacion.tamano_pagina
+        inicio = marco * tamano_pagina
+        if marco in paginacion.compartidos:
+            # Solo este proceso deja de usarlo: el marco sigue ocupado
+            if 'imagen' not in paginacion.tabla_paginas[proceso_id][pagina]:
+                self.memoria_virtual.intercambiar_entrada(
+                    proceso_id, pagina, self.memoria_principal.copiar_bloque(inicio, tamano_pagina))
+            paginacion.desmapear(proceso_id, pagina)
+            return True
+        self._guardar_marco(marco)
+        paginacion.desalojar_pagina(proceso_id, pagina)
+        for invalidar in self.invalidadores:
+            invalidar(inicio, inicio + tamano_pagina)
+        return True
+
+    def _guardar_marco(self, marco):
+        """Copia el marco al intercambio para cada página que lo usa (el código no: se recarga)"""
+        paginacion = self.paginacion
+        datos = None
+        for proceso_id, pagina in paginacion.compartidos.get(marco) or (paginacion.marcos_memoria[marco],):
+            if 'imagen' in paginacion.tabla_paginas[proceso_id][pagina]:
+                continue
+            if datos is None:
+                datos = self.memoria_principal.copiar_bloque(marco * paginacion.tamano_pagina,
+                                                             paginacion.tamano_pagina)
+            # Todas las copias comparten el mismo bloque: nunca se modifica en el intercambio
+            self.memoria_virtual.intercambiar_entrada(proceso_id, pagina, datos)
+
+    def _elegir_victima(self):
+        """Víctima global según el algoritmo de reemplazo configurado"""
         if self.algoritmo_reemplazo == 'FIFO':
             pagina_victima = self.algoritmo_fifo()
         elif self.algoritmo_reemplazo == 'LRU':
@@ -116,13 +351,20 @@ class SistemaMemoria:
             pagina_victima = self.algoritmo_optimo()
         else:
             pagina_victima = self.algoritmo_lru()  # Por defecto LRU
-        
-        # Reemplazar página
-        if pagina_victima:
-            self.memoria_virtual.intercambiar_entrada(pagina_victima[0], pagina_victima[1])
-            nueva_pagina = direccion // self.paginacion.tamano_pagina
-            self.memoria_virtual.intercambiar_salida(proceso_id, nueva_pagina)
-            self.paginacion.reemplazar_pagina(pagina_victima, direccion, nuevo_proceso_id=proceso_id)
+        return pagina_victima
+
+    def _preparar_marco(self, proceso_id, pagina, datos=None):
+        """Deja en el marco de la página `datos`, su contenido del intercambio o ceros"""
+        info = self.paginacion.tabla_paginas[proceso_id][pagina]
+        tamano_pagina = self.paginacion.tamano_pagina
+        inicio = info['marco'] * tamano_pagina
+        if datos is None:
+            datos = self.memoria_virtual.intercambiar_salida(proceso_id, pagina)
+        self.memoria_principal.cargar_bloque(inicio, tamano_pagina, datos)
+        # El contenido del marco cambió: cuenta como modificado para los puntos de control
+        info['modificado'] = True
+        for invalidar in self.invalidadores:
+            invalidar(inicio, inicio + tamano_pagina)
     
     def algoritmo_fifo(self):
         """Algoritmo de reemplazo FIFO"""
@@ -174,8 +416,17 @@ class SistemaMemoria:
         if estado.get('tipo') == 'PAGINACION':
             estadisticas.update({
                 'paginas_activas': estado.get('paginas_activas', 0),
-                'marcos_ocupados': estado.get('marcos_ocupados', 0)
+                'marcos_ocupados': estado.get('marcos_ocupados', 0),
+                'entradas_tabla': estado.get('entradas_tabla', 0)
             })
+            if 'paginas_grandes' in estado:
+                estadisticas.update({
+                    'paginas_grandes': estado['paginas_grandes'],
+                    'promociones': estado['promociones'],
+                    'degradaciones': estado['degradaciones'],
+                    'fragmentacion_externa': estado['fragmentacion_externa'],
+                    'fragmentacion_interna': estado['fragmentacion_interna']
+                })
         elif estado.get('tipo') == 'SEGMENTACION':
             estadisticas.update({
                 'segmentos_activos': estado.get('segmentos_activos', 0)
@@ -189,7 +440,8 @@ class MemoriaPrincipal:
     
     def __init__(self, tamano_kb):
         self.tamano = tamano_kb * 1024  # bytes
-        self.datos = [0] * self.tamano
+        # Arreglo contiguo: los puntos de control lo vuelcan sin copias
+        self.datos = array('q', bytes(8 * self.tamano))
         self.estado = ['LIBRE'] * (self.tamano // 1024)  # Estado por KB
     
     def escribir(self, direccion, valor):
@@ -206,6 +458,18 @@ class MemoriaPrincipal:
         if 0 <= direccion < self.tamano:
             return self.datos[direccion]
         return None
+
+    def copiar_bloque(self, inicio, tamano):
+        """Copia de las posiciones [inicio, inicio + tamano)"""
+        return self.datos[inicio:inicio + tamano]
+
+    def cargar_bloque(self, inicio, tamano, datos=None):
+        """Escribe un bloque copiado con copiar_bloque; sin datos lo llena de ceros"""
+        if not isinstance(datos, array) or len(datos) != tamano:
+            datos = array('q', bytes(8 * tamano))
+        fin = min(inicio + tamano, self.tamano)
+        if inicio < fin:
+            self.datos[inicio:fin] = datos[:fin - inicio]
     
     def obtener_estado(self):
         """Retorna el estado de la memoria"""
@@ -214,39 +478,110 @@ class MemoriaPrincipal:
 class GestorPaginacion:
     """Gestiona memoria usando paginación"""
     
-    def __init__(self, tamano_pagina_kb):
+    def __init__(self, tamano_pagina_kb, num_marcos=None, tamano_grande_kb=0):
         self.tamano_pagina = tamano_pagina_kb * 1024  # bytes
         self.tabla_paginas = {}  # proceso_id -> tabla de páginas
         self.marcos_memoria = {}  # marco -> (proceso_id, pagina)
         self.paginas_en_memoria = OrderedDict()  # (proceso_id, pagina) -> marco
         self.memoria_utilizada = 0
         self.contador_marco = 0
+        # Marcos físicos disponibles; con num_marcos=None no hay límite
+        self.num_marcos = num_marcos
+        self.marcos_libres = deque(range(num_marcos)) if num_marcos is not None else deque()
+        self.residentes = {}  # proceso_id -> páginas presentes
+        # Marcos compartidos: marco -> {(proceso_id, pagina)} con dos o más páginas
+        self.compartidos = {}
+        # Código compartido cargado: (clave, pagina) -> marco y su inverso
+        self.imagenes = {}
+        self.marco_imagen = {}
+        # Páginas grandes: regiones alineadas de paginas_por_grande marcos (0: desactivadas)
+        self.tamano_grande = 0
+        self.paginas_por_grande = 0
+        self.tabla_grandes = {}  # proceso_id -> {número de página grande: info}
+        self.grandes_en_memoria = OrderedDict()  # (proceso_id, número grande) -> primer marco
+        self.uso_region = None  # región física -> marcos ocupados
+        self.version_mapeo = 0  # cambia al promover o dividir (las TLB se vacían)
+        self.fin_virtual = {}  # proceso_id -> siguiente página de asignar_memoria
+        self.reservar_grandes = False  # asignar_memoria usa páginas grandes en regiones completas
+        self.promociones = 0
+        self.degradaciones = 0
+        self.fallos_region = 0  # sin región libre aunque sobraban marcos (fragmentación externa)
+        if tamano_grande_kb:
+            self.configurar_grandes(tamano_grande_kb)
+
+    def configurar_grandes(self, tamano_grande_kb):
+        """Activa páginas grandes de `tamano_grande_kb` (múltiplo de la página base)"""
+        tamano_grande = tamano_grande_kb * 1024
+        if self.num_marcos is None or tamano_grande % self.tamano_pagina or tamano_grande <= self.tamano_pagina:
+            raise ValueError("Las páginas grandes necesitan marcos limitados y un múltiplo de la página base")
+        self.tamano_grande = tamano_grande
+        self.paginas_por_grande = tamano_grande // self.tamano_pagina
+        self.uso_region = [0] * (self.num_marcos // self.paginas_por_grande)
+        for marco in self.marcos_memoria:
+            self._contar_region(marco, 1)
+
+    def _contar_region(self, marco, cambio):
+        region = marco // self.paginas_por_grande
+        if region < len(self.uso_region):
+            self.uso_region[region] += cambio
+
+    def _tomar_marco(self):
+        """Retorna un marco libre o None si la memoria física está llena"""
+        if self.marcos_libres:
+            marco = self.marcos_libres.popleft()
+            if self.uso_region is not None:
+                self._contar_region(marco, 1)
+            return marco
+        if self.num_marcos is None:
+            self.contador_marco += 1
+            return self.contador_marco - 1
+        return None
+
+    def _devolver_marco(self, marco):
+        self.marcos_libres.append(marco)
+        if self.uso_region is not None:
+            self._contar_region(marco, -1)
     
     def asignar_memoria(self, proceso_id, tamano):
-        """Asigna memoria paginada a un proceso"""
+        """Asigna memoria paginada a un proceso
+
+        Las páginas que no caben en marcos libres quedan no presentes y se
+        cargan con el primer fallo de página. Con reservar_grandes, cada región
+        virtual alineada y completa recibe una página grande si queda alguna
+        región física libre.
+        """
         num_paginas = (tamano + self.tamano_pagina - 1) // self.tamano_pagina
         
         if proceso_id not in self.tabla_paginas:
             self.tabla_paginas[proceso_id] = {}
         
+        inicio = max(len(self.tabla_paginas[proceso_id]), self.fin_virtual.get(proceso_id, 0))
+        self.fin_virtual[proceso_id] = inicio + num_paginas
+        por_grande = self.paginas_por_grande if self.reservar_grandes else 0
         paginas_asignadas = []
-        for i in range(num_paginas):
-            marco = self.contador_marco
-            self.contador_marco += 1
+        for pagina_id in range(inicio, inicio + num_paginas):
+            if por_grande and pagina_id % por_grande == 0 and pagina_id + por_grande <= inicio + num_paginas:
+                if self.instalar_grande(proceso_id, pagina_id // por_grande) is not None:
+                    paginas_asignadas.append(pagina_id)
+                    continue
+            if por_grande and self._en_grande(proceso_id, pagina_id):
+                paginas_asignadas.append(pagina_id)
+                continue
+            marco = self._tomar_marco()
             
-            pagina_id = len(self.tabla_paginas[proceso_id])
             self.tabla_paginas[proceso_id][pagina_id] = {
                 'marco': marco,
-                'presente': True,
+                'presente': marco is not None,
                 'modificado': False,
                 'referenciada': False
             }
-            
-            self.marcos_memoria[marco] = (proceso_id, pagina_id)
-            self.paginas_en_memoria[(proceso_id, pagina_id)] = marco
             paginas_asignadas.append(pagina_id)
             
-            self.memoria_utilizada += self.tamano_pagina
+            if marco is not None:
+                self.marcos_memoria[marco] = (proceso_id, pagina_id)
+                self.paginas_en_memoria[(proceso_id, pagina_id)] = marco
+                self.residentes[proceso_id] = self.residentes.get(proceso_id, 0) + 1
+                self.memoria_utilizada += self.tamano_pagina
         
         return paginas_asignadas
     
@@ -256,64 +591,385 @@ class GestorPaginacion:
             for pagina_id, info in self.tabla_paginas[proceso_id].items():
                 if info['presente']:
                     marco = info['marco']
+                    if marco in self.compartidos:
+                        # Lo siguen usando otros procesos
+                        self.desmapear(proceso_id, pagina_id)
+                        continue
                     if marco in self.marcos_memoria:
                         del self.marcos_memoria[marco]
+                        self._devolver_marco(marco)
+                        self._olvidar_imagen(marco)
                     clave = (proceso_id, pagina_id)
                     if clave in self.paginas_en_memoria:
                         del self.paginas_en_memoria[clave]
                     self.memoria_utilizada -= self.tamano_pagina
             
             del self.tabla_paginas[proceso_id]
+            self.residentes.pop(proceso_id, None)
+            self.fin_virtual.pop(proceso_id, None)
+
+        for numero_grande, info in self.tabla_grandes.pop(proceso_id, {}).items():
+            del self.grandes_en_memoria[(proceso_id, numero_grande)]
+            self.marcos_libres.extend(range(info['marco'], info['marco'] + self.paginas_por_grande))
+            self.uso_region[info['marco'] // self.paginas_por_grande] = 0
+            self.memoria_utilizada -= self.tamano_grande
     
+    def traducir(self, direccion, proceso_id, operacion='lectura'):
+        """Dirección física de una dirección lógica, o None si la página no está presente
+
+        Marca la página como referenciada (y modificada en escrituras) y la
+        mueve al final del orden LRU.
+        """
+        tabla = self.tabla_paginas.get(proceso_id)
+        if tabla is None:
+            return None
+        
+        numero_pagina, desplazamiento = divmod(direccion, self.tamano_pagina)
+        pagina_info = tabla.get(numero_pagina)
+        if pagina_info is None:
+            if self.tabla_grandes:
+                return self._traducir_grande(direccion, proceso_id, operacion)
+            return None
+        if not pagina_info['presente']:
+            return None
+        
+        pagina_info['referenciada'] = True
+        if operacion == 'escritura':
+            if pagina_info.get('cow'):
+                return None  # fallo de protección: se copia en manejar_fallo_pagina
+            pagina_info['modificado'] = True
+        
+        # Mover al final para LRU
+        self.paginas_en_memoria.move_to_end((proceso_id, numero_pagina))
+        return pagina_info['marco'] * self.tamano_pagina + desplazamiento
+
+    def _traducir_grande(self, direccion, proceso_id, operacion):
+        grandes = self.tabla_grandes.get(proceso_id)
+        if not grandes:
+            return None
+        numero_grande, desplazamiento = divmod(direccion, self.tamano_grande)
+        info = grandes.get(numero_grande)
+        if info is None:
+            return None
+        info['referenciada'] = True
+        # Subpáginas usadas: las no usadas son fragmentación interna
+        info['tocadas'] |= 1 << (desplazamiento // self.tamano_pagina)
+        if operacion == 'escritura':
+            info['modificado'] = True
+        self.grandes_en_memoria.move_to_end((proceso_id, numero_grande))
+        return info['marco'] * self.tamano_pagina + desplazamiento
+
     def acceder_pagina(self, direccion, proceso_id, operacion):
         """Accede a una página de memoria"""
+        return self.traducir(direccion, proceso_id, operacion) is not None
+
+    def cargar_pagina(self, proceso_id, numero_pagina):
+        """Carga una página en un marco libre; retorna el marco o None si no hay"""
+        marco = self._tomar_marco()
+        if marco is not None:
+            self._instalar(marco, proceso_id, numero_pagina)
+            self.memoria_utilizada += self.tamano_pagina
+        return marco
+
+    def _instalar(self, marco, proceso_id, numero_pagina):
         if proceso_id not in self.tabla_paginas:
-            return False
-        
-        numero_pagina = direccion // self.tamano_pagina
-        desplazamiento = direccion % self.tamano_pagina
+            self.tabla_paginas[proceso_id] = {}
         
-        if numero_pagina in self.tabla_paginas[proceso_id]:
-            pagina_info = self.tabla_paginas[proceso_id][numero_pagina]
-            pagina_info['referenciada'] = True
-            
-            if operacion == 'escritura':
-                pagina_info['modificado'] = True
-            
-            # Mover al final para LRU
-            clave = (proceso_id, numero_pagina)
-            if clave in self.paginas_en_memoria:
-                self.paginas_en_memoria.move_to_end(clave)
-            
-            return pagina_info['presente']
+        anterior = self.tabla_paginas[proceso_id].get(numero_pagina)
+        info = self.tabla_paginas[proceso_id][numero_pagina] = {
+            'marco': marco,
+            'presente': True,
+            'modificado': False,
+            'referenciada': True
+        }
+        if anterior is not None and 'imagen' in anterior:
+            # Primera carga de una página de código: otros procesos la mapearán aquí
+            clave = anterior['imagen']
+            info['imagen'] = clave
+            info['cow'] = True
+            self.imagenes[(clave, numero_pagina)] = marco
+            self.marco_imagen[marco] = (clave, numero_pagina)
         
-        return False
+        self.marcos_memoria[marco] = (proceso_id, numero_pagina)
+        self.paginas_en_memoria[(proceso_id, numero_pagina)] = marco
+        self.paginas_en_memoria.move_to_end((proceso_id, numero_pagina))
+        self.residentes[proceso_id] = self.residentes.get(proceso_id, 0) + 1
+
+    def desalojar_pagina(self, proceso_id, numero_pagina):
+        """Marca una página como no presente y devuelve su marco a los libres
+
+        Si el marco está compartido solo se quita esta página y se retorna None.
+        """
+        marco = self.paginas_en_memoria.get((proceso_id, numero_pagina))
+        if marco is None or marco in self.compartidos:
+            if marco is not None:
+                self.desmapear(proceso_id, numero_pagina)
+            return None
+        del self.paginas_en_memoria[(proceso_id, numero_pagina)]
+        self.tabla_paginas[proceso_id][numero_pagina]['presente'] = False
+        del self.marcos_memoria[marco]
+        self._devolver_marco(marco)
+        self._olvidar_imagen(marco)
+        self.residentes[proceso_id] -= 1
+        self.memoria_utilizada -= self.tamano_pagina
+        return marco
     
     def reemplazar_pagina(self, pagina_victima, nueva_direccion, nuevo_proceso_id):
         """Reemplaza una página en memoria"""
         if pagina_victima in self.paginas_en_memoria:
             marco = self.paginas_en_memoria[pagina_victima]
+            # El marco cambia de contenido: las demás páginas que lo comparten dejan de estar presentes
+            for clave in list(self.compartidos.get(marco, ())):
+                if clave != pagina_victima:
+                    self.desmapear(*clave)
+            del self.paginas_en_memoria[pagina_victima]
+            self._olvidar_imagen(marco)
             proceso_viejo, pagina_vieja = pagina_victima
             
             # Liberar página vieja
             if proceso_viejo in self.tabla_paginas and pagina_vieja in self.tabla_paginas[proceso_viejo]:
                 self.tabla_paginas[proceso_viejo][pagina_vieja]['presente'] = False
+            if proceso_viejo in self.residentes:
+                self.residentes[proceso_viejo] -= 1
             
             # Asignar a nuevo proceso
-            nueva_pagina = nueva_direccion // self.tamano_pagina
-            if nuevo_proceso_id not in self.tabla_paginas:
-                self.tabla_paginas[nuevo_proceso_id] = {}
-            
-            self.tabla_paginas[nuevo_proceso_id][nueva_pagina] = {
-                'marco': marco,
-                'presente': True,
+            self._instalar(marco, nuevo_proceso_id, nueva_direccion // self.tamano_pagina)
+    
+    # --- páginas compartidas ------------------------------------------------
+
+    def fork(self, proceso_id, nuevo_id):
+        """Copia la tabla de páginas de un proceso en O(páginas) compartiendo sus marcos
+
+        Las páginas presentes quedan copy-on-write en ambos procesos: la
+        primera escritura de cualquiera de ellos produce un fallo que le da
+        una copia privada.
+        """
+        if proceso_id not in self.tabla_paginas:
+            raise ValueError(f"El proceso {proceso_id} no tiene tabla de páginas")
+        if nuevo_id in self.tabla_paginas:
+            raise ValueError(f"El proceso {nuevo_id} ya tiene tabla de páginas")
+        # Las páginas grandes se dividen: se comparten y copian por página base
+        for numero_grande in list(self.tabla_grandes.get(proceso_id, ())):
+            self.degradar(proceso_id, numero_grande)
+        
+        tabla_hijo = {}
+        for pagina, info in self.tabla_paginas[proceso_id].items():
+            if info['presente']:
+                info['cow'] = True
+                self._compartir(info['marco'], (nuevo_id, pagina))
+                self.paginas_en_memoria[(nuevo_id, pagina)] = info['marco']
+            tabla_hijo[pagina] = dict(info)
+        self.tabla_paginas[nuevo_id] = tabla_hijo
+        self.residentes[nuevo_id] = self.residentes.get(proceso_id, 0)
+        return list(tabla_hijo)
+
+    def compartir_codigo(self, proceso_id, clave, tamano):
+        """Mapea desde la página 0 el código de la imagen `clave`, de solo lectura
+
+        Las páginas que otro proceso ya cargó se comparten al momento; las
+        demás se cargan con el primer fallo y quedan disponibles para el resto.
+        """
+        num_paginas = (tamano + self.tamano_pagina - 1) // self.tamano_pagina
+        if proceso_id not in self.tabla_paginas:
+            self.tabla_paginas[proceso_id] = {}
+        for numero_grande in list(self.tabla_grandes.get(proceso_id, ())):
+            if numero_grande * self.paginas_por_grande < num_paginas:
+                self.degradar(proceso_id, numero_grande)
+        
+        tabla = self.tabla_paginas[proceso_id]
+        for pagina in range(num_paginas):
+            tabla[pagina] = {
+                'marco': None,
+                'presente': False,
                 'modificado': False,
-                'referenciada': True
+                'referenciada': False,
+                'imagen': clave
             }
-            
-            self.marcos_memoria[marco] = (nuevo_proceso_id, nueva_pagina)
-            self.paginas_en_memoria[(nuevo_proceso_id, nueva_pagina)] = marco
-            self.paginas_en_memoria.move_to_end((nuevo_proceso_id, nueva_pagina))
+            self.mapear_imagen(proceso_id, pagina)
+        return list(range(num_paginas))
+
+    def mapear_imagen(self, proceso_id, numero_pagina):
+        """Mapea una página de código ya cargada por otro proceso; False si no lo está"""
+        info = self.tabla_paginas[proceso_id][numero_pagina]
+        marco = self.imagenes.get((info.get('imagen'), numero_pagina))
+        if marco is None:
+            return False
+        info.update(marco=marco, presente=True, cow=True, referenciada=True)
+        self._compartir(marco, (proceso_id, numero_pagina))
+        self.paginas_en_memoria[(proceso_id, numero_pagina)] = marco
+        self.residentes[proceso_id] = self.residentes.get(proceso_id, 0) + 1
+        return True
+
+    def hacer_privada(self, proceso_id, numero_pagina):
+        """Quita la marca copy-on-write de una página que ya no comparte su marco"""
+        info = self.tabla_paginas[proceso_id][numero_pagina]
+        info.pop('cow', None)
+        if info.pop('imagen', None) is not None:
+            # El código modificado ya no sirve como imagen para otros procesos
+            self._olvidar_imagen(info['marco'])
+
+    def desmapear(self, proceso_id, numero_pagina):
+        """Quita una página de un marco compartido, que sigue ocupado por las demás"""
+        clave = (proceso_id, numero_pagina)
+        marco = self.paginas_en_memoria.pop(clave)
+        self.tabla_paginas[proceso_id][numero_pagina]['presente'] = False
+        usuarios = self.compartidos[marco]
+        usuarios.discard(clave)
+        if self.marcos_memoria.get(marco) == clave:
+            self.marcos_memoria[marco] = next(iter(usuarios))
+        if len(usuarios) == 1:
+            del self.compartidos[marco]
+        self.residentes[proceso_id] -= 1
+
+    def referencias_marco(self, marco):
+        """Páginas que usan el marco"""
+        if marco in self.compartidos:
+            return len(self.compartidos[marco])
+        return 1 if marco in self.marcos_memoria else 0
+
+    def _compartir(self, marco, clave):
+        usuarios = self.compartidos.get(marco)
+        if usuarios is None:
+            usuarios = self.compartidos[marco] = {self.marcos_memoria[marco]}
+        usuarios.add(clave)
+
+    def _olvidar_imagen(self, marco):
+        origen = self.marco_imagen.pop(marco, None)
+        if origen is not None:
+            del self.imagenes[origen]
+    
+    # --- páginas grandes ----------------------------------------------------
+
+    def _en_grande(self, proceso_id, numero_pagina):
+        grandes = self.tabla_grandes.get(proceso_id)
+        return bool(grandes) and numero_pagina // self.paginas_por_grande in grandes
+
+    def tamano_mapeo(self, proceso_id, direccion):
+        """Tamaño de la página que traduce `direccion` (grande o base)"""
+        grandes = self.tabla_grandes.get(proceso_id)
+        if grandes and direccion // self.tamano_grande in grandes:
+            return self.tamano_grande
+        return self.tamano_pagina
+
+    def paginas_region(self, proceso_id, numero_grande):
+        """Entradas base (pagina, info) del proceso dentro de una región virtual grande"""
+        tabla = self.tabla_paginas.get(proceso_id, {})
+        primera = numero_grande * self.paginas_por_grande
+        return [(pagina, tabla[pagina]) for pagina in range(primera, primera + self.paginas_por_grande)
+                if pagina in tabla]
+
+    def hay_region_libre(self):
+        return self.uso_region is not None and 0 in self.uso_region
+
+    def _tomar_region(self):
+        """Primer marco de una región física completamente libre, o None"""
+        if not self.hay_region_libre():
+            if self.uso_region is not None and len(self.marcos_libres) >= self.paginas_por_grande:
+                self.fallos_region += 1
+            return None
+        region = self.uso_region.index(0)
+        inicio = region * self.paginas_por_grande
+        fin = inicio + self.paginas_por_grande
+        self.marcos_libres = deque(marco for marco in self.marcos_libres if not inicio <= marco < fin)
+        self.uso_region[region] = self.paginas_por_grande
+        return inicio
+
+    def _registrar_grande(self, proceso_id, numero_grande, marco, tocadas):
+        if proceso_id not in self.tabla_paginas:
+            self.tabla_paginas[proceso_id] = {}
+        self.tabla_grandes.setdefault(proceso_id, {})[numero_grande] = {
+            'marco': marco,
+            'modificado': True,  # el contenido de la región se acaba de escribir
+            'referenciada': True,
+            'tocadas': tocadas
+        }
+        self.grandes_en_memoria[(proceso_id, numero_grande)] = marco
+
+    def instalar_grande(self, proceso_id, numero_grande):
+        """Mapea una región virtual sin páginas base presentes con una página grande; retorna su marco"""
+        marco = self._tomar_region()
+        if marco is None:
+            return None
+        tabla = self.tabla_paginas.get(proceso_id, {})
+        primera = numero_grande * self.paginas_por_grande
+        for pagina in range(primera, primera + self.paginas_por_grande):
+            tabla.pop(pagina, None)  # entradas no presentes: la página grande las cubre
+        self._registrar_grande(proceso_id, numero_grande, marco, 0)
+        self.residentes[proceso_id] = self.residentes.get(proceso_id, 0) + self.paginas_por_grande
+        self.memoria_utilizada += self.tamano_grande
+        return marco
+
+    def promover(self, proceso_id, numero_grande):
+        """Junta las páginas base privadas de una región en una página grande
+
+        Retorna (marco, [(subpágina, marco anterior)]) para que se copie el
+        contenido, o None si no hay región física libre.
+        """
+        marco = self._tomar_region()
+        if marco is None:
+            return None
+        tabla = self.tabla_paginas[proceso_id]
+        primera = numero_grande * self.paginas_por_grande
+        movidas = []
+        tocadas = 0
+        for pagina in range(primera, primera + self.paginas_por_grande):
+            info = tabla.pop(pagina, None)
+            if info is not None and info['presente']:
+                anterior = info['marco']
+                del self.paginas_en_memoria[(proceso_id, pagina)]
+                del self.marcos_memoria[anterior]
+                self._devolver_marco(anterior)
+                movidas.append((pagina - primera, anterior))
+                tocadas |= 1 << (pagina - primera)
+        self._registrar_grande(proceso_id, numero_grande, marco, tocadas)
+        self.residentes[proceso_id] = self.residentes.get(proceso_id, 0) + self.paginas_por_grande - len(movidas)
+        self.memoria_utilizada += self.tamano_grande - len(movidas) * self.tamano_pagina
+        self.promociones += 1
+        self.version_mapeo += 1
+        return marco, movidas
+
+    def degradar(self, proceso_id, numero_grande):
+        """Divide una página grande en páginas base; las subpáginas nunca usadas se liberan
+
+        Las subpáginas quedan al principio del orden LRU, como primeras
+        candidatas a víctima. Retorna los marcos liberados.
+        """
+        grandes = self.tabla_grandes[proceso_id]
+        info = grandes.pop(numero_grande)
+        if not grandes:
+            del self.tabla_grandes[proceso_id]
+        del self.grandes_en_memoria[(proceso_id, numero_grande)]
+
+        tabla = self.tabla_paginas.setdefault(proceso_id, {})
+        primera = numero_grande * self.paginas_por_grande
+        libres = 0
+        for i in range(self.paginas_por_grande):
+            marco = info['marco'] + i
+            if info['tocadas'] >> i & 1:
+                pagina = primera + i
+                tabla[pagina] = {
+                    'marco': marco,
+                    'presente': True,
+                    'modificado': info['modificado'],
+                    'referenciada': False
+                }
+                self.marcos_memoria[marco] = (proceso_id, pagina)
+                self.paginas_en_memoria[(proceso_id, pagina)] = marco
+                self.paginas_en_memoria.move_to_end((proceso_id, pagina), last=False)
+            else:
+                self.marcos_libres.append(marco)
+                libres += 1
+        self.uso_region[info['marco'] // self.paginas_por_grande] = self.paginas_por_grande - libres
+        self.residentes[proceso_id] -= libres
+        self.memoria_utilizada -= libres * self.tamano_pagina
+        self.degradaciones += 1
+        self.version_mapeo += 1
+        return libres
+
+    def grande_menos_aprovechada(self):
+        """(proceso_id, número grande) de la página grande con menos subpáginas usadas"""
+        return min(self.grandes_en_memoria,
+                   key=lambda clave: bin(self.tabla_grandes[clave[0]][clave[1]]['tocadas']).count('1'))
     
     def obtener_estado(self):
         """Retorna el estado de la paginación"""
@@ -321,10 +977,33 @@ class GestorPaginacion:
             'tipo': 'PAGINACION',
             'tamano_pagina': self.tamano_pagina,
             'paginas_activas': len(self.paginas_en_memoria),
-            'marcos_ocupados': len(self.marcos_memoria),
+            'marcos_ocupados': len(self.marcos_memoria) + len(self.grandes_en_memoria) * self.paginas_por_grande,
+            'marcos_totales': self.num_marcos,
+            'marcos_compartidos': len(self.compartidos),
+            'paginas_compartidas': sum(len(usuarios) for usuarios in self.compartidos.values()),
             'memoria_utilizada': self.memoria_utilizada,
-            'procesos': list(self.tabla_paginas.keys())
+            'procesos': list(self.tabla_paginas.keys()),
+            'entradas_tabla': (sum(len(tabla) for tabla in self.tabla_paginas.values())
+                               + sum(len(tabla) for tabla in self.tabla_grandes.values()))
         }
+        if self.paginas_por_grande:
+            libres = len(self.marcos_libres)
+            regiones_libres = self.uso_region.count(0)
+            sin_usar = sum(self.paginas_por_grande - bin(info['tocadas']).count('1')
+                           for grandes in self.tabla_grandes.values() for info in grandes.values())
+            estado.update({
+                'tamano_pagina_grande': self.tamano_grande,
+                'paginas_grandes': len(self.grandes_en_memoria),
+                'regiones_libres': regiones_libres,
+                # Marcos libres que no forman ninguna región completa (% de los libres)
+                'fragmentacion_externa': (libres - regiones_libres * self.paginas_por_grande) / libres * 100
+                                         if libres else 0,
+                # Bytes de subpáginas de páginas grandes que nunca se usaron
+                'fragmentacion_interna': sin_usar * self.tamano_pagina,
+                'promociones': self.promociones,
+                'degradaciones': self.degradaciones,
+                'fallos_region': self.fallos_region
+            })
         return estado
 
 class GestorSegmentacion:
@@ -384,17 +1063,30 @@ class GestorMemoriaVirtual:
         self.espacio_swap = {}  # Simula el espacio de intercambio
         self.paginas_swap = 0
     
-    def intercambiar_entrada(self, proceso_id, pagina_id):
-        """Intercambia una página a memoria virtual"""
+    def intercambiar_entrada(self, proceso_id, pagina_id, datos=None):
+        """Intercambia una página a memoria virtual (opcionalmente con su contenido)"""
         clave = (proceso_id, pagina_id)
-        self.espacio_swap[clave] = f"Datos_pagina_{proceso_id}_{pagina_id}"
-        self.paginas_swap += 1
+        if clave not in self.espacio_swap:
+            self.paginas_swap += 1
+        self.espacio_swap[clave] = datos if datos is not None else f"Datos_pagina_{proceso_id}_{pagina_id}"
     
     def intercambiar_salida(self, proceso_id, pagina_id):
-        """Intercambia una página de memoria virtual a RAM"""
+        """Intercambia una página de memoria virtual a RAM; retorna su contenido o None"""
         clave = (proceso_id, pagina_id)
         if clave in self.espacio_swap:
+            self.paginas_swap -= 1
+            return self.espacio_swap.pop(clave)
+        return None
+
+    def copiar_proceso(self, origen, destino):
+        """Las páginas de `origen` en el intercambio pasan a estar también en `destino`"""
+        for (proceso_id, pagina), datos in list(self.espacio_swap.items()):
+            if proceso_id == origen:
+                self.espacio_swap[(destino, pagina)] = datos
+                self.paginas_swap += 1
+
+    def liberar_proceso(self, proceso_id):
+        """Descarta las páginas de un proceso que quedaban en el intercambio"""
+        for clave in [clave for clave in self.espacio_swap if clave[0] == proceso_id]:
             del self.espacio_swap[clave]
             self.paginas_swap -= 1
-            return True
-        return False
\ No newline at end of file
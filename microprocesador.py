@@ -1,9 +1,32 @@
 import random
+from collections import OrderedDict
+
+# Opcode -> mnemónico de las instrucciones que ejecuta el procesador
+MNEMONICOS = {
+    0x01: 'MOV', 0x02: 'ADD', 0x03: 'SUB', 0x04: 'JMP',
+    0x05: 'LOAD', 0x06: 'STORE', 0x07: 'LOAD', 0x08: 'STORE',  # 0x07/0x08: direccionamiento indirecto
+    0x09: 'CMP', 0x0A: 'JZ', 0x0B: 'JNZ', 0x0C: 'JL', 0x0D: 'JG',
+    0x0E: 'PUSH', 0x0F: 'POP', 0x10: 'CALL', 0x11: 'RET',
+}
+
+# Código de registro en los operandos -> nombre
+REGISTROS_GENERALES = {0x01: 'AX', 0x02: 'BX', 0x03: 'CX', 0x04: 'DX'}
+
+# Banderas que fija CMP
+BANDERA_CERO = 0x01
+BANDERA_SIGNO = 0x02
+
+# Tope inicial de la pila (crece hacia direcciones menores, palabras de 4 bytes)
+TOPE_PILA = 0x10000
+
+# Las instrucciones se guardan en cache por dirección virtual; los datos por
+# dirección física con este bit, para que nunca coincidan
+CLAVE_DATOS = 1 << 40
 
 class Microprocesador:
     """Simula la Unidad Central de Procesamiento (CPU)"""
     
-    def __init__(self):
+    def __init__(self, tamano_cache_l1=64, tamano_cache_l2=256):
         # Registros principales (simulados)
         self.registros = {
             'AX': 0,  # Acumulador
@@ -14,7 +37,8 @@ class Microprocesador:
             'SP': 0,  # Puntero de Pila
             'IR': 0,  # Registro de Instrucción
             'MAR': 0, # Registro de Dirección de Memoria
-            'MBR': 0  # Registro de Búfer de Memoria
+            'MBR': 0, # Registro de Búfer de Memoria
+            'FLAGS': 0  # Banderas (cero, signo)
         }
         
         # Estado del procesador
@@ -23,11 +47,41 @@ class Microprocesador:
         self.programa_actual = None
         
         # Cache L1 y L2
-        self.cache_l1 = Cache(64)  # 64 KB
-        self.cache_l2 = Cache(256) # 256 KB
+        self.cache_l1 = Cache(tamano_cache_l1)  # 64 KB por defecto
+        self.cache_l2 = Cache(tamano_cache_l2)  # 256 KB por defecto
         
         # Unidad de Gestión de Memoria (MMU)
         self.mmu = MMU()
+
+        # Sistema de memoria del que se leen las instrucciones y los datos (opcional)
+        self.sistema_memoria = None
+        # Datos en memoria cuando no hay sistema de memoria conectado: dirección física -> valor
+        self.memoria_datos = {}
+
+        # Modelo de cauce segmentado (opcional, ver cauce_segmentado.py)
+        self.cauce = None
+
+        # Tabla de despacho opcode -> operación(operando1, operando2); la
+        # instrumentación la sustituye por una versión medida mientras está activa
+        self.despacho = {
+            0x01: self.mov,
+            0x02: self.add,
+            0x03: self.sub,
+            0x04: self.jmp,
+            0x05: self.load,
+            0x06: self.store,
+            0x07: self.load_indirecto,
+            0x08: self.store_indirecto,
+            0x09: self.cmp,
+            0x0A: self.jz,
+            0x0B: self.jnz,
+            0x0C: self.jl,
+            0x0D: self.jg,
+            0x0E: self.push,
+            0x0F: self.pop,
+            0x10: self.call,
+            0x11: self.ret,
+        }
     
     def ejecutar_instruccion(self, instruccion):
         """Ejecuta una instrucción de máquina"""
@@ -40,47 +94,226 @@ class Microprocesador:
         operando1 = (instruccion >> 16) & 0xFF
         operando2 = (instruccion >> 8) & 0xFF
         
-        if opcode == 0x01:  # MOV
-            self.mov(operando1, operando2)
-        elif opcode == 0x02:  # ADD
-            self.add(operando1, operando2)
-        elif opcode == 0x03:  # SUB
-            self.sub(operando1, operando2)
-        elif opcode == 0x04:  # JMP
-            self.jmp(operando1)
-        
+        # El PC avanza antes de ejecutar: los saltos fijan directamente el destino
         self.registros['PC'] += 1
+        operacion = self.despacho.get(opcode)
+        if operacion is not None:
+            operacion(operando1, operando2)
     
     def mov(self, destino, origen):
         """Instrucción MOV - Mover datos"""
-        if destino == 0x01:  # AX
-            self.registros['AX'] = origen
-        elif destino == 0x02:  # BX
-            self.registros['BX'] = origen
+        registro = REGISTROS_GENERALES.get(destino)
+        if registro:
+            self.registros[registro] = origen
     
     def add(self, registro, valor):
         """Instrucción ADD - Sumar"""
-        if registro == 0x01:  # AX
-            self.registros['AX'] += valor
-        elif registro == 0x02:  # BX
-            self.registros['BX'] += valor
+        registro = REGISTROS_GENERALES.get(registro)
+        if registro:
+            self.registros[registro] += valor
     
     def sub(self, registro, valor):
         """Instrucción SUB - Restar"""
-        if registro == 0x01:  # AX
-            self.registros['AX'] -= valor
-        elif registro == 0x02:  # BX
-            self.registros['BX'] -= valor
+        registro = REGISTROS_GENERALES.get(registro)
+        if registro:
+            self.registros[registro] -= valor
     
-    def jmp(self, direccion):
-        """Instrucción JMP - Salto"""
+    def jmp(self, direccion, _operando2=0):
+        """Instrucción JMP - Salto (destino de 8 bits en el operando 1)"""
         self.registros['PC'] = direccion
+
+    def _direccion16(self):
+        """Dirección de 16 bits (bits 0-15) de la instrucción en curso"""
+        return self.registros['IR'] & 0xFFFF
+
+    def load(self, registro, _operando2=0):
+        """Instrucción LOAD - Registro <- memoria[dirección]"""
+        registro = REGISTROS_GENERALES.get(registro)
+        if registro:
+            self.registros[registro] = self.leer_dato(self._direccion16())
+
+    def store(self, registro, _operando2=0):
+        """Instrucción STORE - memoria[dirección] <- registro"""
+        registro = REGISTROS_GENERALES.get(registro)
+        if registro:
+            self.escribir_dato(self._direccion16(), self.registros[registro])
+
+    def load_indirecto(self, registro, base):
+        """Instrucción LOAD [registro] - Registro <- memoria[base]"""
+        registro = REGISTROS_GENERALES.get(registro)
+        base = REGISTROS_GENERALES.get(base)
+        if registro and base:
+            self.registros[registro] = self.leer_dato(self.registros[base])
+
+    def store_indirecto(self, registro, base):
+        """Instrucción STORE [registro] - memoria[base] <- registro"""
+        registro = REGISTROS_GENERALES.get(registro)
+        base = REGISTROS_GENERALES.get(base)
+        if registro and base:
+            self.escribir_dato(self.registros[base], self.registros[registro])
+
+    def cmp(self, registro, valor):
+        """Instrucción CMP - Fija las banderas según registro - valor"""
+        registro = REGISTROS_GENERALES.get(registro)
+        if registro:
+            diferencia = self.registros[registro] - valor
+            self.registros['FLAGS'] = ((BANDERA_CERO if diferencia == 0 else 0)
+                                       | (BANDERA_SIGNO if diferencia < 0 else 0))
+
+    def jz(self, _operando1=0, _operando2=0):
+        """Instrucción JZ - Salta si la última comparación fue igual"""
+        if self.registros['FLAGS'] & BANDERA_CERO:
+            self.registros['PC'] = self._direccion16()
+
+    def jnz(self, _operando1=0, _operando2=0):
+        """Instrucción JNZ - Salta si la última comparación fue distinta"""
+        if not self.registros['FLAGS'] & BANDERA_CERO:
+            self.registros['PC'] = self._direccion16()
+
+    def jl(self, _operando1=0, _operando2=0):
+        """Instrucción JL - Salta si el registro era menor"""
+        if self.registros['FLAGS'] & BANDERA_SIGNO:
+            self.registros['PC'] = self._direccion16()
+
+    def jg(self, _operando1=0, _operando2=0):
+        """Instrucción JG - Salta si el registro era mayor"""
+        if not self.registros['FLAGS'] & (BANDERA_CERO | BANDERA_SIGNO):
+            self.registros['PC'] = self._direccion16()
+
+    def push(self, registro, _operando2=0):
+        """Instrucción PUSH - Apila un registro"""
+        registro = REGISTROS_GENERALES.get(registro)
+        if registro:
+            self.registros['SP'] -= 4
+            self.escribir_dato(self.registros['SP'], self.registros[registro])
+
+    def pop(self, registro, _operando2=0):
+        """Instrucción POP - Desapila en un registro"""
+        registro = REGISTROS_GENERALES.get(registro)
+        if registro:
+            self.registros[registro] = self.leer_dato(self.registros['SP'])
+            self.registros['SP'] += 4
+
+    def call(self, _operando1=0, _operando2=0):
+        """Instrucción CALL - Apila la dirección de retorno y salta"""
+        self.registros['SP'] -= 4
+        self.escribir_dato(self.registros['SP'], self.registros['PC'])
+        self.registros['PC'] = self._direccion16()
+
+    def ret(self, _operando1=0, _operando2=0):
+        """Instrucción RET - Vuelve a la dirección apilada"""
+        self.registros['PC'] = self.leer_dato(self.registros['SP'])
+        self.registros['SP'] += 4
+
+    def _traducir(self, direccion, operacion='lectura'):
+        """Traduce una dirección lógica de datos con la MMU; retorna la física"""
+        proceso_id = self.programa_actual.id if self.programa_actual is not None else 0
+        self.registros['MAR'] = direccion
+        return self.mmu.traducir_direccion(direccion, proceso_id, operacion)
+
+    def leer_dato(self, direccion):
+        """Lee un dato por la MMU y la jerarquía L1 -> L2 -> memoria"""
+        fisica = self._traducir(direccion)
+        clave = CLAVE_DATOS | fisica
+        valor = self.cache_l1.leer(clave)
+        if valor is None:
+            valor = self.cache_l2.leer(clave)
+            if valor is None:
+                if self.sistema_memoria is not None:
+                    valor = self.sistema_memoria.memoria_principal.leer(fisica) or 0
+                else:
+                    valor = self.memoria_datos.get(fisica, 0)
+                self.cache_l2.escribir(clave, valor)
+            self.cache_l1.escribir(clave, valor)
+        self.registros['MBR'] = valor
+        return valor
+
+    def escribir_dato(self, direccion, valor):
+        """Escribe un dato (escritura directa con asignación en L1 y L2)"""
+        fisica = self._traducir(direccion, 'escritura')
+        clave = CLAVE_DATOS | fisica
+        self.registros['MBR'] = valor
+        if self.cache_l1.leer(clave) is None:
+            self.cache_l2.leer(clave)
+        self.cache_l1.escribir(clave, valor)
+        self.cache_l2.escribir(clave, valor)
+        if self.sistema_memoria is not None:
+            self.sistema_memoria.memoria_principal.escribir(fisica, valor)
+        else:
+            self.memoria_datos[fisica] = valor
     
     def cargar_programa(self, programa):
         """Carga un programa en memoria"""
         self.programa_actual = programa
         self.registros['PC'] = programa.direccion_inicio
+        self.registros['SP'] = TOPE_PILA
         self.estado = "LISTO"
+
+    def conectar_memoria(self, sistema_memoria):
+        """Hace que instrucciones y datos pasen por las caches y el sistema de memoria
+
+        La MMU pasa a traducir con las tablas de páginas del sistema de memoria.
+        """
+        self.sistema_memoria = sistema_memoria
+        self.mmu.conectar(sistema_memoria)
+        if self.invalidar_fisicas not in sistema_memoria.invalidadores:
+            sistema_memoria.invalidadores.append(self.invalidar_fisicas)
+
+    def invalidar_fisicas(self, inicio, fin):
+        """Descarta de L1 y L2 los datos con dirección física en [inicio, fin)"""
+        for cache in (self.cache_l1, self.cache_l2):
+            datos = cache.datos
+            # Las claves de instrucciones no llevan CLAVE_DATOS y quedan fuera del rango
+            for clave in [clave for clave in datos if inicio <= clave ^ CLAVE_DATOS < fin]:
+                del datos[clave]
+
+    def buscar_instruccion(self, indice):
+        """Obtiene la instrucción `indice` del programa (L1 -> L2 -> memoria)"""
+        instrucciones = self.programa_actual.instrucciones
+        if self.sistema_memoria is None:
+            return instrucciones[indice]
+
+        direccion = indice * 4  # Instrucciones de 4 bytes
+        self.registros['MAR'] = direccion
+        instruccion = self.cache_l1.leer(direccion)
+        if instruccion is None:
+            instruccion = self.cache_l2.leer(direccion)
+            if instruccion is None:
+                self.mmu.traducir_direccion(direccion, self.programa_actual.id)
+                instruccion = instrucciones[indice]
+                self.cache_l2.escribir(direccion, instruccion)
+            self.cache_l1.escribir(direccion, instruccion)
+        self.registros['MBR'] = instruccion
+        return instruccion
+
+    def activar_cauce(self, **opciones):
+        """Ejecuta los programas con el modelo de cauce de 5 etapas; retorna el CauceSegmentado"""
+        from cauce_segmentado import CauceSegmentado
+        self.cauce = CauceSegmentado(self, **opciones)
+        return self.cauce
+
+    def desactivar_cauce(self):
+        """Vuelve al modelo de un ciclo por instrucción"""
+        self.cauce = None
+
+    def ejecutar_programa(self, limite_ciclos=None):
+        """Ejecuta el programa cargado hasta que el PC salga de él o se alcance el límite de ciclos"""
+        if self.programa_actual is None:
+            return 0
+        if self.cauce is not None:
+            return self.cauce.ejecutar(limite_ciclos)
+
+        total = len(self.programa_actual.instrucciones)
+        ejecutadas = 0
+        self.estado = "EJECUTANDO"
+        while 0 <= self.registros['PC'] < total:
+            if limite_ciclos is not None and ejecutadas >= limite_ciclos:
+                self.estado = "INTERRUMPIDO"
+                return ejecutadas
+            self.ejecutar_instruccion(self.buscar_instruccion(self.registros['PC']))
+            ejecutadas += 1
+        self.estado = "DETENIDO"
+        return ejecutadas
     
     def obtener_estado(self):
         """Retorna el estado actual del microprocesador"""
@@ -127,16 +360,100 @@ class Cache:
             'tamano_utilizado': len(self.datos) * 4  # bytes
         }
 
+class TLB:
+    """TLB totalmente asociativa con reemplazo LRU
+
+    Cada entrada cubre una página base o una grande; el alcance es la memoria
+    que traducen las entradas válidas. Solo lleva la cuenta de aciertos: la
+    traducción la hace siempre la tabla de páginas.
+    """
+
+    def __init__(self, entradas=64):
+        self.capacidad = entradas
+        self.entradas = OrderedDict()  # (proceso_id, tamaño de página, número de página) -> tamaño
+        self.aciertos = 0
+        self.fallos = 0
+        self.version_mapeo = 0
+
+    def consultar(self, direccion, proceso_id, paginacion=None, fallo=False):
+        """Registra la traducción de `direccion`; retorna True si estaba en la TLB
+
+        Con `fallo` (hubo fallo de página) la entrada no podía ser válida.
+        """
+        if paginacion is not None and paginacion.version_mapeo != self.version_mapeo:
+            # Se promovió o dividió alguna página grande: se vacía como tras un shootdown
+            self.entradas.clear()
+            self.version_mapeo = paginacion.version_mapeo
+        tamano_base = paginacion.tamano_pagina if paginacion is not None else 4096
+        claves = [(proceso_id, tamano_base, direccion // tamano_base)]
+        if paginacion is not None and paginacion.tamano_grande:
+            claves.insert(0, (proceso_id, paginacion.tamano_grande, direccion // paginacion.tamano_grande))
+        if not fallo:
+            for clave in claves:
+                if clave in self.entradas:
+                    self.entradas.move_to_end(clave)
+                    self.aciertos += 1
+                    return True
+        self.fallos += 1
+        tamano = paginacion.tamano_mapeo(proceso_id, direccion) if paginacion is not None else tamano_base
+        for clave in claves:
+            self.entradas.pop(clave, None)
+        self.entradas[(proceso_id, tamano, direccion // tamano)] = tamano
+        if len(self.entradas) > self.capacidad:
+            self.entradas.popitem(last=False)
+        return False
+
+    def alcance(self):
+        """Bytes de memoria cubiertos por las entradas actuales"""
+        return sum(self.entradas.values())
+
+    def obtener_estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': self.capacidad,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_fallos': self.fallos / consultas * 100 if consultas else 0,
+            'alcance': self.alcance()
+        }
+
+
 class MMU:
-    """Unidad de Gestión de Memoria"""
+    """Unidad de Gestión de Memoria
+
+    Conectada a un SistemaMemoria traduce con sus tablas de páginas y le deja
+    atender los fallos; sola, reparte marcos de un contador global.
+    """
     
     def __init__(self):
         self.tabla_paginas = {}
         self.direcciones_traducidas = 0
+        self.sistema_memoria = None
+        self.siguiente_marco = 0
+        self.tlb = None  # TLB opcional (ver activar_tlb)
+
+    def activar_tlb(self, entradas=64):
+        """Cuenta aciertos y alcance de una TLB de `entradas` entradas"""
+        self.tlb = TLB(entradas)
+        return self.tlb
+
+    def conectar(self, sistema_memoria):
+        """Usa la paginación de `sistema_memoria` como única tabla de traducción"""
+        self.sistema_memoria = sistema_memoria
     
-    def traducir_direccion(self, direccion_logica, proceso_id):
+    def traducir_direccion(self, direccion_logica, proceso_id, operacion='lectura'):
         """Traduce dirección lógica a física"""
         self.direcciones_traducidas += 1
+        sistema = self.sistema_memoria
+        if sistema is not None:
+            if self.tlb is None:
+                return sistema.traducir_direccion(direccion_logica, proceso_id, operacion)
+            fallos = sistema.estadisticas['fallos_pagina']
+            direccion_fisica = sistema.traducir_direccion(direccion_logica, proceso_id, operacion)
+            paginacion = sistema.paginacion if sistema.modo_memoria == 'paginacion' else None
+            self.tlb.consultar(direccion_logica, proceso_id, paginacion,
+                               sistema.estadisticas['fallos_pagina'] != fallos)
+            return direccion_fisica
         
         if proceso_id not in self.tabla_paginas:
             self.tabla_paginas[proceso_id] = {}
@@ -146,11 +463,13 @@ class MMU:
         desplazamiento = direccion_logica % 4096
         
         if numero_pagina not in self.tabla_paginas[proceso_id]:
-            # Asignar nueva página
-            marco_pagina = len(self.tabla_paginas[proceso_id])
-            self.tabla_paginas[proceso_id][numero_pagina] = marco_pagina
+            # Asignar nueva página en un marco que ningún otro proceso usa
+            self.tabla_paginas[proceso_id][numero_pagina] = self.siguiente_marco
+            self.siguiente_marco += 1
         
         marco = self.tabla_paginas[proceso_id][numero_pagina]
         direccion_fisica = marco * 4096 + desplazamiento
+        if self.tlb is not None:
+            self.tlb.consultar(direccion_logica, proceso_id)
         
         return direccion_fisica
\ No newline at end of file
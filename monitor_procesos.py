@@ -0,0 +1,286 @@
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+import psutil
+
+class HistorialProceso:
+    """Historial circular de CPU y memoria de un proceso en buffers compactos"""
+
+    def __init__(self, capacidad=300):
+        self.capacidad = capacidad
+        self.cpu = array('f', bytes(4 * capacidad))
+        self.memoria_mb = array('f', bytes(4 * capacidad))
+        self.posicion = 0
+        self.cantidad = 0
+
+    def agregar(self, cpu, memoria_mb):
+        """Agrega una muestra sobrescribiendo la más antigua si está lleno"""
+        self.cpu[self.posicion] = cpu
+        self.memoria_mb[self.posicion] = memoria_mb
+        self.posicion = (self.posicion + 1) % self.capacidad
+        if self.cantidad < self.capacidad:
+            self.cantidad += 1
+
+    def _ordenados(self, buffer):
+        if self.cantidad < self.capacidad:
+            return buffer[:self.cantidad]
+        return buffer[self.posicion:] + buffer[:self.posicion]
+
+    def valores_cpu(self):
+        """Retorna el historial de CPU de la muestra más antigua a la más reciente"""
+        return self._ordenados(self.cpu)
+
+    def valores_memoria(self):
+        """Retorna el historial de memoria (MB) de la muestra más antigua a la más reciente"""
+        return self._ordenados(self.memoria_mb)
+
+    def promedio_cpu(self):
+        return sum(self._ordenados(self.cpu)) / self.cantidad if self.cantidad else 0.0
+
+    def maximo_memoria(self):
+        return max(self._ordenados(self.memoria_mb)) if self.cantidad else 0.0
+
+class IndiceProcesos:
+    """Índice nombre -> pids mantenido incrementalmente comparando conjuntos de pids
+
+    El nombre de cada pid se lee al verlo por primera vez. Un proceso puede
+    cambiar de nombre después (exec) o su pid puede reutilizarse entre dos
+    actualizaciones, así que verificar() lo comprueba con el instante de
+    creación antes de usarlo. Los pids sin permiso de lectura no se indexan
+    y se reintentan en la siguiente actualización.
+    """
+
+    def __init__(self):
+        self.pids = set()  # pids indexados
+        self.nombre_de = {}  # pid -> nombre en minúsculas
+        self.creacion = {}  # pid -> instante de creación (identifica al proceso junto con el pid)
+        self.por_nombre = {}  # nombre en minúsculas -> set de pids
+        self.nombre_original = {}  # nombre en minúsculas -> nombre tal como lo reporta el SO
+
+    def _retirar(self, pid):
+        self.pids.discard(pid)
+        self.creacion.pop(pid, None)
+        nombre = self.nombre_de.pop(pid, None)
+        if nombre is not None:
+            pids = self.por_nombre.get(nombre)
+            if pids is not None:
+                pids.discard(pid)
+                if not pids:
+                    del self.por_nombre[nombre]
+                    self.nombre_original.pop(nombre, None)
+
+    def _indexar(self, pid):
+        """Lee nombre e instante de creación del pid; retorna el psutil.Process o None"""
+        try:
+            proceso = psutil.Process(pid)
+            with proceso.oneshot():
+                nombre = proceso.name()
+                creacion = proceso.create_time()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+        if not nombre:
+            return None
+        clave = nombre.lower()
+        self.pids.add(pid)
+        self.nombre_de[pid] = clave
+        self.creacion[pid] = creacion
+        self.por_nombre.setdefault(clave, set()).add(pid)
+        self.nombre_original.setdefault(clave, nombre)
+        return proceso
+
+    def actualizar(self):
+        """Incorpora los procesos nuevos y retira los terminados desde la última llamada"""
+        actuales = set(psutil.pids())
+
+        for pid in self.pids - actuales:
+            self._retirar(pid)
+
+        # Solo se consulta el nombre de los pids nuevos (y de los que antes no se pudieron leer)
+        for pid in actuales - self.pids:
+            self._indexar(pid)
+        return self
+
+    def verificar(self, pid, nombre):
+        """psutil.Process del pid si sigue siendo el proceso indexado y se llama `nombre`; si no, None
+
+        Un pid que cambió de nombre o que ahora es otro proceso se vuelve a indexar.
+        """
+        clave = nombre.lower()
+        try:
+            proceso = psutil.Process(pid)
+            with proceso.oneshot():
+                vigente = (proceso.create_time() == self.creacion.get(pid)
+                           and proceso.name().lower() == self.nombre_de.get(pid))
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self._retirar(pid)
+            return None
+        if not vigente:
+            self._retirar(pid)
+            proceso = self._indexar(pid)
+            if proceso is None:
+                return None
+        return proceso if self.nombre_de.get(pid) == clave else None
+
+    def buscar(self, nombre):
+        """Retorna el conjunto de pids con ese nombre (sin distinguir mayúsculas)"""
+        return set(self.por_nombre.get(nombre.lower(), ()))
+
+    def presentes(self, nombres):
+        """Retorna, con el nombre reportado por el SO, cuáles de `nombres` están en ejecución"""
+        claves = {nombre.lower() for nombre in nombres}
+        return {self.nombre_original[clave] for clave in claves & self.por_nombre.keys()}
+
+    def __len__(self):
+        return len(self.pids)
+
+class MuestreadorProcesos:
+    """Muestrea en paralelo un conjunto de procesos del sistema por lotes"""
+
+    def __init__(self, max_hilos=4, tamano_lote=16, capacidad_historial=300):
+        self.tamano_lote = tamano_lote
+        self.capacidad_historial = capacidad_historial
+
+        self.procesos = {}  # pid -> psutil.Process
+        self.nombres = {}  # pid -> nombre amigable
+        self.estaticos = {}  # pid -> datos que no cambian (usuario, inicio)
+        self.historial = {}  # pid -> HistorialProceso
+        self.ultimas = {}  # pid -> última muestra
+        self.desaparecidos = set()  # pids que terminaron desde la última consulta
+
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix='muestreador')
+        self._pendientes = []
+
+    def agregar(self, proceso, nombre=None):
+        """Comienza a monitorear un proceso (psutil.Process o pid)"""
+        if not isinstance(proceso, psutil.Process):
+            proceso = psutil.Process(proceso)
+        pid = proceso.pid
+        with self._lock:
+            if pid not in self.procesos:
+                # La primera llamada sin intervalo solo fija la referencia de CPU
+                try:
+                    proceso.cpu_percent(interval=None)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+                self.procesos[pid] = proceso
+                self.historial[pid] = HistorialProceso(self.capacidad_historial)
+            self.nombres[pid] = nombre or pid
+        return pid
+
+    def quitar(self, pid):
+        """Deja de monitorear un proceso"""
+        with self._lock:
+            self.procesos.pop(pid, None)
+            self.nombres.pop(pid, None)
+            self.estaticos.pop(pid, None)
+            self.historial.pop(pid, None)
+            self.ultimas.pop(pid, None)
+
+    def monitoreados(self):
+        """Retorna los pids monitoreados"""
+        with self._lock:
+            return list(self.procesos)
+
+    def _muestrear_lote(self, procesos):
+        """Toma una muestra de cada proceso del lote (se ejecuta en el pool)"""
+        resultados = []
+        for proceso in procesos:
+            pid = proceso.pid
+            try:
+                # oneshot agrupa las lecturas de /proc o de la API del SO en una sola
+                with proceso.oneshot():
+                    muestra = {
+                        'pid': pid,
+                        'nombre': proceso.name(),
+                        'cpu': proceso.cpu_percent(interval=None),
+                        'memoria_mb': proceso.memory_info().rss / (1024**2),
+                        'estado': proceso.status(),
+                        'hilos': proceso.num_threads(),
+                    }
+                    with self._lock:
+                        estaticos = self.estaticos.get(pid)
+                    if estaticos is None:
+                        try:
+                            usuario = proceso.username()
+                        except psutil.AccessDenied:
+                            usuario = 'N/A'
+                        estaticos = {'usuario': usuario, 'inicio': proceso.create_time()}
+                        with self._lock:
+                            # quitar() pudo retirarlo mientras tanto: no se vuelve a registrar
+                            if pid in self.procesos:
+                                self.estaticos[pid] = estaticos
+                muestra.update(estaticos)
+                resultados.append((pid, muestra))
+            except psutil.NoSuchProcess:
+                resultados.append((pid, None))
+            except psutil.AccessDenied:
+                continue
+        return resultados
+
+    def _lotes(self):
+        with self._lock:
+            procesos = list(self.procesos.values())
+        return [procesos[i:i + self.tamano_lote] for i in range(0, len(procesos), self.tamano_lote)]
+
+    def _publicar(self, resultados):
+        """Incorpora los resultados de un ciclo de muestreo"""
+        with self._lock:
+            for pid, muestra in resultados:
+                if pid not in self.procesos:
+                    continue  # se dejó de monitorear mientras se muestreaba
+                if muestra is None:
+                    # El proceso terminó: se retira sin interrumpir al resto
+                    self.desaparecidos.add(pid)
+                    del self.procesos[pid]
+                    self.nombres.pop(pid, None)
+                    self.estaticos.pop(pid, None)
+                    self.historial.pop(pid, None)
+                    self.ultimas.pop(pid, None)
+                    continue
+                muestra['tiempo'] = time.time() - muestra['inicio']
+                self.ultimas[pid] = muestra
+                self.historial[pid].agregar(muestra['cpu'], muestra['memoria_mb'])
+
+    def muestrear(self):
+        """Muestrea todos los procesos y espera el resultado"""
+        resultados = []
+        for parcial in self._pool.map(self._muestrear_lote, self._lotes()):
+            resultados.extend(parcial)
+        self._publicar(resultados)
+        return self.ultimas
+
+    def solicitar(self):
+        """Lanza un ciclo de muestreo en segundo plano si no hay otro en curso"""
+        if self._pendientes:
+            return False
+        self._pendientes = [self._pool.submit(self._muestrear_lote, lote) for lote in self._lotes()]
+        return True
+
+    def recoger(self):
+        """Publica el ciclo en segundo plano si ya terminó; nunca bloquea"""
+        if not self._pendientes or not all(f.done() for f in self._pendientes):
+            return False
+        resultados = []
+        for futuro in self._pendientes:
+            if futuro.exception() is None:
+                resultados.extend(futuro.result())
+        self._pendientes = []
+        self._publicar(resultados)
+        return True
+
+    def muestra(self, pid):
+        """Retorna la última muestra de un proceso o None"""
+        with self._lock:
+            return self.ultimas.get(pid)
+
+    def tomar_desaparecidos(self):
+        """Retorna y limpia los pids que terminaron desde la última consulta"""
+        with self._lock:
+            desaparecidos, self.desaparecidos = self.desaparecidos, set()
+        return desaparecidos
+
+    def cerrar(self):
+        """Detiene el pool de hilos"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+Microprocesador multinúcleo con L1 privadas, L2 compartida y coherencia MESI/MOESI.
+
+Cada núcleo es un Microprocesador con su propia L1 de datos. Las L1 se
+mantienen coherentes por espionaje de bus: los fallos de lectura emiten
+BusRd, los de escritura BusRdX y las escrituras sobre una copia compartida
+BusUpgr, que invalida las demás copias. Con MOESI una línea modificada
+que otro núcleo lee pasa a Propietario y se sirve de cache a cache sin
+escribirse en la L2.
+
+El estado compartido (estado de cada línea en cada L1, etiquetas de la L2,
+máscaras de palabras escritas y contadores) vive en un único búfer. En modo
+serie es un bytearray y los núcleos se intercalan por turnos; en modo
+paralelo es un bloque de multiprocessing.shared_memory y cada núcleo corre
+en su propio proceso, con cerrojos por grupos de líneas.
+
+Un fallo sobre una línea que otro núcleo invalidó es un fallo de coherencia;
+si la palabra que se busca no fue escrita por nadie desde la invalidación,
+se cuenta como falso compartido.
+
+Uso:
+    python multinucleo.py --modelo falso_compartido --nucleos 4
+    python multinucleo.py --modelo privado --escalabilidad 1 2 4 8 --paralelo
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from collections import OrderedDict
+from multiprocessing import shared_memory
+import numpy as np
+from generador_cargas import generar_programa
+from microprocesador import Microprocesador
+
+# Estados de una línea en una L1
+INVALIDO, COMPARTIDO, EXCLUSIVO, MODIFICADO, PROPIETARIO = 0, 1, 2, 3, 4
+INVALIDADO = 5  # inválida por la escritura de otro núcleo (fallo de coherencia al volver)
+NOMBRES_ESTADO = 'ISEMOI'
+PROTOCOLOS = ('MESI', 'MOESI')
+
+CONTADORES = ('accesos', 'escrituras', 'impactos_l1', 'fallos_l1', 'impactos_l2', 'accesos_memoria',
+              'intervenciones', 'bus_rd', 'bus_rdx', 'bus_upgr', 'invalidaciones', 'escrituras_diferidas',
+              'fallos_coherencia', 'falso_compartido', 'instrucciones', 'ciclos')
+(ACCESOS, ESCRITURAS, IMPACTOS_L1, FALLOS_L1, IMPACTOS_L2, ACCESOS_MEMORIA, INTERVENCIONES,
+ BUS_RD, BUS_RDX, BUS_UPGR, INVALIDACIONES, ESCRITURAS_DIFERIDAS, FALLOS_COHERENCIA,
+ FALSO_COMPARTIDO, INSTRUCCIONES, CICLOS) = range(len(CONTADORES))
+
+# Latencias en ciclos; 'bus' es el costo de difundir una invalidación
+LATENCIAS_POR_DEFECTO = {'cache_l1': 1, 'cache_l2': 12, 'memoria': 100, 'intervencion': 40, 'bus': 4}
+
+MODELOS = ('privado', 'compartido', 'falso_compartido', 'productor_consumidor')
+CERROJOS = 64
+
+class EstadoCompartido:
+    """Búfer con el estado de coherencia, la L2 y los contadores de todos los núcleos"""
+
+    def __init__(self, nucleos, lineas, lineas_l2, compartido=False, nombre=None):
+        self.nucleos = nucleos
+        self.lineas = lineas
+        self.lineas_l2 = lineas_l2
+        tamano_estados = (lineas * nucleos + 7) & ~7
+        tamano = tamano_estados + lineas * nucleos * 4 + lineas_l2 * 8 + nucleos * len(CONTADORES) * 8
+
+        self.memoria = None
+        if nombre is not None:
+            self.memoria = shared_memory.SharedMemory(name=nombre)
+            bufer = self.memoria.buf
+        elif compartido:
+            self.memoria = shared_memory.SharedMemory(create=True, size=tamano)
+            bufer = self.memoria.buf
+            bufer[:tamano] = bytes(tamano)
+        else:
+            bufer = memoryview(bytearray(tamano))
+
+        inicio_mascaras = tamano_estados
+        inicio_l2 = inicio_mascaras + lineas * nucleos * 4
+        inicio_contadores = inicio_l2 + lineas_l2 * 8
+        self.estados = bufer[:lineas * nucleos]
+        self.mascaras = bufer[inicio_mascaras:inicio_l2].cast('I')
+        self.l2 = bufer[inicio_l2:inicio_contadores].cast('q')
+        self.contadores = bufer[inicio_contadores:tamano].cast('q')
+
+    @property
+    def nombre(self):
+        return self.memoria.name if self.memoria is not None else None
+
+    def fila(self, nucleo):
+        """Contadores de un núcleo (vista escribible)"""
+        ancho = len(CONTADORES)
+        return self.contadores[nucleo * ancho:(nucleo + 1) * ancho]
+
+    def cerrar(self, liberar=False):
+        """Suelta las vistas y, si es el creador, libera la memoria compartida"""
+        for vista in (self.estados, self.mascaras, self.l2, self.contadores):
+            vista.release()
+        if self.memoria is not None:
+            self.memoria.close()
+            if liberar:
+                self.memoria.unlink()
+
+class Nucleo:
+    """Un núcleo: Microprocesador más L1 de datos coherente"""
+
+    def __init__(self, indice, estado, protocolo='MESI', tamano_l1_kb=32, tamano_linea=64,
+                 espacio=1 << 22, latencias=None, cerrojos=None):
+        if protocolo not in PROTOCOLOS:
+            raise ValueError(f"Protocolo desconocido: {protocolo}")
+        self.indice = indice
+        self.micro = Microprocesador()
+        self.estado = estado
+        self.moesi = protocolo == 'MOESI'
+        self.tamano_linea = tamano_linea
+        self.espacio = espacio
+        self.capacidad = max(1, tamano_l1_kb * 1024 // tamano_linea)
+        self.latencias = dict(LATENCIAS_POR_DEFECTO, **(latencias or {}))
+        self.cerrojos = cerrojos
+        self.lru = OrderedDict()  # líneas presentes en la L1, de la menos a la más reciente
+        self.contadores = estado.fila(indice)
+
+    def acceder(self, direccion, escritura=False):
+        """Accede a un dato; retorna el costo en ciclos"""
+        direccion %= self.espacio
+        linea = direccion // self.tamano_linea
+        palabra = (direccion % self.tamano_linea) >> 2
+        cerrojos = self.cerrojos
+        if cerrojos is None:
+            costo, victima = self._acceder(linea, palabra, escritura)
+            if victima is not None:
+                self._desalojar(victima)
+            return costo
+        with cerrojos[linea % CERROJOS]:
+            costo, victima = self._acceder(linea, palabra, escritura)
+        if victima is not None:
+            with cerrojos[victima % CERROJOS]:
+                self._desalojar(victima)
+        return costo
+
+    def _acceder(self, linea, palabra, escritura):
+        estados = self.estado.estados
+        mascaras = self.estado.mascaras
+        contadores = self.contadores
+        latencias = self.latencias
+        nucleos = self.estado.nucleos
+        yo = self.indice
+        base = linea * nucleos
+        propio = estados[base + yo]
+        contadores[ACCESOS] += 1
+
+        if not escritura:
+            if propio and propio != INVALIDADO:
+                contadores[IMPACTOS_L1] += 1
+                self.lru.move_to_end(linea)
+                return latencias['cache_l1'], None
+            self._clasificar_fallo(base, palabra, propio)
+            contadores[BUS_RD] += 1
+            proveedor = False
+            copias = False
+            for otro in range(base, base + nucleos):
+                estado = estados[otro]
+                if otro == base + yo or estado == INVALIDO or estado == INVALIDADO:
+                    continue
+                copias = True
+                if estado == MODIFICADO:
+                    proveedor = True
+                    if self.moesi:
+                        estados[otro] = PROPIETARIO
+                    else:
+                        estados[otro] = COMPARTIDO
+                        contadores[ESCRITURAS_DIFERIDAS] += 1
+                        self._escribir_l2(linea)
+                elif estado == PROPIETARIO:
+                    proveedor = True
+                elif estado == EXCLUSIVO:
+                    estados[otro] = COMPARTIDO
+            costo = latencias['cache_l1'] + (latencias['intervencion'] if proveedor else self._leer_l2(linea))
+            if proveedor:
+                contadores[INTERVENCIONES] += 1
+            return costo, self._instalar(linea, base, COMPARTIDO if copias else EXCLUSIVO)
+
+        contadores[ESCRITURAS] += 1
+        if propio == MODIFICADO or propio == EXCLUSIVO:
+            estados[base + yo] = MODIFICADO
+            contadores[IMPACTOS_L1] += 1
+            self.lru.move_to_end(linea)
+            return latencias['cache_l1'], None
+
+        if propio == COMPARTIDO or propio == PROPIETARIO:
+            contadores[BUS_UPGR] += 1
+            contadores[IMPACTOS_L1] += 1
+            self._invalidar_otros(base, palabra, False)
+            estados[base + yo] = MODIFICADO
+            self.lru.move_to_end(linea)
+            return latencias['cache_l1'] + latencias['bus'], None
+
+        self._clasificar_fallo(base, palabra, propio)
+        contadores[BUS_RDX] += 1
+        if self._invalidar_otros(base, palabra, True):
+            contadores[INTERVENCIONES] += 1
+            costo = latencias['cache_l1'] + latencias['intervencion']
+        else:
+            costo = latencias['cache_l1'] + self._leer_l2(linea)
+        return costo, self._instalar(linea, base, MODIFICADO)
+
+    def _clasificar_fallo(self, base, palabra, propio):
+        contadores = self.contadores
+        contadores[FALLOS_L1] += 1
+        if propio == INVALIDADO:
+            contadores[FALLOS_COHERENCIA] += 1
+            if not (self.estado.mascaras[base + self.indice] >> palabra) & 1:
+                contadores[FALSO_COMPARTIDO] += 1
+
+    def _invalidar_otros(self, base, palabra, con_datos):
+        """Invalida las copias de los demás núcleos; retorna True si alguna suministró el dato"""
+        estados = self.estado.estados
+        mascaras = self.estado.mascaras
+        contadores = self.contadores
+        bit = 1 << palabra
+        proveedor = False
+        for otro in range(base, base + self.estado.nucleos):
+            if otro == base + self.indice:
+                continue
+            estado = estados[otro]
+            if estado == INVALIDADO:
+                mascaras[otro] |= bit  # palabras escritas desde que se invalidó
+            elif estado != INVALIDO:
+                if con_datos and (estado == MODIFICADO or estado == PROPIETARIO):
+                    proveedor = True
+                    if not self.moesi:
+                        contadores[ESCRITURAS_DIFERIDAS] += 1
+                estados[otro] = INVALIDADO
+                mascaras[otro] = bit
+                contadores[INVALIDACIONES] += 1
+        return proveedor
+
+    def _instalar(self, linea, base, estado):
+        """Coloca la línea en la L1; retorna la víctima por capacidad, si la hay"""
+        self.estado.estados[base + self.indice] = estado
+        lru = self.lru
+        lru[linea] = None
+        lru.move_to_end(linea)
+        if len(lru) > self.capacidad:
+            victima, _ = lru.popitem(last=False)
+            return victima
+        return None
+
+    def _desalojar(self, linea):
+        estados = self.estado.estados
+        posicion = linea * self.estado.nucleos + self.indice
+        estado = estados[posicion]
+        if estado == MODIFICADO or estado == PROPIETARIO:
+            self.contadores[ESCRITURAS_DIFERIDAS] += 1
+            self._escribir_l2(linea)
+        if estado != INVALIDADO:
+            estados[posicion] = INVALIDO
+
+    def _leer_l2(self, linea):
+        """L2 compartida de correspondencia directa; retorna la latencia"""
+        l2 = self.estado.l2
+        conjunto = linea % self.estado.lineas_l2
+        if l2[conjunto] == linea + 1:
+            self.contadores[IMPACTOS_L2] += 1
+            return self.latencias['cache_l2']
+        self.contadores[ACCESOS_MEMORIA] += 1
+        l2[conjunto] = linea + 1
+        return self.latencias['cache_l2'] + self.latencias['memoria']
+
+    def _escribir_l2(self, linea):
+        self.estado.l2[linea % self.estado.lineas_l2] = linea + 1
+
+    def ejecutar(self, instrucciones, direcciones, escrituras, inicio=0, fin=None):
+        """Ejecuta una instrucción por cada acceso a datos de [inicio, fin)"""
+        micro = self.micro
+        registros = micro.registros
+        ejecutar = micro.ejecutar_instruccion
+        acceder = self.acceder
+        contadores = self.contadores
+        total = len(instrucciones)
+        fin = len(direcciones) if fin is None else fin
+        ciclos = 0
+        for i in range(inicio, fin):
+            pc = registros['PC']
+            if not 0 <= pc < total:
+                pc = registros['PC'] = 0
+            ejecutar(instrucciones[pc])
+            ciclos += 1 + acceder(direcciones[i], escrituras[i])
+        contadores[INSTRUCCIONES] += fin - inicio
+        contadores[CICLOS] += ciclos
+
+def _trabajador(nombre, configuracion, indice, instrucciones, direcciones, escrituras, cerrojos):
+    """Proceso de un núcleo en el modo paralelo"""
+    estado = EstadoCompartido(configuracion['nucleos'], configuracion['lineas'],
+                              configuracion['lineas_l2'], nombre=nombre)
+    try:
+        nucleo = Nucleo(indice, estado, configuracion['protocolo'], configuracion['tamano_l1_kb'],
+                        configuracion['tamano_linea'], configuracion['espacio'],
+                        configuracion['latencias'], cerrojos)
+        nucleo.ejecutar(instrucciones, direcciones, escrituras)
+        del nucleo
+    finally:
+        estado.cerrar()
+
+class Multiprocesador:
+    """N núcleos con L1 privadas coherentes y una L2 compartida"""
+
+    def __init__(self, nucleos=4, protocolo='MESI', tamano_l1_kb=32, tamano_l2_kb=1024,
+                 tamano_linea=64, espacio=1 << 22, latencias=None):
+        if protocolo not in PROTOCOLOS:
+            raise ValueError(f"Protocolo desconocido: {protocolo}")
+        self.nucleos = nucleos
+        self.configuracion = {
+            'nucleos': nucleos, 'protocolo': protocolo, 'tamano_l1_kb': tamano_l1_kb,
+            'tamano_linea': tamano_linea, 'espacio': espacio, 'lineas': espacio // tamano_linea,
+            'lineas_l2': max(1, tamano_l2_kb * 1024 // tamano_linea),
+            'latencias': dict(LATENCIAS_POR_DEFECTO, **(latencias or {})),
+        }
+        self.contadores = None
+
+    def _estado(self, compartido):
+        configuracion = self.configuracion
+        return EstadoCompartido(self.nucleos, configuracion['lineas'], configuracion['lineas_l2'], compartido)
+
+    def _nucleos(self, estado, cerrojos=None):
+        c = self.configuracion
+        return [Nucleo(i, estado, c['protocolo'], c['tamano_l1_kb'], c['tamano_linea'], c['espacio'],
+                       c['latencias'], cerrojos) for i in range(self.nucleos)]
+
+    def ejecutar(self, programas, accesos, paralelo=False, rebanada=8):
+        """Ejecuta un programa y una secuencia de accesos por núcleo; retorna el informe
+
+        `accesos[i]` es (direcciones, escrituras). En serie los núcleos se
+        turnan cada `rebanada` instrucciones; en paralelo el intercalado lo
+        decide el sistema operativo y los contadores no son reproducibles.
+        """
+        if len(programas) != self.nucleos or len(accesos) != self.nucleos:
+            raise ValueError(f"Se esperaban {self.nucleos} programas y secuencias de accesos")
+        inicio = time.perf_counter()
+        accesos = [(list(map(int, direcciones)), list(map(bool, escrituras)))
+                   for direcciones, escrituras in accesos]
+        programas = [list(map(int, programa)) for programa in programas]
+        if paralelo:
+            self._ejecutar_paralelo(programas, accesos)
+        else:
+            self._ejecutar_serie(programas, accesos, rebanada)
+        informe = self.informe()
+        informe['tiempo_real_s'] = time.perf_counter() - inicio
+        informe['paralelo'] = paralelo
+        return informe
+
+    def _ejecutar_serie(self, programas, accesos, rebanada):
+        estado = self._estado(False)
+        nucleos = self._nucleos(estado)
+        longitud = max(len(direcciones) for direcciones, _ in accesos)
+        for inicio in range(0, longitud, rebanada):
+            for nucleo, programa, (direcciones, escrituras) in zip(nucleos, programas, accesos):
+                if inicio < len(direcciones):
+                    nucleo.ejecutar(programa, direcciones, escrituras, inicio,
+                                    min(inicio + rebanada, len(direcciones)))
+        self.contadores = np.frombuffer(estado.contadores.tobytes(), dtype=np.int64).reshape(self.nucleos, -1)
+        del nucleos
+        estado.cerrar()
+
+    def _ejecutar_paralelo(self, programas, accesos):
+        estado = self._estado(True)
+        contexto = multiprocessing.get_context()
+        cerrojos = [contexto.Lock() for _ in range(CERROJOS)]
+        procesos = [contexto.Process(target=_trabajador, args=(
+            estado.nombre, self.configuracion, i, programas[i], accesos[i][0], accesos[i][1], cerrojos))
+            for i in range(self.nucleos)]
+        try:
+            for proceso in procesos:
+                proceso.start()
+            for proceso in procesos:
+                proceso.join()
+            fallidos = [i for i, proceso in enumerate(procesos) if proceso.exitcode != 0]
+            if fallidos:
+                raise RuntimeError(f"Fallaron los núcleos {fallidos}")
+            self.contadores = np.frombuffer(estado.contadores.tobytes(), dtype=np.int64).reshape(self.nucleos, -1)
+        finally:
+            estado.cerrar(liberar=True)
+
+    def informe(self):
+        """Totales, valores por núcleo y métricas de coherencia"""
+        contadores = self.contadores
+        totales = {nombre: int(valor) for nombre, valor in zip(CONTADORES, contadores.sum(axis=0))}
+        accesos = totales['accesos'] or 1
+        return {
+            'nucleos': self.nucleos,
+            'protocolo': self.configuracion['protocolo'],
+            'totales': totales,
+            'por_nucleo': [{nombre: int(valor) for nombre, valor in zip(CONTADORES, fila)} for fila in contadores],
+            'ciclos': int(contadores[:, CICLOS].max()),
+            'trafico_bus': totales['bus_rd'] + totales['bus_rdx'] + totales['bus_upgr'],
+            'tasa_fallos_l1': totales['fallos_l1'] / accesos * 100,
+            'tasa_falso_compartido': (totales['falso_compartido'] / totales['fallos_coherencia'] * 100
+                                      if totales['fallos_coherencia'] else 0),
+        }
+
+def generar_accesos(modelo, nucleos, cantidad, fraccion_escrituras=0.3, semilla=None,
+                    tamano_linea=64, tamano_region=16 * 1024):
+    """Secuencias de accesos por núcleo: [(direcciones uint32, escrituras bool)]"""
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo desconocido: {modelo}")
+    rng = np.random.default_rng(semilla)
+    palabras_linea = tamano_linea // 4
+    secuencias = []
+    for nucleo in range(nucleos):
+        escrituras = rng.random(cantidad) < fraccion_escrituras
+        if modelo == 'privado':
+            direcciones = nucleo * tamano_region + rng.integers(0, tamano_region // 4, cantidad) * 4
+        elif modelo == 'compartido':
+            direcciones = rng.integers(0, tamano_region // 4, cantidad) * 4
+        elif modelo == 'falso_compartido':
+            # Cada núcleo escribe su propia palabra de las mismas líneas
+            lineas = rng.integers(0, max(1, tamano_region // tamano_linea // 16), cantidad)
+            direcciones = lineas * tamano_linea + (nucleo % palabras_linea) * 4
+        else:
+            # El núcleo 0 produce en un búfer circular y los demás lo consumen
+            direcciones = (np.arange(cantidad) % (tamano_region // 4)) * 4
+            escrituras = np.full(cantidad, nucleo == 0)
+        secuencias.append((direcciones.astype(np.uint32), escrituras))
+    return secuencias
+
+def escalabilidad(modelo, accesos_totales, cantidades=(1, 2, 4, 8), protocolo='MESI', paralelo=False,
+                  semilla=None, **opciones):
+    """Reparte el mismo trabajo entre 1..N núcleos; retorna [(núcleos, informe, aceleración)]"""
+    resultados = []
+    base = None
+    for nucleos in cantidades:
+        por_nucleo = max(1, accesos_totales // nucleos)
+        accesos = generar_accesos(modelo, nucleos, por_nucleo, semilla=semilla)
+        programas = [generar_programa(256, semilla=None if semilla is None else semilla + i,
+                                      mezcla={'MOV': 1, 'ADD': 1, 'SUB': 1})[0] for i in range(nucleos)]
+        informe = Multiprocesador(nucleos, protocolo, **opciones).ejecutar(programas, accesos, paralelo)
+        base = base or informe['ciclos']
+        resultados.append((nucleos, informe, base / informe['ciclos'] if informe['ciclos'] else 0))
+    return resultados
+
+def imprimir_informe(informe, salida=None):
+    """Imprime los totales de un informe"""
+    totales = informe['totales']
+    print(f"=== {informe['nucleos']} núcleos, {informe['protocolo']}"
+          f"{' (paralelo)' if informe.get('paralelo') else ''} ===", file=salida)
+    print(f"Ciclos (núcleo más lento): {informe['ciclos']:,}", file=salida)
+    print(f"Accesos: {totales['accesos']:,}  fallos L1: {informe['tasa_fallos_l1']:.2f}%  "
+          f"impactos L2: {totales['impactos_l2']:,}  memoria: {totales['accesos_memoria']:,}", file=salida)
+    print(f"Tráfico de bus: {informe['trafico_bus']:,} (BusRd {totales['bus_rd']:,}, "
+          f"BusRdX {totales['bus_rdx']:,}, BusUpgr {totales['bus_upgr']:,})", file=salida)
+    print(f"Invalidaciones: {totales['invalidaciones']:,}  cache a cache: {totales['intervenciones']:,}  "
+          f"escrituras diferidas: {totales['escrituras_diferidas']:,}", file=salida)
+    print(f"Fallos de coherencia: {totales['fallos_coherencia']:,}  falso compartido: "
+          f"{totales['falso_compartido']:,} ({informe['tasa_falso_compartido']:.1f}%)", file=salida)
+    if 'tiempo_real_s' in informe:
+        print(f"Tiempo real: {informe['tiempo_real_s']:.2f} s", file=salida)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula un procesador multinúcleo con coherencia de caches")
+    parser.add_argument('--nucleos', type=int, default=4)
+    parser.add_argument('--protocolo', choices=PROTOCOLOS, default='MESI')
+    parser.add_argument('--modelo', choices=MODELOS, default='compartido')
+    parser.add_argument('--accesos', type=int, default=100_000, help="Accesos a datos por núcleo")
+    parser.add_argument('--escrituras', type=float, default=0.3, help="Fracción de escrituras")
+    parser.add_argument('--l1-kb', type=int, default=32)
+    parser.add_argument('--l2-kb', type=int, default=1024)
+    parser.add_argument('--linea', type=int, default=64, help="Tamaño de línea en bytes")
+    parser.add_argument('--paralelo', action='store_true', help="Un proceso del sistema por núcleo")
+    parser.add_argument('--escalabilidad', type=int, nargs='+', metavar='N',
+                        help="Reparte --accesos x --nucleos entre estas cantidades de núcleos")
+    parser.add_argument('--semilla', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    opciones = {'tamano_l1_kb': args.l1_kb, 'tamano_l2_kb': args.l2_kb, 'tamano_linea': args.linea}
+    if args.escalabilidad:
+        print("Núcleos       Ciclos   Aceleración   Eficiencia   Tráfico bus   Invalidaciones")
+        for nucleos, informe, aceleracion in escalabilidad(
+                args.modelo, args.accesos * args.nucleos, args.escalabilidad, args.protocolo,
+                args.paralelo, args.semilla, **opciones):
+            print(f"{nucleos:>7}{informe['ciclos']:>13,}{aceleracion:>13.2f}{aceleracion / nucleos * 100:>12.1f}%"
+                  f"{informe['trafico_bus']:>14,}{informe['totales']['invalidaciones']:>17,}")
+        return 0
+
+    accesos = generar_accesos(args.modelo, args.nucleos, args.accesos, args.escrituras, args.semilla,
+                              args.linea)
+    programas = [generar_programa(256, semilla=None if args.semilla is None else args.semilla + i,
+                                  mezcla={'MOV': 1, 'ADD': 1, 'SUB': 1})[0] for i in range(args.nucleos)]
+    try:
+        informe = Multiprocesador(args.nucleos, args.protocolo, **opciones).ejecutar(
+            programas, accesos, args.paralelo)
+    except Exception as e:
+        print(f"Error en la simulación: {e}")
+        return 1
+    imprimir_informe(informe)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
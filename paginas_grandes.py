@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Páginas grandes en SistemaMemoria: compara las políticas con una traza.
+
+Con páginas grandes la paginación mezcla páginas base (4 KB) y grandes
+(`tamano_pagina_grande`, 2 MB por defecto), que ocupan una región física
+alineada de marcos contiguos:
+
+    nunca      solo páginas base
+    promocion  las páginas base se cargan por demanda; cuando una región
+               virtual tiene `umbral_promocion` de sus páginas presentes y
+               privadas se junta en una página grande
+    al_fallo   el primer fallo en una región virtual vacía carga la página
+               grande entera
+
+Sin marcos libres la página grande con menos subpáginas usadas se divide:
+las nunca usadas se liberan (eran fragmentación interna) y las demás pasan
+a ser víctimas normales. Los marcos libres fuera de regiones completas son
+la fragmentación externa que impide nuevas páginas grandes.
+
+El informe muestra para cada política los fallos de página, la tasa de
+fallos y el alcance de una TLB, y las entradas de las tablas de páginas.
+
+Uso:
+    python paginas_grandes.py
+    python paginas_grandes.py --modelo conjunto_trabajo --procesos 2 --espacio-mb 6 --memoria-mb 8
+"""
+
+import argparse
+import sys
+import time
+
+from memoria import POLITICAS_PAGINAS_GRANDES
+
+
+def ejecutar(politica, generador, referencias, config, entradas_tlb=64):
+    """Reproduce la traza a través de una MMU con TLB; retorna el informe de la política"""
+    from memoria import SistemaMemoria
+    from microprocesador import MMU
+
+    sistema = SistemaMemoria(dict(config, paginas_grandes=politica))
+    mmu = MMU()
+    mmu.conectar(sistema)
+    tlb = mmu.activar_tlb(entradas_tlb)
+    traducir = mmu.traducir_direccion
+    alcance_maximo = 0
+
+    inicio = time.perf_counter()
+    for direcciones, proceso_ids, escrituras in generador.bloques(referencias):
+        for direccion, proceso_id, escritura in zip(direcciones.tolist(), proceso_ids.tolist(),
+                                                     escrituras.tolist()):
+            traducir(direccion, proceso_id, 'escritura' if escritura else 'lectura')
+        alcance_maximo = max(alcance_maximo, tlb.alcance())
+    segundos = time.perf_counter() - inicio
+
+    estadisticas = sistema.obtener_estadisticas()
+    return {
+        'politica': politica,
+        'accesos': estadisticas['accesos_memoria'],
+        'fallos_pagina': estadisticas['fallos_pagina'],
+        'tlb': tlb.obtener_estadisticas(),
+        'alcance_maximo': alcance_maximo,
+        'entradas_tabla': estadisticas['entradas_tabla'],
+        'paginas_grandes': estadisticas.get('paginas_grandes', 0),
+        'promociones': estadisticas.get('promociones', 0),
+        'degradaciones': estadisticas.get('degradaciones', 0),
+        'fragmentacion_externa': estadisticas.get('fragmentacion_externa', 0),
+        'fragmentacion_interna': estadisticas.get('fragmentacion_interna', 0),
+        'segundos': segundos
+    }
+
+
+def imprimir_informe(resultados):
+    """Tabla comparativa de las políticas"""
+    print(f"{'Política':<10} {'Fallos':>8} {'TLB fallos':>11} {'Alcance TLB':>12} {'Entradas':>9} "
+          f"{'Grandes':>8} {'Prom/Div':>9} {'Frag ext':>9} {'Frag int':>9} {'Tiempo':>8}")
+    for r in resultados:
+        print(f"{r['politica']:<10} {r['fallos_pagina']:>8,} {r['tlb']['tasa_fallos']:>10.2f}% "
+              f"{r['alcance_maximo'] // 1024:>9,} KB {r['entradas_tabla']:>9,} {r['paginas_grandes']:>8} "
+              f"{r['promociones']:>4}/{r['degradaciones']:<4} {r['fragmentacion_externa']:>8.1f}% "
+              f"{r['fragmentacion_interna'] // 1024:>6,} KB {r['segundos']:>7.2f}s")
+
+
+def main(argv=None):
+    from trazas_memoria import MODELOS, GeneradorTrazas
+    from utils import CONFIGURACION_POR_DEFECTO
+
+    parser = argparse.ArgumentParser(description="Compara páginas base, promoción y páginas grandes al fallo")
+    parser.add_argument('--politica', choices=POLITICAS_PAGINAS_GRANDES,
+                        help="Solo esta política (por defecto todas)")
+    parser.add_argument('--modelo', choices=MODELOS, default='secuencial')
+    parser.add_argument('--procesos', type=int, default=1)
+    parser.add_argument('--espacio-mb', type=int, default=6, help="Espacio de direcciones de cada proceso")
+    parser.add_argument('--memoria-mb', type=int, default=8)
+    parser.add_argument('--referencias', type=int, default=200_000)
+    parser.add_argument('--paso', type=int, default=64, help="Bytes entre referencias del modelo secuencial")
+    parser.add_argument('--grande-kb', type=int, default=2048, help="Tamaño de página grande")
+    parser.add_argument('--umbral', type=float, default=0.5,
+                        help="Fracción de páginas presentes de una región para promoverla")
+    parser.add_argument('--tlb', type=int, default=64, help="Entradas de la TLB")
+    parser.add_argument('--semilla', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    tamano_pagina = CONFIGURACION_POR_DEFECTO['tamano_pagina'] * 1024
+    config = dict(CONFIGURACION_POR_DEFECTO, tamano_memoria_principal=args.memoria_mb * 1024,
+                  tamano_pagina_grande=args.grande_kb, umbral_promocion=args.umbral)
+    politicas = [args.politica] if args.politica else list(POLITICAS_PAGINAS_GRANDES)
+    resultados = []
+    for politica in politicas:
+        # Cada política recibe una traza idéntica
+        generador = GeneradorTrazas(args.procesos, args.modelo, paginas_proceso=args.espacio_mb * 1024 * 1024 // tamano_pagina,
+                                    tamano_pagina=tamano_pagina, paso=args.paso, semilla=args.semilla)
+        resultados.append(ejecutar(politica, generador, args.referencias, config, args.tlb))
+    print(f"{args.referencias:,} referencias ({args.modelo}), {args.procesos} proceso(s) de {args.espacio_mb} MB, "
+          f"memoria de {args.memoria_mb} MB, TLB de {args.tlb} entradas")
+    imprimir_informe(resultados)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Planificación de procesos sobre el Microprocesador.
+
+Políticas disponibles (colas de listos con deque o heap, operaciones O(1) u
+O(log n)):
+
+    rr          Round Robin con quantum configurable
+    sjf         trabajo más corto primero, no expropiativo
+    srtf        menor tiempo restante primero (expropiativo en cada llegada)
+    prioridad   menor número = mayor prioridad (opcionalmente expropiativa)
+    mlfq        colas multinivel con retroalimentación e impulso periódico
+
+El tiempo se mide en ciclos: cada instrucción cuesta uno y cada cambio de
+contexto cuesta `costo_cambio`. Los registros del procesador se guardan y
+restauran en cada cambio. Cuando no hay procesos listos el reloj salta
+directamente a la siguiente llegada.
+
+Uso:
+    python planificador_cpu.py --politica rr --cuanto 10 --procesos 100000 --semilla 1
+    python planificador_cpu.py --comparar --procesos 10000
+"""
+
+import argparse
+import heapq
+import random
+import sys
+import time
+from collections import deque
+from microprocesador import Microprocesador, TOPE_PILA
+from memoria import Proceso
+
+class EntradaPlanificador:
+    """Estado de planificación de un proceso"""
+
+    __slots__ = ('proceso', 'llegada', 'prioridad', 'orden', 'ejecutadas', 'registros',
+                 'primera_ejecucion', 'fin', 'nivel', 'terminado')
+
+    def __init__(self, proceso, llegada=0, prioridad=0, orden=0):
+        self.proceso = proceso
+        self.llegada = llegada
+        self.prioridad = prioridad
+        self.orden = orden  # desempate estable en los heaps
+        self.ejecutadas = 0
+        self.registros = None
+        self.primera_ejecucion = None
+        self.fin = None
+        self.nivel = 0
+        self.terminado = False
+
+    @property
+    def restante(self):
+        """Ráfaga restante estimada: instrucciones del programa aún no ejecutadas"""
+        return max(len(self.proceso.instrucciones) - self.ejecutadas, 1)
+
+# --- Políticas --------------------------------------------------------------
+
+class RoundRobin:
+    """Turno circular con quantum fijo"""
+
+    expropiativa = False
+
+    def __init__(self, cuanto=10):
+        self.cuanto_fijo = cuanto
+        self.cola = deque()
+
+    def agregar(self, entrada):
+        self.cola.append(entrada)
+
+    def devolver(self, entrada, agoto_cuanto):
+        self.cola.append(entrada)
+
+    def siguiente(self):
+        return self.cola.popleft() if self.cola else None
+
+    def cuanto(self, entrada):
+        return self.cuanto_fijo
+
+    def __len__(self):
+        return len(self.cola)
+
+class _PoliticaHeap:
+    """Cola de listos ordenada por clave(entrada)"""
+
+    expropiativa = False
+
+    def __init__(self):
+        self.heap = []
+
+    def clave(self, entrada):
+        raise NotImplementedError
+
+    def agregar(self, entrada):
+        heapq.heappush(self.heap, (self.clave(entrada), entrada.orden, entrada))
+
+    def devolver(self, entrada, agoto_cuanto):
+        self.agregar(entrada)
+
+    def siguiente(self):
+        return heapq.heappop(self.heap)[2] if self.heap else None
+
+    def cuanto(self, entrada):
+        return None  # hasta terminar o hasta la siguiente llegada si es expropiativa
+
+    def __len__(self):
+        return len(self.heap)
+
+class SJF(_PoliticaHeap):
+    """Trabajo más corto primero (no expropiativo)"""
+
+    def clave(self, entrada):
+        return entrada.restante
+
+class SRTF(SJF):
+    """Menor tiempo restante primero: se reevalúa en cada llegada"""
+
+    expropiativa = True
+
+class Prioridad(_PoliticaHeap):
+    """Prioridad fija; menor número = mayor prioridad"""
+
+    def __init__(self, expropiativa=False):
+        super().__init__()
+        self.expropiativa = expropiativa
+
+    def clave(self, entrada):
+        return entrada.prioridad
+
+class MLFQ:
+    """Colas multinivel con retroalimentación
+
+    Un proceso que agota su quantum baja un nivel; cada `periodo_impulso`
+    ciclos todos vuelven al nivel superior para evitar inanición.
+    """
+
+    expropiativa = True
+
+    def __init__(self, cuantos=(8, 16, 32), periodo_impulso=5000):
+        self.cuantos = cuantos
+        self.colas = [deque() for _ in cuantos]
+        self.periodo_impulso = periodo_impulso
+        self.proximo_impulso = periodo_impulso
+        self.cantidad = 0
+
+    def agregar(self, entrada):
+        entrada.nivel = 0
+        self.colas[0].append(entrada)
+        self.cantidad += 1
+
+    def devolver(self, entrada, agoto_cuanto):
+        if agoto_cuanto:
+            entrada.nivel = min(entrada.nivel + 1, len(self.colas) - 1)
+        self.colas[entrada.nivel].append(entrada)
+        self.cantidad += 1
+
+    def siguiente(self):
+        for cola in self.colas:
+            if cola:
+                self.cantidad -= 1
+                return cola.popleft()
+        return None
+
+    def cuanto(self, entrada):
+        return self.cuantos[entrada.nivel]
+
+    def impulsar(self, reloj):
+        """Sube todos los procesos al nivel superior si se cumplió el periodo"""
+        if reloj < self.proximo_impulso:
+            return
+        self.proximo_impulso = reloj + self.periodo_impulso
+        superior = self.colas[0]
+        for cola in self.colas[1:]:
+            for entrada in cola:
+                entrada.nivel = 0
+            superior.extend(cola)
+            cola.clear()
+
+    def __len__(self):
+        return self.cantidad
+
+POLITICAS = {
+    'rr': RoundRobin,
+    'sjf': SJF,
+    'srtf': SRTF,
+    'prioridad': Prioridad,
+    'mlfq': MLFQ,
+}
+
+def crear_politica(nombre, **opciones):
+    """Instancia una política por nombre ('rr', 'sjf', 'srtf', 'prioridad', 'mlfq')"""
+    if nombre not in POLITICAS:
+        raise ValueError(f"Política desconocida: {nombre}")
+    return POLITICAS[nombre](**opciones)
+
+# --- Planificador -----------------------------------------------------------
+
+class PlanificadorCPU:
+    """Ejecuta varios procesos en un microprocesador según una política"""
+
+    def __init__(self, micro, politica, costo_cambio=0, limite_por_proceso=100000):
+        self.micro = micro
+        self.politica = politica
+        self.costo_cambio = costo_cambio
+        self.limite_por_proceso = limite_por_proceso
+
+        self.entradas = []
+        self.reloj = 0
+        self.cambios_contexto = 0
+        self.ciclos_cambio = 0
+        self.ciclos_ociosos = 0
+        self.ciclos_ejecucion = 0
+
+    def agregar(self, proceso, llegada=0, prioridad=0):
+        """Registra un proceso que llega en el ciclo `llegada`"""
+        entrada = EntradaPlanificador(proceso, llegada, prioridad, len(self.entradas))
+        proceso.estado = "NUEVO"
+        self.entradas.append(entrada)
+        return entrada
+
+    def _ejecutar_rafaga(self, entrada, limite):
+        """Ejecuta hasta `limite` instrucciones; retorna (ejecutadas, terminado)"""
+        micro = self.micro
+        registros = micro.registros
+        instrucciones = entrada.proceso.instrucciones
+        total = len(instrucciones)
+        ejecutar = micro.ejecutar_instruccion
+        buscar = micro.buscar_instruccion if micro.sistema_memoria is not None else instrucciones.__getitem__
+
+        limite = min(limite, self.limite_por_proceso - entrada.ejecutadas)
+        ejecutadas = 0
+        while ejecutadas < limite:
+            pc = registros['PC']
+            if not 0 <= pc < total:
+                return ejecutadas, True
+            ejecutar(buscar(pc))
+            ejecutadas += 1
+        terminado = (entrada.ejecutadas + ejecutadas >= self.limite_por_proceso
+                     or not 0 <= registros['PC'] < total)
+        return ejecutadas, terminado
+
+    def _cambiar_a(self, entrada, anterior):
+        """Guarda los registros del proceso anterior y carga los de `entrada`"""
+        micro = self.micro
+        if anterior is not None and not anterior.terminado:
+            anterior.registros = dict(micro.registros)
+        if entrada is anterior:
+            return
+        if anterior is not None:
+            self.cambios_contexto += 1
+            self.ciclos_cambio += self.costo_cambio
+            self.reloj += self.costo_cambio
+
+        micro.programa_actual = entrada.proceso
+        # Las caches se indexan por dirección virtual sin identificador de proceso
+        micro.cache_l1.datos.clear()
+        micro.cache_l2.datos.clear()
+        if entrada.registros is None:
+            for registro in micro.registros:
+                micro.registros[registro] = 0
+            micro.registros['PC'] = entrada.proceso.direccion_inicio
+            micro.registros['SP'] = TOPE_PILA
+        else:
+            micro.registros.update(entrada.registros)
+
+    def ejecutar(self):
+        """Simula hasta que todos los procesos terminen; retorna el informe"""
+        micro = self.micro
+        politica = self.politica
+        sistema_memoria = micro.sistema_memoria
+        llegadas = sorted(self.entradas, key=lambda e: (e.llegada, e.orden))
+        siguiente_llegada = 0
+        anterior = None
+        impulsar = getattr(politica, 'impulsar', None)
+        inicio = time.perf_counter()
+
+        def admitir():
+            nonlocal siguiente_llegada
+            while siguiente_llegada < len(llegadas) and llegadas[siguiente_llegada].llegada <= self.reloj:
+                entrada = llegadas[siguiente_llegada]
+                siguiente_llegada += 1
+                entrada.proceso.estado = "LISTO"
+                if sistema_memoria is not None:
+                    sistema_memoria.asignar_memoria(entrada.proceso, len(entrada.proceso.instrucciones) * 4)
+                politica.agregar(entrada)
+
+        micro.estado = "EJECUTANDO"
+        while siguiente_llegada < len(llegadas) or len(politica):
+            admitir()
+            if not len(politica):
+                # Sin procesos listos: saltar a la próxima llegada
+                proxima = llegadas[siguiente_llegada].llegada
+                self.ciclos_ociosos += proxima - self.reloj
+                self.reloj = proxima
+                continue
+
+            if impulsar:
+                impulsar(self.reloj)
+            entrada = politica.siguiente()
+            self._cambiar_a(entrada, anterior)
+            anterior = entrada
+            if entrada.primera_ejecucion is None:
+                entrada.primera_ejecucion = self.reloj
+            entrada.proceso.estado = "EJECUTANDO"
+
+            cuanto = politica.cuanto(entrada)
+            limite = cuanto if cuanto is not None else self.limite_por_proceso
+            if politica.expropiativa and siguiente_llegada < len(llegadas):
+                limite = min(limite, max(llegadas[siguiente_llegada].llegada - self.reloj, 1))
+
+            ejecutadas, terminado = self._ejecutar_rafaga(entrada, limite)
+            entrada.ejecutadas += ejecutadas
+            self.reloj += ejecutadas
+            self.ciclos_ejecucion += ejecutadas
+            entrada.proceso.contador_programa = entrada.ejecutadas
+
+            if terminado:
+                entrada.terminado = True
+                entrada.fin = self.reloj
+                entrada.proceso.estado = "TERMINADO"
+                entrada.registros = None
+                if sistema_memoria is not None:
+                    sistema_memoria.liberar_memoria(entrada.proceso.id)
+            else:
+                # Las llegadas durante la ráfaga entran a la cola antes que el proceso expropiado
+                admitir()
+                entrada.proceso.estado = "LISTO"
+                politica.devolver(entrada, cuanto is not None and ejecutadas >= cuanto)
+
+        micro.estado = "DETENIDO"
+        informe = self.informe()
+        informe['tiempo_real_s'] = time.perf_counter() - inicio
+        return informe
+
+    def informe(self):
+        """Throughput y tiempos medios de retorno, espera y respuesta (en ciclos)"""
+        terminadas = [e for e in self.entradas if e.terminado]
+        cantidad = len(terminadas)
+        retorno = sum(e.fin - e.llegada for e in terminadas)
+        espera = sum(e.fin - e.llegada - e.ejecutadas for e in terminadas)
+        respuesta = sum(e.primera_ejecucion - e.llegada for e in terminadas)
+        return {
+            'politica': type(self.politica).__name__,
+            'procesos': len(self.entradas),
+            'terminados': cantidad,
+            'ciclos_totales': self.reloj,
+            'ciclos_ejecucion': self.ciclos_ejecucion,
+            'ciclos_cambio_contexto': self.ciclos_cambio,
+            'ciclos_ociosos': self.ciclos_ociosos,
+            'cambios_contexto': self.cambios_contexto,
+            'utilizacion': self.ciclos_ejecucion / self.reloj * 100 if self.reloj else 0,
+            'throughput_por_1000_ciclos': cantidad / self.reloj * 1000 if self.reloj else 0,
+            'retorno_promedio': retorno / cantidad if cantidad else 0,
+            'espera_promedio': espera / cantidad if cantidad else 0,
+            'respuesta_promedio': respuesta / cantidad if cantidad else 0,
+        }
+
+def generar_procesos(cantidad, semilla=None, rafaga_media=20, llegada_media=15, prioridades=10):
+    """Procesos sin saltos con ráfagas exponenciales y llegadas de Poisson
+
+    Retorna una lista de (proceso, llegada, prioridad).
+    """
+    aleatorio = random.Random(semilla)
+    # Las instrucciones se toman de un repertorio fijo: generar cada una cuesta más que simularla
+    repertorio = [(aleatorio.randint(1, 3) << 24) | (aleatorio.randint(1, 2) << 16)
+                  | (aleatorio.randint(0, 255) << 8) for _ in range(1024)]
+    procesos = []
+    llegada = 0
+    for i in range(1, cantidad + 1):
+        longitud = max(1, int(aleatorio.expovariate(1 / rafaga_media)))
+        instrucciones = aleatorio.choices(repertorio, k=longitud)
+        procesos.append((Proceso(i, f"proceso{i}", max(1, longitud * 4 // 1024), instrucciones),
+                         llegada, aleatorio.randrange(prioridades)))
+        llegada += int(aleatorio.expovariate(1 / llegada_media))
+    return procesos
+
+def simular(politica, procesos, costo_cambio=0, micro=None, limite_por_proceso=100000):
+    """Planifica [(proceso, llegada, prioridad)] con la política dada; retorna el informe"""
+    planificador = PlanificadorCPU(micro or Microprocesador(), politica, costo_cambio, limite_por_proceso)
+    for proceso, llegada, prioridad in procesos:
+        planificador.agregar(proceso, llegada, prioridad)
+    return planificador.ejecutar()
+
+def imprimir_informe(informe, salida=None):
+    """Imprime el informe en texto legible"""
+    print(f"=== {informe['politica']} ===", file=salida)
+    print(f"Procesos terminados: {informe['terminados']} de {informe['procesos']}", file=salida)
+    print(f"Ciclos: {informe['ciclos_totales']} (ejecución {informe['ciclos_ejecucion']}, "
+          f"cambios de contexto {informe['ciclos_cambio_contexto']}, ocioso {informe['ciclos_ociosos']})",
+          file=salida)
+    print(f"Cambios de contexto: {informe['cambios_contexto']}, utilización {informe['utilizacion']:.1f}%",
+          file=salida)
+    print(f"Throughput: {informe['throughput_por_1000_ciclos']:.2f} procesos / 1000 ciclos", file=salida)
+    print(f"Retorno medio: {informe['retorno_promedio']:.1f}  Espera media: {informe['espera_promedio']:.1f}  "
+          f"Respuesta media: {informe['respuesta_promedio']:.1f} ciclos", file=salida)
+    print(f"Tiempo real: {informe['tiempo_real_s']:.2f} s", file=salida)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula la planificación de procesos en el microprocesador")
+    parser.add_argument('--politica', choices=sorted(POLITICAS), default='rr')
+    parser.add_argument('--comparar', action='store_true', help="Ejecuta todas las políticas con la misma carga")
+    parser.add_argument('--cuanto', type=int, default=10, help="Quantum de Round Robin")
+    parser.add_argument('--expropiativa', action='store_true', help="Prioridad expropiativa")
+    parser.add_argument('--costo-cambio', type=int, default=5, help="Ciclos por cambio de contexto")
+    parser.add_argument('--procesos', type=int, default=1000)
+    parser.add_argument('--rafaga-media', type=float, default=20)
+    parser.add_argument('--llegada-media', type=float, default=15)
+    parser.add_argument('--semilla', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    opciones = {'rr': {'cuanto': args.cuanto}, 'prioridad': {'expropiativa': args.expropiativa}}
+    nombres = sorted(POLITICAS) if args.comparar else [args.politica]
+    semilla = args.semilla if args.semilla is not None else random.randrange(1 << 30)
+    for nombre in nombres:
+        # Cada política recibe una copia idéntica de la carga
+        procesos = generar_procesos(args.procesos, semilla, args.rafaga_media, args.llegada_media)
+        informe = simular(crear_politica(nombre, **opciones.get(nombre, {})), procesos, args.costo_cambio)
+        imprimir_informe(informe)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
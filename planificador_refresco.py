@@ -0,0 +1,117 @@
+import time
+
+class TareaRefresco:
+    """Un panel de la interfaz con su propia cadencia y presupuesto de tiempo"""
+
+    def __init__(self, nombre, funcion, intervalo_ms, presupuesto_ms=None, visible=None, version=None):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.intervalo_base = intervalo_ms
+        self.intervalo_actual = intervalo_ms
+        self.presupuesto = presupuesto_ms if presupuesto_ms is not None else intervalo_ms / 4
+        self.visible = visible  # callable -> bool; None = siempre visible
+        self.version = version  # callable -> valor; si no cambia no se vuelve a dibujar
+        self.ultima_version = None
+
+        self.proxima = 0.0  # instante (monotonic) en que toca ejecutarla
+        self.ultimo_ms = 0.0
+        self.promedio_ms = 0.0
+        self.ejecuciones = 0
+        self.omitidas = 0  # por estar oculta o sin cambios
+
+    def esta_visible(self):
+        return self.visible is None or self.visible()
+
+class PlanificadorRefresco:
+    """Ejecuta las tareas de refresco que tocan, saltando las ocultas y espaciando las lentas"""
+
+    def __init__(self, factor_retroceso=2.0, intervalo_minimo=50, intervalo_maximo=30000):
+        self.tareas = {}
+        self.factor_retroceso = factor_retroceso
+        self.intervalo_minimo = intervalo_minimo
+        self.intervalo_maximo = intervalo_maximo
+        self.ultimo_ciclo_ms = 0.0
+        self.ciclos_excedidos = 0
+
+    def registrar(self, nombre, funcion, intervalo_ms, presupuesto_ms=None, visible=None, version=None):
+        """Registra un panel; retorna su TareaRefresco"""
+        tarea = TareaRefresco(nombre, funcion, intervalo_ms, presupuesto_ms, visible, version)
+        self.tareas[nombre] = tarea
+        return tarea
+
+    def cambiar_intervalo_base(self, factor):
+        """Escala el intervalo base de todas las tareas (p. ej. al cambiar el intervalo global)"""
+        for tarea in self.tareas.values():
+            tarea.intervalo_base = max(self.intervalo_minimo, tarea.intervalo_base * factor)
+            tarea.intervalo_actual = tarea.intervalo_base
+            tarea.proxima = 0.0
+
+    def ejecutar_pendientes(self, ahora=None):
+        """Ejecuta las tareas visibles cuyo turno llegó; retorna los nombres ejecutados"""
+        ahora = time.monotonic() if ahora is None else ahora
+        inicio_ciclo = time.perf_counter()
+        ejecutadas = []
+
+        for tarea in self.tareas.values():
+            if tarea.proxima > ahora:
+                continue
+            if not tarea.esta_visible():
+                # Queda vencida: se ejecutará en cuanto vuelva a mostrarse
+                tarea.omitidas += 1
+                continue
+            if tarea.version is not None:
+                version = tarea.version()
+                if version == tarea.ultima_version:
+                    tarea.omitidas += 1
+                    tarea.proxima = ahora + tarea.intervalo_actual / 1000
+                    continue
+                tarea.ultima_version = version
+
+            inicio = time.perf_counter()
+            try:
+                tarea.funcion()
+            except Exception as e:
+                print(f"Error en el refresco de {tarea.nombre}: {e}")
+            duracion = (time.perf_counter() - inicio) * 1000
+
+            tarea.ultimo_ms = duracion
+            tarea.promedio_ms = duracion if not tarea.ejecuciones else 0.8 * tarea.promedio_ms + 0.2 * duracion
+            tarea.ejecuciones += 1
+            self._ajustar_intervalo(tarea, duracion)
+            tarea.proxima = ahora + tarea.intervalo_actual / 1000
+            ejecutadas.append(tarea)
+
+        self.ultimo_ciclo_ms = (time.perf_counter() - inicio_ciclo) * 1000
+        if ejecutadas:
+            # Si el ciclo completo excede el intervalo más corto, todas las tareas del ciclo ceden
+            intervalo_ciclo = min(tarea.intervalo_actual for tarea in ejecutadas)
+            if self.ultimo_ciclo_ms > intervalo_ciclo:
+                self.ciclos_excedidos += 1
+                for tarea in ejecutadas:
+                    tarea.intervalo_actual = min(self.intervalo_maximo,
+                                                 tarea.intervalo_actual * self.factor_retroceso)
+                    tarea.proxima = ahora + tarea.intervalo_actual / 1000
+        return [tarea.nombre for tarea in ejecutadas]
+
+    def _ajustar_intervalo(self, tarea, duracion):
+        """Retrocede si la tarea excede su presupuesto y recupera la cadencia cuando hay holgura"""
+        if duracion > tarea.presupuesto:
+            tarea.intervalo_actual = min(self.intervalo_maximo,
+                                         tarea.intervalo_actual * self.factor_retroceso)
+        elif duracion < tarea.presupuesto / 2 and tarea.intervalo_actual > tarea.intervalo_base:
+            tarea.intervalo_actual = max(tarea.intervalo_base,
+                                         tarea.intervalo_actual / self.factor_retroceso)
+
+    def tiempo_hasta_siguiente(self, ahora=None):
+        """Milisegundos hasta la próxima tarea visible"""
+        ahora = time.monotonic() if ahora is None else ahora
+        proximas = [tarea.proxima for tarea in self.tareas.values() if tarea.esta_visible()]
+        if not proximas:
+            return self.intervalo_maximo
+        espera = (min(proximas) - ahora) * 1000
+        return int(min(self.intervalo_maximo, max(self.intervalo_minimo, espera)))
+
+    def resumen(self):
+        """Retorna (nombre, intervalo actual, último ms, promedio ms, omitidas) por tarea"""
+        return [(tarea.nombre, tarea.intervalo_actual, tarea.ultimo_ms, tarea.promedio_ms, tarea.omitidas)
+                for tarea in self.tareas.values()]
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Puntos de control (checkpoint / restore) del estado completo del simulador.
+
+Se guardan los registros y contadores del microprocesador, el contenido y
+las estadísticas de las caches, la MMU, las tablas de páginas, los
+segmentos, el espacio de intercambio y el contenido de MemoriaPrincipal.
+
+Formato del archivo (.simk):
+    cabecera     <4sHBBQI: magia, versión, tipo, reservado, identificador, longitud de metadatos
+    metadatos    pickle con las estructuras del simulador y la lista de marcos incluidos
+    memoria      palabras de MemoriaPrincipal (int64) volcadas directamente desde el arreglo
+
+Un punto de control incremental solo incluye los marcos de las páginas con
+el bit `modificado` activo y referencia a su base; al guardarlo se limpian
+esos bits, así que el siguiente incremental parte de él. Restaurar un
+incremental restaura primero su cadena de bases.
+
+Uso:
+    python puntos_control.py info estado.simk
+    python puntos_control.py demostracion --instrucciones 200000
+"""
+
+import argparse
+import os
+import pickle
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from memoria import SistemaMemoria, MemoriaPrincipal, Proceso
+from microprocesador import Microprocesador
+
+MAGIA = b'SIMK'
+VERSION = 1
+CABECERA = struct.Struct('<4sHBBQI')
+COMPLETO, INCREMENTAL = 0, 1
+BYTES_PALABRA = 8  # MemoriaPrincipal.datos es array('q')
+
+class ErrorPuntoControl(ValueError):
+    """Archivo de punto de control inválido o cadena incremental rota"""
+
+# --- captura y aplicación del estado ------------------------------------------
+
+def _atributos(objeto, excluir=()):
+    """Atributos de datos de un objeto (sin métodos sustituidos por la instrumentación)"""
+    return {clave: valor for clave, valor in vars(objeto).items()
+            if not callable(valor) and clave not in excluir}
+
+def _estado_proceso(proceso):
+    if proceso is None:
+        return None
+    return {clave: valor for clave, valor in vars(proceso).items() if clave != 'proceso_real'}
+
+def _crear_proceso(estado):
+    if estado is None:
+        return None
+    proceso = Proceso(estado['id'], estado['nombre'], estado['tamano'])
+    vars(proceso).update(estado)
+    return proceso
+
+def estado_microprocesador(micro):
+    """Estado serializable del microprocesador"""
+    return {
+        'registros': micro.registros,
+        'estado': micro.estado,
+        'ciclos': micro.ciclos,
+        'programa_actual': _estado_proceso(micro.programa_actual),
+        'cache_l1': _atributos(micro.cache_l1),
+        'cache_l2': _atributos(micro.cache_l2),
+        'mmu': _atributos(micro.mmu, excluir=('sistema_memoria',)),  # el enlace no se copia
+        'memoria_datos': micro.memoria_datos,
+    }
+
+def aplicar_microprocesador(micro, estado):
+    """Copia un estado capturado sobre un microprocesador existente"""
+    micro.registros.clear()
+    micro.registros.update(estado['registros'])
+    micro.estado = estado['estado']
+    micro.ciclos = estado['ciclos']
+    micro.programa_actual = _crear_proceso(estado['programa_actual'])
+    vars(micro.cache_l1).update(estado['cache_l1'])
+    vars(micro.cache_l2).update(estado['cache_l2'])
+    vars(micro.mmu).update(estado['mmu'])
+    micro.memoria_datos = estado.get('memoria_datos', {})
+
+def estado_sistema(sistema):
+    """Estado serializable del sistema de memoria, salvo el contenido de MemoriaPrincipal"""
+    return {
+        'config': sistema.config,
+        'algoritmo_reemplazo': sistema.algoritmo_reemplazo,
+        'modo_memoria': sistema.modo_memoria,
+        'paginas_grandes': (sistema.paginas_grandes, sistema.umbral_promocion),
+        'estadisticas': sistema.estadisticas,
+        'procesos': {clave: _estado_proceso(p) if isinstance(p, Proceso) else p
+                     for clave, p in sistema.procesos.items()},
+        'paginacion': _atributos(sistema.paginacion),
+        'segmentacion': _atributos(sistema.segmentacion),
+        'memoria_virtual': _atributos(sistema.memoria_virtual),
+        'memoria_tamano': sistema.memoria_principal.tamano,
+        'memoria_estado': sistema.memoria_principal.estado,
+    }
+
+def aplicar_sistema(sistema, estado):
+    """Copia un estado capturado sobre un sistema de memoria existente (sin el contenido de la RAM)"""
+    sistema.config = estado['config']
+    sistema.algoritmo_reemplazo = estado['algoritmo_reemplazo']
+    sistema.modo_memoria = estado['modo_memoria']
+    sistema.paginas_grandes, sistema.umbral_promocion = estado.get('paginas_grandes', ('nunca', 0.5))
+    sistema.estadisticas = estado['estadisticas']
+    sistema.procesos = {clave: _crear_proceso(p) if isinstance(p, dict) and 'instrucciones' in p else p
+                        for clave, p in estado['procesos'].items()}
+    vars(sistema.paginacion).update(estado['paginacion'])
+    vars(sistema.segmentacion).update(estado['segmentacion'])
+    vars(sistema.memoria_virtual).update(estado['memoria_virtual'])
+    if sistema.memoria_principal.tamano != estado['memoria_tamano']:
+        sistema.memoria_principal = MemoriaPrincipal(estado['memoria_tamano'] // 1024)
+    sistema.memoria_principal.estado = estado['memoria_estado']
+
+def marcos_modificados(sistema, limpiar=True):
+    """Marcos de las páginas presentes (base o grandes) con el bit `modificado`; opcionalmente lo limpia"""
+    paginacion = sistema.paginacion
+    palabras_pagina = paginacion.tamano_pagina
+    limite = len(sistema.memoria_principal.datos)
+    marcos = set()
+    for tabla in paginacion.tabla_paginas.values():
+        for info in tabla.values():
+            if info['modificado']:
+                if info['presente'] and info['marco'] * palabras_pagina < limite:
+                    marcos.add(info['marco'])
+                if limpiar:
+                    info['modificado'] = False
+    # Una página grande modificada cuenta con todos sus marcos
+    for grandes in paginacion.tabla_grandes.values():
+        for info in grandes.values():
+            if info['modificado']:
+                marcos.update(marco for marco in range(info['marco'], info['marco'] + paginacion.paginas_por_grande)
+                              if marco * palabras_pagina < limite)
+                if limpiar:
+                    info['modificado'] = False
+    return sorted(marcos)
+
+# --- archivos -----------------------------------------------------------------
+
+def guardar_checkpoint(ruta, micro=None, sistema_memoria=None, incremental=False):
+    """Guarda un punto de control; retorna su identificador
+
+    Con incremental=True la base es el último punto de control guardado o
+    restaurado en este sistema de memoria.
+    """
+    sistema = sistema_memoria if sistema_memoria is not None else getattr(micro, 'sistema_memoria', None)
+    base = sistema.ultimo_checkpoint if sistema is not None else None
+    if incremental and base is None:
+        raise ErrorPuntoControl("Un punto de control incremental necesita uno anterior como base")
+
+    identificador = int.from_bytes(os.urandom(8), 'little')
+    marcos = None
+    if sistema is not None:
+        marcos = marcos_modificados(sistema) if incremental else None
+        if not incremental:
+            marcos_modificados(sistema)  # el completo es la nueva referencia de los bits
+    metadatos = {
+        'micro': estado_microprocesador(micro) if micro is not None else None,
+        'tamanos_cache': (micro.cache_l1.tamano, micro.cache_l2.tamano) if micro is not None else None,
+        'sistema': estado_sistema(sistema) if sistema is not None else None,
+        'base': (os.path.relpath(os.path.abspath(base[0]), os.path.dirname(os.path.abspath(ruta))), base[1])
+                if incremental else None,
+        'marcos': marcos,
+        'palabras_pagina': sistema.paginacion.tamano_pagina if sistema is not None else 0,
+    }
+    contenido = pickle.dumps(metadatos, protocol=pickle.HIGHEST_PROTOCOL)
+
+    with open(ruta, 'wb') as archivo:
+        archivo.write(CABECERA.pack(MAGIA, VERSION, INCREMENTAL if incremental else COMPLETO, 0,
+                                    identificador, len(contenido)))
+        archivo.write(contenido)
+        if sistema is not None:
+            vista = memoryview(sistema.memoria_principal.datos).cast('B')
+            if marcos is None:
+                archivo.write(vista)
+            else:
+                tamano = metadatos['palabras_pagina'] * BYTES_PALABRA
+                for marco in marcos:
+                    archivo.write(vista[marco * tamano:(marco + 1) * tamano])
+            vista.release()
+    if sistema is not None:
+        sistema.ultimo_checkpoint = (ruta, identificador)
+    return identificador
+
+def leer_cabecera(archivo):
+    """Retorna (tipo, identificador, longitud de metadatos) validando la magia y la versión"""
+    datos = archivo.read(CABECERA.size)
+    if len(datos) != CABECERA.size:
+        raise ErrorPuntoControl("Archivo truncado")
+    magia, version, tipo, _, identificador, longitud = CABECERA.unpack(datos)
+    if magia != MAGIA:
+        raise ErrorPuntoControl("No es un punto de control del simulador")
+    if version != VERSION:
+        raise ErrorPuntoControl(f"Versión de punto de control no soportada: {version}")
+    return tipo, identificador, longitud
+
+def cargar_checkpoint(ruta, micro=None, sistema_memoria=None):
+    """Restaura un punto de control (y su cadena de bases); retorna (micro, sistema_memoria)
+
+    Si no se pasan objetos se crean nuevos con la configuración guardada.
+    """
+    with open(ruta, 'rb') as archivo:
+        tipo, identificador, longitud = leer_cabecera(archivo)
+        metadatos = pickle.loads(archivo.read(longitud))
+
+        if tipo == INCREMENTAL:
+            ruta_base, id_base = metadatos['base']
+            ruta_base = os.path.join(os.path.dirname(os.path.abspath(ruta)), ruta_base)
+            micro, sistema_memoria = cargar_checkpoint(ruta_base, micro, sistema_memoria)
+            if sistema_memoria is None or sistema_memoria.ultimo_checkpoint[1] != id_base:
+                raise ErrorPuntoControl(f"La base {ruta_base} no corresponde a {ruta}")
+
+        estado = metadatos['sistema']
+        if estado is not None:
+            if sistema_memoria is None:
+                sistema_memoria = SistemaMemoria(estado['config'])
+            aplicar_sistema(sistema_memoria, estado)
+            vista = memoryview(sistema_memoria.memoria_principal.datos).cast('B')
+            try:
+                if metadatos['marcos'] is None:
+                    if archivo.readinto(vista) != len(vista):
+                        raise ErrorPuntoControl("Contenido de memoria truncado")
+                else:
+                    tamano = metadatos['palabras_pagina'] * BYTES_PALABRA
+                    for marco in metadatos['marcos']:
+                        if archivo.readinto(vista[marco * tamano:(marco + 1) * tamano]) != tamano:
+                            raise ErrorPuntoControl("Contenido de memoria truncado")
+            finally:
+                vista.release()
+            sistema_memoria.ultimo_checkpoint = (ruta, identificador)
+
+        if metadatos['micro'] is not None:
+            if micro is None:
+                l1, l2 = metadatos['tamanos_cache']
+                micro = Microprocesador(l1 // 1024, l2 // 1024)
+            aplicar_microprocesador(micro, metadatos['micro'])
+            if sistema_memoria is not None:
+                micro.conectar_memoria(sistema_memoria)
+    return micro, sistema_memoria
+
+def bifurcar(micro=None, sistema_memoria=None):
+    """Copia independiente del simulador en memoria, para experimentos a partir del mismo estado"""
+    sistema = sistema_memoria if sistema_memoria is not None else getattr(micro, 'sistema_memoria', None)
+    nuevo_micro = nuevo_sistema = None
+    if sistema is not None:
+        estado = pickle.loads(pickle.dumps(estado_sistema(sistema), protocol=pickle.HIGHEST_PROTOCOL))
+        nuevo_sistema = SistemaMemoria(estado['config'])
+        aplicar_sistema(nuevo_sistema, estado)
+        nuevo_sistema.memoria_principal.datos = array('q', sistema.memoria_principal.datos)
+        nuevo_sistema.ultimo_checkpoint = sistema.ultimo_checkpoint
+    if micro is not None:
+        estado = pickle.loads(pickle.dumps(estado_microprocesador(micro), protocol=pickle.HIGHEST_PROTOCOL))
+        nuevo_micro = Microprocesador(micro.cache_l1.tamano // 1024, micro.cache_l2.tamano // 1024)
+        aplicar_microprocesador(nuevo_micro, estado)
+        if nuevo_sistema is not None:
+            nuevo_micro.conectar_memoria(nuevo_sistema)
+    return nuevo_micro, nuevo_sistema
+
+# --- línea de comandos ---------------------------------------------------------
+
+def informacion(ruta):
+    """Describe un punto de control y su cadena de bases"""
+    cadena = []
+    while ruta is not None:
+        with open(ruta, 'rb') as archivo:
+            tipo, identificador, longitud = leer_cabecera(archivo)
+            metadatos = pickle.loads(archivo.read(longitud))
+        micro = metadatos['micro']
+        cadena.append({
+            'ruta': ruta,
+            'tipo': 'incremental' if tipo == INCREMENTAL else 'completo',
+            'identificador': f"{identificador:016x}",
+            'bytes': os.path.getsize(ruta),
+            'marcos': len(metadatos['marcos']) if metadatos['marcos'] is not None else None,
+            'ciclos': micro['ciclos'] if micro else None,
+        })
+        base = metadatos['base']
+        ruta = os.path.join(os.path.dirname(os.path.abspath(ruta)), base[0]) if base else None
+    return cadena
+
+def _demostracion(instrucciones, directorio):
+    """Calienta una simulación, guarda puntos de control y bifurca desde ellos"""
+    import random
+    from utils import CONFIGURACION_POR_DEFECTO, generar_programa_ejemplo
+
+    config = dict(CONFIGURACION_POR_DEFECTO)
+    micro = Microprocesador(config['tamano_cache_l1'], config['tamano_cache_l2'])
+    sistema = SistemaMemoria(config)
+    micro.conectar_memoria(sistema)
+    instrucciones_programa = generar_programa_ejemplo("demostracion", 4096, semilla=1,
+                                                      mezcla={'MOV': 1, 'ADD': 1, 'SUB': 1})
+    programa = Proceso(1, "demostracion", 256, instrucciones_programa)
+    limite = programa.tamano * 1024
+    sistema.asignar_memoria(programa, limite)
+    micro.cargar_programa(programa)
+    aleatorio = random.Random(1)
+
+    def simular(cantidad, region):
+        for _ in range(cantidad):
+            direccion = aleatorio.randrange(region)
+            fisica = sistema.traducir_direccion(direccion, programa.id, 'escritura')
+            sistema.memoria_principal.escribir(fisica, aleatorio.getrandbits(32))
+        micro.registros['PC'] = 0
+        micro.ejecutar_programa(limite_ciclos=cantidad)
+
+    if directorio is None:
+        directorio = tempfile.mkdtemp(prefix='puntos_control_')
+        print(f"Puntos de control en {directorio}")
+    completo = os.path.join(directorio, 'completo.simk')
+    incremental = os.path.join(directorio, 'incremental.simk')
+    simular(instrucciones, limite)
+    inicio = time.perf_counter()
+    guardar_checkpoint(completo, micro, sistema)
+    print(f"Completo: {os.path.getsize(completo):,} bytes en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    simular(instrucciones // 100, 4 * sistema.paginacion.tamano_pagina)  # pocas páginas sucias
+    inicio = time.perf_counter()
+    guardar_checkpoint(incremental, micro, sistema, incremental=True)
+    print(f"Incremental: {os.path.getsize(incremental):,} bytes en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    inicio = time.perf_counter()
+    restaurado, sistema_restaurado = cargar_checkpoint(incremental)
+    print(f"Restauración de la cadena: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    iguales = (restaurado.registros == micro.registros
+               and sistema_restaurado.memoria_principal.datos == sistema.memoria_principal.datos)
+    print(f"Estado restaurado idéntico: {'sí' if iguales else 'no'}")
+
+    inicio = time.perf_counter()
+    bifurcar(micro, sistema)
+    print(f"Bifurcación en memoria: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    return 0 if iguales else 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Puntos de control del estado del simulador")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    info = subcomandos.add_parser('info', help="Describe un punto de control y su cadena")
+    info.add_argument('ruta')
+    demostracion = subcomandos.add_parser('demostracion', help="Guarda, restaura y bifurca una simulación")
+    demostracion.add_argument('--instrucciones', type=int, default=100_000)
+    demostracion.add_argument('--directorio', default=None,
+                              help="Dónde escribir los puntos de control (por defecto un directorio temporal nuevo)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.comando == 'info':
+            for enlace in informacion(args.ruta):
+                marcos = f", {enlace['marcos']} marcos" if enlace['marcos'] is not None else ''
+                print(f"{enlace['ruta']}: {enlace['tipo']} {enlace['identificador']}, "
+                      f"{enlace['bytes']:,} bytes{marcos}, ciclos {enlace['ciclos']}")
+            return 0
+        return _demostracion(args.instrucciones, args.directorio)
+    except (OSError, ErrorPuntoControl) as e:
+        print(f"Error con el punto de control: {e}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
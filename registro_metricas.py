@@ -0,0 +1,375 @@
+import os
+import mmap
+import struct
+import time
+
+# Formato del archivo de métricas (todo little-endian):
+#
+#   cabecera | segmento 0 | segmento 1 | ... | segmento parcial
+#
+# Cada segmento completo contiene `registros_por_segmento` registros de ancho
+# fijo seguidos de un bloque índice con el rango de marcas de tiempo del
+# segmento. Como todos los segmentos completos miden lo mismo, la posición de
+# cualquier registro o bloque índice se calcula sin recorrer el archivo. El
+# último segmento puede estar incompleto (grabación en curso o interrumpida) y
+# no lleva bloque índice; un registro truncado al final se ignora.
+
+MAGICO = b'SIMMET01'
+# 2: se agregaron memoria_total y swap_total. Los archivos de la versión 1 se
+# rechazan: la reproducción y la interfaz esperan esas columnas.
+VERSION = 2
+
+# Columnas de cada registro: (nombre, código struct)
+CAMPOS = (
+    ('marca_tiempo', 'd'),
+    ('cpu_total', 'f'),
+    ('memoria_total', 'Q'),
+    ('memoria_usada', 'Q'),
+    ('memoria_libre', 'Q'),
+    ('porcentaje_memoria', 'f'),
+    ('swap_total', 'Q'),
+    ('swap_usado', 'Q'),
+    ('porcentaje_swap', 'f'),
+    ('porcentaje_disco', 'f'),
+    ('bytes_enviados', 'Q'),
+    ('bytes_recibidos', 'Q'),
+    ('procesos_activos', 'I'),
+)
+
+_CABECERA = struct.Struct('<8sHHII')  # mágico, versión, tamaño registro, registros/segmento, nº campos
+_DESCRIPTOR_CAMPO = struct.Struct('<24sc')
+_BLOQUE_INDICE = struct.Struct('<4sIIdd')  # mágico, segmento, registros, t_inicio, t_fin
+_MAGICO_INDICE = b'IDXB'
+_MARCA = struct.Struct('<d')
+
+
+def _formato_registro(campos):
+    return struct.Struct('<' + ''.join(codigo for _, codigo in campos))
+
+
+class GrabadorMetricas:
+    """Agrega muestras de ancho fijo a un archivo de métricas con escrituras por lotes"""
+
+    def __init__(self, ruta, campos=CAMPOS, registros_por_segmento=1024, lote=64):
+        self.ruta = ruta
+        self.campos = tuple(campos)
+        self.formato = _formato_registro(self.campos)
+        self.registros_por_segmento = registros_por_segmento
+        self.lote = max(1, min(lote, registros_por_segmento))
+
+        self.buffer = bytearray()
+        self.pendientes = 0
+        self.registros_escritos = 0
+        self.segmento_actual = 0
+        self.en_segmento = 0
+        self.t_inicio_segmento = None
+        self.t_fin_segmento = None
+
+        existe = os.path.exists(ruta) and os.path.getsize(ruta) > 0
+        self.archivo = open(ruta, 'r+b' if existe else 'wb')
+        if existe:
+            try:
+                self._reanudar()
+            except Exception:
+                self.archivo.close()
+                raise
+        else:
+            self._escribir_cabecera()
+
+    def _escribir_cabecera(self):
+        """Escribe la cabecera autodescriptiva del archivo"""
+        self.archivo.write(_CABECERA.pack(MAGICO, VERSION, self.formato.size,
+                                          self.registros_por_segmento, len(self.campos)))
+        for nombre, codigo in self.campos:
+            self.archivo.write(_DESCRIPTOR_CAMPO.pack(nombre.encode('ascii'), codigo.encode('ascii')))
+        self.archivo.flush()
+
+    def _reanudar(self):
+        """Continúa un archivo existente descartando un registro final truncado"""
+        lector = LectorMetricas(self.ruta)
+        try:
+            if lector.formato.format != self.formato.format:
+                raise ValueError(f"El archivo {self.ruta} tiene columnas distintas")
+            self.registros_por_segmento = lector.registros_por_segmento
+            self.lote = min(self.lote, self.registros_por_segmento)
+            self.registros_escritos = len(lector)
+            self.segmento_actual, self.en_segmento = divmod(self.registros_escritos,
+                                                            self.registros_por_segmento)
+            if self.en_segmento:
+                self.t_inicio_segmento = lector.registro(self.segmento_actual * self.registros_por_segmento)[0]
+                self.t_fin_segmento = lector.registro(self.registros_escritos - 1)[0]
+            fin = lector.desplazamiento_registro(self.registros_escritos)
+        finally:
+            lector.cerrar()
+        self.archivo.truncate(fin)
+        self.archivo.seek(fin)
+
+    def agregar(self, muestra):
+        """Agrega una muestra (tupla en el orden de CAMPOS); escribe al completar un lote"""
+        marca = muestra[0]
+        self.buffer += self.formato.pack(*muestra)
+        self.pendientes += 1
+        self.en_segmento += 1
+        if self.t_inicio_segmento is None:
+            self.t_inicio_segmento = marca
+        self.t_fin_segmento = marca
+
+        if self.en_segmento == self.registros_por_segmento:
+            # El bloque índice cierra el segmento
+            self.buffer += _BLOQUE_INDICE.pack(_MAGICO_INDICE, self.segmento_actual,
+                                               self.en_segmento, self.t_inicio_segmento,
+                                               self.t_fin_segmento)
+            self.segmento_actual += 1
+            self.en_segmento = 0
+            self.t_inicio_segmento = None
+            self.volcar()
+        elif self.pendientes >= self.lote:
+            self.volcar()
+
+    def volcar(self):
+        """Escribe al disco las muestras pendientes"""
+        if self.buffer:
+            self.archivo.write(self.buffer)
+            self.archivo.flush()
+            self.registros_escritos += self.pendientes
+            self.buffer = bytearray()
+            self.pendientes = 0
+
+    def cerrar(self):
+        """Vuelca lo pendiente y cierra el archivo"""
+        if not self.archivo.closed:
+            self.volcar()
+            self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+class LectorMetricas:
+    """Lee un archivo de métricas mapeado en memoria con acceso aleatorio por posición o tiempo"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.archivo = open(ruta, 'rb')
+        self.mapa = None
+        try:
+            cabecera = self.archivo.read(_CABECERA.size)
+            if len(cabecera) < _CABECERA.size:
+                raise ValueError(f"{ruta} no es un archivo de métricas")
+            magico, version, tamano, por_segmento, num_campos = _CABECERA.unpack(cabecera)
+            if magico != MAGICO:
+                raise ValueError(f"{ruta} no es un archivo de métricas")
+            if version != VERSION:
+                raise ValueError(f"{ruta} es un archivo de métricas de la versión {version} "
+                                 f"y se necesita la {VERSION}: vuelva a grabarlo")
+            campos = []
+            for _ in range(num_campos):
+                nombre, codigo = _DESCRIPTOR_CAMPO.unpack(self.archivo.read(_DESCRIPTOR_CAMPO.size))
+                campos.append((nombre.rstrip(b'\0').decode('ascii'), codigo.decode('ascii')))
+        except Exception:
+            self.archivo.close()
+            raise
+
+        self.campos = tuple(campos)
+        self.nombres = [nombre for nombre, _ in self.campos]
+        self.formato = _formato_registro(self.campos)
+        if self.formato.size != tamano:
+            self.archivo.close()
+            raise ValueError(f"{ruta} tiene una cabecera inconsistente")
+        self.registros_por_segmento = por_segmento
+        self.inicio_datos = _CABECERA.size + num_campos * _DESCRIPTOR_CAMPO.size
+        self.tamano_segmento = por_segmento * tamano + _BLOQUE_INDICE.size
+        self.actualizar()
+
+    def actualizar(self):
+        """Vuelve a mapear el archivo y recalcula el número de registros (útil mientras otro proceso graba)"""
+        if self.mapa is not None:
+            self.mapa.close()
+        self.mapa = mmap.mmap(self.archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        datos = len(self.mapa) - self.inicio_datos
+        completos, resto = divmod(max(0, datos), self.tamano_segmento)
+        self.segmentos_completos = completos
+        self.total = (completos * self.registros_por_segmento +
+                      min(resto // self.formato.size, self.registros_por_segmento))
+        return self.total
+
+    def __len__(self):
+        return self.total
+
+    def desplazamiento_registro(self, indice):
+        """Posición en bytes del registro `indice`"""
+        segmento, posicion = divmod(indice, self.registros_por_segmento)
+        return (self.inicio_datos + segmento * self.tamano_segmento +
+                posicion * self.formato.size)
+
+    def registro(self, indice):
+        """Retorna el registro `indice` como tupla"""
+        if not 0 <= indice < self.total:
+            raise IndexError(indice)
+        return self.formato.unpack_from(self.mapa, self.desplazamiento_registro(indice))
+
+    def marca_tiempo(self, indice):
+        """Retorna solo la marca de tiempo del registro `indice`"""
+        return _MARCA.unpack_from(self.mapa, self.desplazamiento_registro(indice))[0]
+
+    def bloque_indice(self, segmento):
+        """Retorna (registros, t_inicio, t_fin) del bloque índice de un segmento completo"""
+        desplazamiento = (self.inicio_datos + segmento * self.tamano_segmento +
+                          self.registros_por_segmento * self.formato.size)
+        magico, _, registros, t_inicio, t_fin = _BLOQUE_INDICE.unpack_from(self.mapa, desplazamiento)
+        if magico != _MAGICO_INDICE:
+            raise ValueError(f"Bloque índice dañado en el segmento {segmento}")
+        return registros, t_inicio, t_fin
+
+    def buscar(self, marca_tiempo, derecha=False):
+        """Posición donde insertar `marca_tiempo` (como bisect_left/bisect_right)"""
+        if self.nombres[0] != 'marca_tiempo':
+            raise ValueError("La primera columna debe ser marca_tiempo")
+
+        # Primero se descartan segmentos completos usando solo sus bloques índice
+        bajo, alto = 0, self.segmentos_completos
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            t_fin = self.bloque_indice(medio)[2]
+            if t_fin < marca_tiempo or (derecha and t_fin == marca_tiempo):
+                bajo = medio + 1
+            else:
+                alto = medio
+
+        # Después se bisecta dentro del segmento elegido
+        bajo = bajo * self.registros_por_segmento
+        alto = min(bajo + self.registros_por_segmento, self.total)
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            t = self.marca_tiempo(medio)
+            if t < marca_tiempo or (derecha and t == marca_tiempo):
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+
+    def __iter__(self):
+        """Recorre todos los registros segmento a segmento"""
+        restantes = self.total
+        desplazamiento = self.inicio_datos
+        tamano = self.formato.size
+        while restantes > 0:
+            n = min(restantes, self.registros_por_segmento)
+            yield from self.formato.iter_unpack(self.mapa[desplazamiento:desplazamiento + n * tamano])
+            restantes -= n
+            desplazamiento += self.tamano_segmento
+
+    def columnas(self):
+        """Retorna los registros como arreglo estructurado de NumPy para análisis fuera de línea"""
+        import numpy as np
+
+        tipo = np.dtype([(nombre, '<' + codigo) for nombre, codigo in self.campos])
+        partes = []
+        restantes = self.total
+        desplazamiento = self.inicio_datos
+        while restantes > 0:
+            n = min(restantes, self.registros_por_segmento)
+            partes.append(np.frombuffer(self.mapa, dtype=tipo, count=n, offset=desplazamiento))
+            restantes -= n
+            desplazamiento += self.tamano_segmento
+        # concatenate copia los datos, así que el arreglo no depende del mapa
+        return np.concatenate(partes) if partes else np.empty(0, dtype=tipo)
+
+    def cerrar(self):
+        if self.mapa is not None:
+            self.mapa.close()
+            self.mapa = None
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+class ReproductorMetricas:
+    """Reproduce un archivo de métricas a velocidad real, acelerada o registro a registro"""
+
+    def __init__(self, lector, velocidad=1.0, inicio=None):
+        self.lector = lector
+        self.velocidad = velocidad  # 0 o None: avanza un registro por llamada
+        self.posicion = 0
+        self._ancla = None  # (instante real, marca grabada) del último salto
+        self.terminado = False
+        if inicio is not None:
+            self.saltar(inicio)
+
+    def saltar(self, marca_tiempo):
+        """Coloca la reproducción en el primer registro con marca >= marca_tiempo"""
+        self.posicion = min(self.lector.buscar(marca_tiempo), max(0, len(self.lector) - 1))
+        self._ancla = None
+        self.terminado = False
+
+    def cambiar_velocidad(self, velocidad):
+        """Cambia la velocidad conservando la posición actual"""
+        self.velocidad = velocidad
+        self._ancla = None
+
+    def muestra_actual(self):
+        """Retorna la muestra correspondiente al instante actual de reproducción como dict"""
+        total = len(self.lector)
+        if total == 0:
+            return {}
+
+        if self.velocidad:
+            ahora = time.monotonic()
+            if self._ancla is None:
+                self._ancla = (ahora, self.lector.marca_tiempo(self.posicion))
+            objetivo = self._ancla[1] + (ahora - self._ancla[0]) * self.velocidad
+            # Último registro con marca <= objetivo
+            self.posicion = max(self.posicion, self.lector.buscar(objetivo, derecha=True) - 1)
+        elif self._ancla is None:
+            self._ancla = (None, None)
+        else:
+            self.posicion += 1
+
+        if self.posicion >= total - 1:
+            self.posicion = total - 1
+            self.terminado = True
+        return dict(zip(self.lector.nombres, self.lector.registro(self.posicion)))
+
+    def progreso(self):
+        """Fracción reproducida del archivo (0 a 1)"""
+        total = len(self.lector)
+        return (self.posicion + 1) / total if total else 1.0
+
+
+def grabar_sin_interfaz(ruta, intervalo=1.0, duracion=None, muestras=None,
+                        lote=64, registros_por_segmento=1024):
+    """Muestrea el sistema cada `intervalo` segundos y lo graba en `ruta` sin interfaz gráfica"""
+    from utils import obtener_muestra_compacta
+
+    grabadas = 0
+    inicio = time.monotonic()
+    siguiente = inicio
+    with GrabadorMetricas(ruta, registros_por_segmento=registros_por_segmento, lote=lote) as grabador:
+        try:
+            while True:
+                muestra = obtener_muestra_compacta()
+                if muestra:
+                    grabador.agregar(muestra)
+                    grabadas += 1
+
+                if muestras is not None and grabadas >= muestras:
+                    break
+                siguiente += intervalo
+                if duracion is not None and siguiente - inicio > duracion:
+                    break
+                # Dormir hasta el siguiente instante programado para no acumular deriva
+                espera = siguiente - time.monotonic()
+                if espera > 0:
+                    time.sleep(espera)
+                else:
+                    siguiente = time.monotonic()
+        except KeyboardInterrupt:
+            pass
+    return grabadas
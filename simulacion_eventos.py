@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Núcleo de simulación por eventos discretos para CPU, memoria y E/S.
+
+El reloj es simulado (en ciclos) y avanza saltando de un evento al
+siguiente de una cola heap, así que los periodos ociosos (todos los
+procesos esperando al disco, por ejemplo) cuestan O(1) sin importar su
+duración.
+
+Eventos del sistema:
+    llegada      un proceso entra a la cola de listos
+    ráfaga       la CPU ejecuta instrucciones; cada una cuesta su latencia de
+                 búsqueda (L1, L2 o memoria) más la de ejecución y la de su
+                 acceso a datos. Las instrucciones consecutivas se ejecutan
+                 en el mismo evento mientras no haya otro evento pendiente
+                 antes de que terminen
+    fin_rafaga   fallo de página, E/S, fin de quantum o fin del proceso
+    tick         interrupción periódica del planificador
+    fin_disco    termina el servicio de un fallo de página (swap) o de una E/S
+
+Uso:
+    python simulacion_eventos.py --procesos 200 --es-cada 50 --duracion-es 200000 --semilla 1
+"""
+
+import argparse
+import heapq
+import random
+import sys
+import time
+from collections import deque
+from microprocesador import Microprocesador, TOPE_PILA
+from memoria import SistemaMemoria, Proceso
+from planificador_cpu import EntradaPlanificador, crear_politica, POLITICAS
+from utils import CONFIGURACION_POR_DEFECTO
+
+# Latencias en ciclos
+LATENCIAS_POR_DEFECTO = {
+    'ejecucion': 1,
+    'cache_l1': 1,
+    'cache_l2': 10,
+    'memoria': 100,
+    'fallo_pagina': 2_000_000,  # servicio de swap
+    'cambio_contexto': 50,
+    'tick': 10_000,
+}
+
+class NucleoEventos:
+    """Cola de eventos con reloj simulado"""
+
+    def __init__(self):
+        self.ahora = 0
+        self.cola = []
+        self.secuencia = 0
+        self.procesados = 0
+
+    def programar_en(self, tiempo, funcion, *argumentos):
+        """Programa funcion(*argumentos) en el instante `tiempo`; retorna el evento (cancelable)"""
+        evento = [funcion, argumentos]
+        self.secuencia += 1
+        heapq.heappush(self.cola, (tiempo, self.secuencia, evento))
+        return evento
+
+    def programar(self, retardo, funcion, *argumentos):
+        """Programa funcion(*argumentos) dentro de `retardo` ciclos"""
+        return self.programar_en(self.ahora + retardo, funcion, *argumentos)
+
+    def cancelar(self, evento):
+        """Anula un evento programado (se descarta al llegar a él)"""
+        evento[0] = None
+
+    def proximo(self):
+        """Instante del siguiente evento vigente, o None si no hay"""
+        cola = self.cola
+        while cola and cola[0][2][0] is None:
+            heapq.heappop(cola)
+        return cola[0][0] if cola else None
+
+    def ejecutar(self, hasta=None):
+        """Procesa eventos en orden hasta vaciar la cola o pasar de `hasta`"""
+        cola = self.cola
+        while cola:
+            tiempo, _, evento = cola[0]
+            if hasta is not None and tiempo > hasta:
+                break
+            heapq.heappop(cola)
+            funcion, argumentos = evento
+            if funcion is None:
+                continue
+            self.ahora = tiempo
+            self.procesados += 1
+            funcion(*argumentos)
+        if hasta is not None:
+            self.ahora = max(self.ahora, hasta)
+
+class EntradaEventos(EntradaPlanificador):
+    """Estado de un proceso en la simulación por eventos"""
+
+    __slots__ = ('referencias', 'es_cada', 'duracion_es', 'uso_cuanto', 'ciclos_cpu', 'esperas_disco')
+
+    def __init__(self, proceso, llegada=0, prioridad=0, orden=0, referencias=None, es_cada=0, duracion_es=0):
+        super().__init__(proceso, llegada, prioridad, orden)
+        self.referencias = referencias
+        self.es_cada = es_cada
+        self.duracion_es = duracion_es
+        self.uso_cuanto = 0
+        self.ciclos_cpu = 0
+        self.esperas_disco = 0
+
+class SimuladorEventos:
+    """Sistema completo (CPU, caches, memoria, disco y planificador) dirigido por eventos
+
+    Usa las políticas de planificador_cpu; sus quantums se interpretan en ciclos.
+    """
+
+    def __init__(self, micro, sistema_memoria=None, politica=None, latencias=None,
+                 cuanto=20_000, paginas_iniciales=None, limite_por_proceso=1_000_000):
+        self.micro = micro
+        self.sistema_memoria = sistema_memoria
+        if sistema_memoria is not None:
+            micro.conectar_memoria(sistema_memoria)
+        self.politica = politica if politica is not None else crear_politica('rr', cuanto=cuanto)
+        self.latencias = dict(LATENCIAS_POR_DEFECTO, **(latencias or {}))
+        self.cuanto = cuanto
+        self.paginas_iniciales = paginas_iniciales
+        self.limite_por_proceso = limite_por_proceso
+
+        self.nucleo = NucleoEventos()
+        self.entradas = []
+        self.en_cpu = None
+        self.ultimo_en_cpu = None
+        self.cola_disco = deque()
+        self.disco_ocupado = False
+        self.tick_programado = False
+
+        self.estadisticas = {
+            'ciclos_cpu': 0, 'ciclos_cambio_contexto': 0, 'ciclos_disco': 0,
+            'cambios_contexto': 0, 'fallos_pagina': 0, 'operaciones_es': 0, 'ticks': 0,
+            'impactos_l1': 0, 'impactos_l2': 0, 'accesos_memoria': 0,
+        }
+
+    def agregar(self, proceso, llegada=0, prioridad=0, referencias=None, es_cada=0, duracion_es=0):
+        """Registra un proceso; `referencias[i]` es la dirección de datos de la instrucción i (o None)"""
+        entrada = EntradaEventos(proceso, llegada, prioridad, len(self.entradas),
+                                 referencias, es_cada, duracion_es)
+        self.entradas.append(entrada)
+        self.nucleo.programar_en(llegada, self._llegada, entrada)
+        return entrada
+
+    # --- manejadores ------------------------------------------------------------
+
+    def _llegada(self, entrada):
+        proceso = entrada.proceso
+        proceso.estado = "LISTO"
+        if self.sistema_memoria is not None:
+            if self.paginas_iniciales is None:
+                tamano = len(proceso.instrucciones) * 4
+            else:
+                tamano = self.paginas_iniciales * self.sistema_memoria.paginacion.tamano_pagina
+            self.sistema_memoria.asignar_memoria(proceso, tamano)
+        self.politica.agregar(entrada)
+        self._listo()
+
+    def _listo(self):
+        """Hay un proceso nuevo en la cola de listos"""
+        if not self.tick_programado:
+            self.tick_programado = True
+            self.nucleo.programar(self.latencias['tick'], self._tick)
+        if self.en_cpu is None:
+            self._despachar()
+
+    def _despachar(self):
+        entrada = self.politica.siguiente()
+        if entrada is None:
+            return
+        self.en_cpu = entrada
+        entrada.proceso.estado = "EJECUTANDO"
+        entrada.uso_cuanto = 0
+        retardo = 0
+        if entrada is not self.ultimo_en_cpu:
+            self._cambiar_contexto(entrada)
+            retardo = self.latencias['cambio_contexto']
+            self.estadisticas['cambios_contexto'] += 1
+            self.estadisticas['ciclos_cambio_contexto'] += retardo
+        self.nucleo.programar(retardo, self._rafaga, entrada)
+
+    def _cambiar_contexto(self, entrada):
+        micro = self.micro
+        anterior = self.ultimo_en_cpu
+        if anterior is not None and not anterior.terminado:
+            anterior.registros = dict(micro.registros)
+        micro.programa_actual = entrada.proceso
+        # Las caches se indexan por dirección virtual sin identificador de proceso
+        micro.cache_l1.datos.clear()
+        micro.cache_l2.datos.clear()
+        if entrada.registros is None:
+            for registro in micro.registros:
+                micro.registros[registro] = 0
+            micro.registros['PC'] = entrada.proceso.direccion_inicio
+            micro.registros['SP'] = TOPE_PILA
+        else:
+            micro.registros.update(entrada.registros)
+        self.ultimo_en_cpu = entrada
+
+    def _rafaga(self, entrada):
+        """Ejecuta instrucciones hasta el próximo evento, un bloqueo o el fin del quantum"""
+        nucleo = self.nucleo
+        latencias = self.latencias
+        micro = self.micro
+        registros = micro.registros
+        instrucciones = entrada.proceso.instrucciones
+        total = len(instrucciones)
+        referencias = entrada.referencias
+        sistema = self.sistema_memoria
+        l1, l2 = micro.cache_l1, micro.cache_l2
+        lat_l1, lat_l2, lat_memoria = latencias['cache_l1'], latencias['cache_l2'], latencias['memoria']
+        lat_ejecucion = latencias['ejecucion']
+        buscar = micro.buscar_instruccion if sistema is not None else instrucciones.__getitem__
+        acceder = sistema.acceder_memoria if sistema is not None else None
+        proceso_id = entrada.proceso.id
+
+        proximo = nucleo.proximo()
+        horizonte = (proximo - nucleo.ahora) if proximo is not None else float('inf')
+        horizonte = min(horizonte, self.cuanto_de(entrada) - entrada.uso_cuanto)
+        consumido = 0
+        motivo = 'continuar'
+
+        while consumido < horizonte:
+            pc = registros['PC']
+            if not 0 <= pc < total or entrada.ejecutadas >= self.limite_por_proceso:
+                motivo = 'terminado'
+                break
+
+            # Búsqueda: la latencia depende del nivel que responde
+            impactos_l1, impactos_l2 = l1.impactos, l2.impactos
+            instruccion = buscar(pc)
+            if l1.impactos != impactos_l1:
+                costo = lat_l1
+            elif l2.impactos != impactos_l2:
+                costo = lat_l1 + lat_l2
+            else:
+                costo = lat_l1 + lat_l2 + (lat_memoria if sistema is not None else 0)
+
+            micro.ejecutar_instruccion(instruccion)
+            costo += lat_ejecucion
+            entrada.ejecutadas += 1
+
+            # Acceso a datos de la instrucción (si la carga los tiene)
+            if referencias is not None and pc < len(referencias) and acceder is not None:
+                direccion = referencias[pc]
+                if direccion is not None:
+                    costo += lat_memoria
+                    self.estadisticas['accesos_memoria'] += 1
+                    if not acceder(direccion, proceso_id, 'escritura' if instruccion >> 24 == 0x01 else 'lectura'):
+                        consumido += costo
+                        motivo = 'fallo'
+                        break
+            consumido += costo
+
+            if entrada.es_cada and entrada.ejecutadas % entrada.es_cada == 0:
+                motivo = 'es'
+                break
+        else:
+            if consumido >= self.cuanto_de(entrada) - entrada.uso_cuanto:
+                motivo = 'cuanto'
+
+        entrada.uso_cuanto += consumido
+        entrada.ciclos_cpu += consumido
+        self.estadisticas['ciclos_cpu'] += consumido
+        nucleo.programar(consumido, self._fin_rafaga, entrada, motivo)
+
+    def cuanto_de(self, entrada):
+        cuanto = self.politica.cuanto(entrada)
+        return cuanto if cuanto is not None else float('inf')
+
+    def _fin_rafaga(self, entrada, motivo):
+        proceso = entrada.proceso
+        proceso.contador_programa = entrada.ejecutadas
+        if motivo == 'continuar':
+            if self.politica.expropiativa and len(self.politica):
+                # Puede haber llegado alguien con más derecho a la CPU
+                self._liberar_cpu()
+                self.politica.devolver(entrada, False)
+                self._despachar()
+            else:
+                self._rafaga(entrada)
+            return
+
+        self._liberar_cpu()
+        if motivo == 'terminado':
+            entrada.terminado = True
+            entrada.fin = self.nucleo.ahora
+            proceso.estado = "TERMINADO"
+            entrada.registros = None
+            if self.sistema_memoria is not None:
+                self.sistema_memoria.liberar_memoria(proceso.id)
+        elif motivo == 'cuanto':
+            proceso.estado = "LISTO"
+            self.politica.devolver(entrada, True)
+        else:
+            proceso.estado = "BLOQUEADO"
+            if motivo == 'fallo':
+                self.estadisticas['fallos_pagina'] += 1
+                duracion = self.latencias['fallo_pagina']
+            else:
+                self.estadisticas['operaciones_es'] += 1
+                duracion = entrada.duracion_es
+            self.cola_disco.append((entrada, duracion))
+            if not self.disco_ocupado:
+                self._servir_disco()
+        self._despachar()
+
+    def _liberar_cpu(self):
+        entrada = self.en_cpu
+        if entrada is not None and entrada.primera_ejecucion is None:
+            entrada.primera_ejecucion = self.nucleo.ahora
+        self.en_cpu = None
+
+    def _servir_disco(self):
+        entrada, duracion = self.cola_disco.popleft()
+        self.disco_ocupado = True
+        self.estadisticas['ciclos_disco'] += duracion
+        self.nucleo.programar(duracion, self._fin_disco, entrada)
+
+    def _fin_disco(self, entrada):
+        self.disco_ocupado = False
+        if self.cola_disco:
+            self._servir_disco()
+        entrada.esperas_disco += 1
+        entrada.proceso.estado = "LISTO"
+        self.politica.devolver(entrada, False)
+        self._listo()
+
+    def _tick(self):
+        self.estadisticas['ticks'] += 1
+        impulsar = getattr(self.politica, 'impulsar', None)
+        if impulsar:
+            impulsar(self.nucleo.ahora)
+        # Sin nada que planificar no se programan más ticks: el reloj salta al siguiente evento
+        if self.en_cpu is not None or len(self.politica):
+            self.nucleo.programar(self.latencias['tick'], self._tick)
+        else:
+            self.tick_programado = False
+
+    # --- ejecución ---------------------------------------------------------------
+
+    def ejecutar(self, hasta=None):
+        """Procesa eventos hasta que todos los procesos terminen (o hasta el ciclo `hasta`)"""
+        inicio = time.perf_counter()
+        self.micro.estado = "EJECUTANDO"
+        self.nucleo.ejecutar(hasta)
+        self.micro.estado = "DETENIDO"
+        informe = self.informe()
+        informe['tiempo_real_s'] = time.perf_counter() - inicio
+        return informe
+
+    def informe(self):
+        """Tiempos de los procesos y uso de CPU y disco"""
+        terminadas = [e for e in self.entradas if e.terminado]
+        cantidad = len(terminadas)
+        reloj = self.nucleo.ahora
+        estadisticas = self.estadisticas
+        retorno = sum(e.fin - e.llegada for e in terminadas)
+        return {
+            'politica': type(self.politica).__name__,
+            'procesos': len(self.entradas),
+            'terminados': cantidad,
+            'ciclos_simulados': reloj,
+            'eventos': self.nucleo.procesados,
+            'ciclos_por_evento': reloj / self.nucleo.procesados if self.nucleo.procesados else 0,
+            'utilizacion_cpu': estadisticas['ciclos_cpu'] / reloj * 100 if reloj else 0,
+            'utilizacion_disco': estadisticas['ciclos_disco'] / reloj * 100 if reloj else 0,
+            'retorno_promedio': retorno / cantidad if cantidad else 0,
+            'espera_promedio': sum(e.fin - e.llegada - e.ciclos_cpu for e in terminadas) / cantidad if cantidad else 0,
+            **estadisticas,
+        }
+
+def generar_carga(cantidad, semilla=None, instrucciones_media=200, llegada_media=5000,
+                  es_cada=0, duracion_es=0, fraccion_datos=0.0, paginas_datos=64, tamano_pagina=4096):
+    """Procesos sin saltos con llegadas de Poisson; retorna [(proceso, llegada, referencias)]"""
+    aleatorio = random.Random(semilla)
+    repertorio = [(aleatorio.randint(1, 3) << 24) | (aleatorio.randint(1, 2) << 16)
+                  | (aleatorio.randint(0, 255) << 8) for _ in range(1024)]
+    carga = []
+    llegada = 0
+    for i in range(1, cantidad + 1):
+        longitud = max(1, int(aleatorio.expovariate(1 / instrucciones_media)))
+        instrucciones = aleatorio.choices(repertorio, k=longitud)
+        referencias = None
+        if fraccion_datos:
+            referencias = [aleatorio.randrange(paginas_datos * tamano_pagina)
+                           if aleatorio.random() < fraccion_datos else None for _ in range(longitud)]
+        carga.append((Proceso(i, f"proceso{i}", max(1, longitud * 4 // 1024), instrucciones), llegada, referencias))
+        llegada += int(aleatorio.expovariate(1 / llegada_media))
+    return carga
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulación por eventos discretos de CPU, memoria y E/S")
+    parser.add_argument('--procesos', type=int, default=200)
+    parser.add_argument('--politica', choices=sorted(POLITICAS), default='rr')
+    parser.add_argument('--cuanto', type=int, default=20_000, help="Quantum en ciclos")
+    parser.add_argument('--instrucciones-media', type=float, default=200)
+    parser.add_argument('--llegada-media', type=float, default=5000, help="Ciclos medios entre llegadas")
+    parser.add_argument('--es-cada', type=int, default=0, help="Instrucciones entre operaciones de E/S")
+    parser.add_argument('--duracion-es', type=int, default=200_000, help="Ciclos de cada E/S")
+    parser.add_argument('--fraccion-datos', type=float, default=0.0,
+                        help="Fracción de instrucciones con acceso a datos (puede causar fallos de página)")
+    parser.add_argument('--paginas-iniciales', type=int, default=None,
+                        help="Páginas asignadas a cada proceso (por defecto las de su código)")
+    parser.add_argument('--sin-memoria', action='store_true', help="No pasar por caches ni sistema de memoria")
+    parser.add_argument('--semilla', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = dict(CONFIGURACION_POR_DEFECTO)
+    micro = Microprocesador(config['tamano_cache_l1'], config['tamano_cache_l2'])
+    sistema = None if args.sin_memoria else SistemaMemoria(config)
+    opciones = {'rr': {'cuanto': args.cuanto},
+                'mlfq': {'cuantos': (args.cuanto, 2 * args.cuanto, 4 * args.cuanto),
+                         'periodo_impulso': 50 * args.cuanto}}
+    politica = crear_politica(args.politica, **opciones.get(args.politica, {}))
+    simulador = SimuladorEventos(micro, sistema, politica, cuanto=args.cuanto,
+                                 paginas_iniciales=args.paginas_iniciales)
+
+    for proceso, llegada, referencias in generar_carga(
+            args.procesos, args.semilla, args.instrucciones_media, args.llegada_media,
+            fraccion_datos=args.fraccion_datos):
+        simulador.agregar(proceso, llegada, referencias=referencias,
+                          es_cada=args.es_cada, duracion_es=args.duracion_es if args.es_cada else 0)
+
+    informe = simulador.ejecutar()
+    print(f"=== {informe['politica']} ===")
+    print(f"Procesos terminados: {informe['terminados']} de {informe['procesos']}")
+    print(f"Ciclos simulados: {informe['ciclos_simulados']:,} con {informe['eventos']:,} eventos "
+          f"({informe['ciclos_por_evento']:.0f} ciclos por evento)")
+    print(f"Utilización: CPU {informe['utilizacion_cpu']:.1f}%, disco {informe['utilizacion_disco']:.1f}%")
+    print(f"Fallos de página: {informe['fallos_pagina']}, E/S: {informe['operaciones_es']}, "
+          f"cambios de contexto: {informe['cambios_contexto']}, ticks: {informe['ticks']}")
+    print(f"Retorno medio: {informe['retorno_promedio']:,.0f}  Espera media: {informe['espera_promedio']:,.0f} ciclos")
+    print(f"Tiempo real: {informe['tiempo_real_s']:.2f} s "
+          f"({informe['ciclos_simulados'] / max(informe['tiempo_real_s'], 1e-9):,.0f} ciclos simulados/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
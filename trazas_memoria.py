@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Generador de cadenas de referencias a memoria para experimentos de paginación.
+
+Cada referencia es (dirección virtual, proceso_id, escritura). Los procesos se
+turnan en ráfagas de `quantum` referencias y cada uno sigue el modelo de
+localidad elegido dentro de su propio espacio de direcciones:
+
+    conjunto_trabajo  referencias a un conjunto de W páginas que se desplaza
+                      una página cada 1/deriva referencias
+    cambio_fase       conjuntos de W páginas disjuntos que cambian por completo
+                      cada `duracion_fase` referencias
+    secuencial        recorrido lineal con paso fijo que da la vuelta al espacio
+    zipf              páginas con popularidad Zipf (orden distinto por proceso)
+    bucle             recorrido lineal que se repite sobre `tamano_bucle` páginas
+
+Las trazas se generan con NumPy, completas o por bloques, y son
+reproducibles con la misma semilla y tamaño de bloque.
+
+Uso:
+    python trazas_memoria.py --modelo zipf --procesos 4 --referencias 1000000 --reproducir
+    python trazas_memoria.py --modelo cambio_fase --salida traza.npz
+"""
+
+import argparse
+import sys
+import time
+import numpy as np
+from generador_cargas import BITS_TABLA_ZIPF, _tabla_cuantiles, _pesos_zipf
+
+MODELOS = ('conjunto_trabajo', 'cambio_fase', 'secuencial', 'zipf', 'bucle')
+
+TAMANO_BLOQUE = 1 << 20
+
+def _mezclar(valores):
+    """Hash de enteros uint64 (splitmix64) para derivar páginas sin guardar tablas"""
+    with np.errstate(over='ignore'):
+        x = valores + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+class GeneradorTrazas:
+    """Genera referencias a memoria por bloques con un modelo de localidad"""
+
+    def __init__(self, procesos=1, modelo='conjunto_trabajo', paginas_proceso=256, tamano_pagina=4096,
+                 quantum=64, fraccion_escrituras=0.3, semilla=None, tamano_conjunto=16, deriva=0.001,
+                 duracion_fase=10000, exponente_zipf=1.0, tamano_bucle=32, paso=4):
+        if modelo not in MODELOS:
+            raise ValueError(f"Modelo desconocido: {modelo}")
+        self.procesos = np.arange(1, procesos + 1) if isinstance(procesos, int) else np.asarray(list(procesos))
+        if not len(self.procesos):
+            raise ValueError("Se necesita al menos un proceso")
+        self.procesos = self.procesos.astype(np.uint32)
+
+        self.modelo = modelo
+        self.paginas_proceso = paginas_proceso
+        self.tamano_pagina = tamano_pagina
+        self.espacio = paginas_proceso * tamano_pagina
+        self.quantum = quantum
+        self.fraccion_escrituras = fraccion_escrituras
+        self.tamano_conjunto = min(tamano_conjunto, paginas_proceso)
+        self.deriva = deriva
+        self.duracion_fase = duracion_fase
+        self.tamano_bucle = min(tamano_bucle, paginas_proceso)
+        self.paso = paso
+
+        self.rng = np.random.default_rng(semilla)
+        self.sal = np.uint64(self.rng.integers(0, 1 << 63))
+        if modelo == 'zipf':
+            self.tabla_zipf = _tabla_cuantiles(_pesos_zipf(paginas_proceso, exponente_zipf))
+            self.orden_paginas = np.argsort(self.rng.random((len(self.procesos), paginas_proceso)), axis=1)
+        self.posicion = 0
+
+    def _pagina_hash(self, indice_proceso, clave):
+        """Página pseudoaleatoria fija para (proceso, clave)"""
+        mezcla = _mezclar((indice_proceso.astype(np.uint64) << np.uint64(40)) ^ clave.astype(np.uint64) ^ self.sal)
+        return mezcla % np.uint64(self.paginas_proceso)
+
+    def _desplazamientos(self, tamano):
+        return self.rng.integers(0, self.tamano_pagina // 4, tamano, dtype=np.uint64) * np.uint64(4)
+
+    def bloque(self, tamano):
+        """Siguientes `tamano` referencias: (direcciones uint32, proceso_ids uint32, escrituras bool)"""
+        global_ = np.arange(self.posicion, self.posicion + tamano, dtype=np.int64)
+        self.posicion += tamano
+
+        # Turno circular por ráfagas y posición de cada referencia dentro de su proceso
+        rafaga = global_ // self.quantum
+        indice_proceso = rafaga % len(self.procesos)
+        local = (rafaga // len(self.procesos)) * self.quantum + global_ % self.quantum
+
+        if self.modelo == 'secuencial':
+            direcciones = (local * self.paso) % self.espacio
+        elif self.modelo == 'bucle':
+            direcciones = (local * self.paso) % (self.tamano_bucle * self.tamano_pagina)
+        else:
+            if self.modelo == 'zipf':
+                rango = self.tabla_zipf[self.rng.integers(0, 1 << BITS_TABLA_ZIPF, tamano)]
+                pagina = self.orden_paginas[indice_proceso, rango].astype(np.uint64)
+            else:
+                ranura = self.rng.integers(0, self.tamano_conjunto, tamano)
+                if self.modelo == 'conjunto_trabajo':
+                    # Ventana deslizante sobre una secuencia de páginas fija por proceso
+                    clave = (local * self.deriva).astype(np.int64) + ranura
+                else:
+                    fase = local // self.duracion_fase
+                    clave = (fase << 20) + ranura
+                pagina = self._pagina_hash(indice_proceso, clave)
+            direcciones = pagina * np.uint64(self.tamano_pagina) + self._desplazamientos(tamano)
+
+        escrituras = self.rng.random(tamano) < self.fraccion_escrituras
+        return direcciones.astype(np.uint32), self.procesos[indice_proceso], escrituras
+
+    def bloques(self, cantidad, tamano_bloque=TAMANO_BLOQUE):
+        """Itera la traza de `cantidad` referencias en bloques"""
+        for inicio in range(0, cantidad, tamano_bloque):
+            yield self.bloque(min(tamano_bloque, cantidad - inicio))
+
+    def generar(self, cantidad):
+        """Traza completa de `cantidad` referencias"""
+        return self.bloque(cantidad)
+
+def generar_traza(cantidad, **opciones):
+    """Atajo: traza de `cantidad` referencias con un generador nuevo"""
+    return GeneradorTrazas(**opciones).generar(cantidad)
+
+def reproducir(sistema_memoria, bloques, paginas_iniciales=0):
+    """Envía las referencias a sistema_memoria.acceder_memoria; retorna accesos y fallos producidos
+
+    `bloques` es un iterable de trazas (direcciones, proceso_ids, escrituras).
+    Con paginas_iniciales > 0 cada proceso nuevo recibe esa cantidad de páginas
+    antes de su primera referencia.
+    """
+    from memoria import Proceso
+
+    fallos_inicio = sistema_memoria.estadisticas['fallos_pagina']
+    accesos = 0
+    tamano_pagina = sistema_memoria.paginacion.tamano_pagina
+    conocidos = set()
+    acceder = sistema_memoria.acceder_memoria
+
+    for direcciones, proceso_ids, escrituras in bloques:
+        if paginas_iniciales:
+            for proceso_id in np.unique(proceso_ids).tolist():
+                if proceso_id not in conocidos:
+                    conocidos.add(proceso_id)
+                    sistema_memoria.asignar_memoria(Proceso(proceso_id, f"traza{proceso_id}", 0),
+                                                    paginas_iniciales * tamano_pagina)
+        for direccion, proceso_id, escritura in zip(direcciones.tolist(), proceso_ids.tolist(),
+                                                     escrituras.tolist()):
+            acceder(direccion, proceso_id, 'escritura' if escritura else 'lectura')
+        accesos += len(direcciones)
+
+    fallos = sistema_memoria.estadisticas['fallos_pagina'] - fallos_inicio
+    return {'accesos': accesos, 'fallos_pagina': fallos,
+            'tasa_fallos_pagina': fallos / accesos * 100 if accesos else 0}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera trazas de referencias a memoria")
+    parser.add_argument('--modelo', choices=MODELOS, default='conjunto_trabajo')
+    parser.add_argument('--procesos', type=int, default=1)
+    parser.add_argument('--referencias', type=int, default=1_000_000)
+    parser.add_argument('--paginas-proceso', type=int, default=256)
+    parser.add_argument('--quantum', type=int, default=64)
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--salida', default=None, metavar='RUTA.npz',
+                        help="Guarda la traza completa en un archivo .npz")
+    parser.add_argument('--reproducir', action='store_true',
+                        help="Reproduce la traza en un SistemaMemoria con la configuración por defecto")
+    parser.add_argument('--paginas-iniciales', type=int, default=8,
+                        help="Páginas asignadas a cada proceso al reproducir")
+    args = parser.parse_args(argv)
+
+    generador = GeneradorTrazas(args.procesos, args.modelo, paginas_proceso=args.paginas_proceso,
+                                quantum=args.quantum, semilla=args.semilla)
+    inicio = time.perf_counter()
+    if args.salida:
+        direcciones, proceso_ids, escrituras = generador.generar(args.referencias)
+        np.savez(args.salida, direcciones=direcciones, proceso_ids=proceso_ids, escrituras=escrituras)
+        print(f"{args.referencias} referencias -> {args.salida} en {time.perf_counter() - inicio:.2f} s")
+    if args.reproducir:
+        from memoria import SistemaMemoria
+        from utils import CONFIGURACION_POR_DEFECTO
+
+        sistema = SistemaMemoria(dict(CONFIGURACION_POR_DEFECTO))
+        generador = GeneradorTrazas(args.procesos, args.modelo, paginas_proceso=args.paginas_proceso,
+                                    quantum=args.quantum, semilla=args.semilla)
+        resultado = reproducir(sistema, generador.bloques(args.referencias), args.paginas_iniciales)
+        print(f"{resultado['accesos']} accesos, {resultado['fallos_pagina']} fallos de página "
+              f"({resultado['tasa_fallos_pagina']:.2f}%) en {time.perf_counter() - inicio:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,22 @@
 import random
 import time
-import psutil
+
+# Configuración del sistema usada por la interfaz y el modo por lotes
+CONFIGURACION_POR_DEFECTO = {
+    'tamano_memoria_principal': 1024,  # KB
+    'tamano_cache_l1': 64,  # KB
+    'tamano_cache_l2': 256,  # KB
+    'tamano_pagina': 4,  # KB
+    'tamano_pagina_grande': 2048,  # KB
+    'paginas_grandes': 'nunca',  # 'nunca', 'promocion' o 'al_fallo'
+    'algoritmo_reemplazo': 'LRU'
+}
 
 def obtener_estadisticas_reales():
     """Obtiene estadísticas reales del sistema"""
     try:
+        import psutil
+
         # CPU
         cpu_total = psutil.cpu_percent(interval=0.1)
         cpu_per_core = psutil.cpu_percent(percpu=True)
@@ -65,10 +77,43 @@ def obtener_estadisticas_reales():
         print(f"Error obteniendo estadísticas reales: {e}")
         return {}
 
+def obtener_muestra_compacta():
+    """Obtiene una muestra plana del sistema en el orden de registro_metricas.CAMPOS"""
+    try:
+        import psutil
+
+        # Sin intervalo: mide contra la llamada anterior y no bloquea
+        cpu_total = psutil.cpu_percent(interval=None)
+        memoria = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        disco = psutil.disk_usage('/')
+        red = psutil.net_io_counters()
+
+        return (
+            time.time(),
+            cpu_total,
+            memoria.total,
+            memoria.used,
+            memoria.available,
+            memoria.percent,
+            swap.total,
+            swap.used,
+            swap.percent,
+            disco.percent,
+            red.bytes_sent if red else 0,
+            red.bytes_recv if red else 0,
+            len(psutil.pids())
+        )
+    except Exception as e:
+        print(f"Error obteniendo muestra del sistema: {e}")
+        return ()
+
 def obtener_procesos_detallados(limite=20):
     """Obtiene información detallada de los procesos del sistema"""
     procesos = []
     try:
+        import psutil
+
         for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info', 'status', 
                                        'num_threads', 'create_time', 'username']):
             try:
@@ -96,20 +141,44 @@ def obtener_procesos_detallados(limite=20):
         print(f"Error obteniendo procesos: {e}")
         return []
 
-def generar_programa_ejemplo(nombre, tamano_kb):
-    """Genera un programa de ejemplo para simulación"""
+def generar_programa_ejemplo(nombre, tamano_kb, semilla=None, **opciones):
+    """Genera un programa de ejemplo para simulación
+
+    Usa generador_cargas (NumPy) si está disponible; sin NumPy se generan las
+    instrucciones una a una con la misma mezcla uniforme de opcodes.
+    """
+    cantidad = tamano_kb // 4  # Aproximadamente 1 instrucción por 4 bytes
+    try:
+        from generador_cargas import generar_programa
+    except ImportError:
+        return _generar_programa_python(cantidad, semilla)
+
+    if semilla is None:
+        semilla = random.getrandbits(64)  # respeta random.seed()
+    instrucciones, _ = generar_programa(cantidad, semilla=semilla, **opciones)
+    return instrucciones.tolist()
+
+def _generar_programa_python(cantidad, semilla=None):
+    """Generador sin NumPy"""
+    aleatorio = random.Random(semilla) if semilla is not None else random
     instrucciones = []
-    for i in range(tamano_kb // 4):  # Aproximadamente 1 instrucción por 4 bytes
+    destinos = min(cantidad, 1 << 16)  # el destino del salto no sale del programa
+    for i in range(cantidad):
         # Generar instrucciones variadas
-        tipo = random.choice(['mov', 'add', 'sub', 'jmp'])
+        tipo = aleatorio.choice(['mov', 'add', 'sub', 'jmp'])
         if tipo == 'mov':
-            instruccion = (0x01 << 24) | (random.randint(1, 2) << 16) | (random.randint(0, 255) << 8)
+            instruccion = (0x01 << 24) | (aleatorio.randint(1, 2) << 16) | (aleatorio.randint(0, 255) << 8)
         elif tipo == 'add':
-            instruccion = (0x02 << 24) | (random.randint(1, 2) << 16) | (random.randint(1, 100) << 8)
+            instruccion = (0x02 << 24) | (aleatorio.randint(1, 2) << 16) | (aleatorio.randint(1, 100) << 8)
         elif tipo == 'sub':
-            instruccion = (0x03 << 24) | (random.randint(1, 2) << 16) | (random.randint(1, 50) << 8)
-        else:  # jmp
-            instruccion = (0x04 << 24) | (random.randint(0, tamano_kb * 256) << 8)
+            instruccion = (0x03 << 24) | (aleatorio.randint(1, 2) << 16) | (aleatorio.randint(1, 50) << 8)
+        else:
+            # Salto a otra instrucción: JMP con destino de 8 bits en el operando 1,
+            # JNZ (siempre tomado sin CMP) con destino de 16 bits si no cabe
+            destino = aleatorio.randint(0, destinos - 1)
+            if destino == i:
+                destino = i - 1 if i > 0 else 1
+            instruccion = (0x04 << 24) | (destino << 16) if destino < 256 else (0x0B << 24) | destino
         
         instrucciones.append(instruccion)
     